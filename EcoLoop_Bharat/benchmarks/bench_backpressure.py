@@ -0,0 +1,107 @@
+"""
+Backpressure benchmark: bounded vs unbounded ingest into a lagging pipeline
+Reads production and recovery Parquet files through read_columnar into the
+circular-ledger join, with a deliberately slow sink on the ledger, once
+with the watermark-bounded buffers (and the engine's max backlog) and once
+without flow control. Each run is a fresh process; reports wall time, peak
+RSS and the ingest metrics (peak queue depth, pauses, time throttled).
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_backpressure.py --records 1000000
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+sys.path.insert(0, ENGINE_DIR)
+sys.path.insert(0, DATA_DIR)
+
+
+def peak_rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_once(production_path, recovery_path, high_watermark, low_watermark, sink_delay_us):
+    """One bounded or unbounded ingest + ledger join into a slow sink; prints a JSON result"""
+    import pathway as pw
+    from processor import projected_schema, read_columnar
+
+    logging.disable(logging.WARNING)
+    subjects = []
+    production = read_columnar(production_path, projected_schema('production'), name="production",
+                               high_watermark=high_watermark, low_watermark=low_watermark, subjects=subjects)
+    recovery = read_columnar(recovery_path, projected_schema('recovery'), name="recovery",
+                             high_watermark=high_watermark, low_watermark=low_watermark, subjects=subjects)
+    ledger = production.join_left(recovery, pw.left.product_id == pw.right.product_id).select(
+        product_id=pw.left.product_id,
+        manufacturer=pw.left.manufacturer_name,
+        recovered=pw.right.product_id.is_not_none(),
+        circular_credit=pw.right.circular_credit_amount,
+    )
+
+    clock = time.perf_counter
+
+    def slow_sink(key, row, time, is_addition):
+        deadline = clock() + sink_delay_us / 1e6
+        while clock() < deadline:
+            pass
+
+    pw.io.subscribe(ledger, on_change=slow_sink)
+    start = time.perf_counter()
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb(),
+                      'sources': [subject.metrics.as_dict() for subject in subjects]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--high-watermark", type=int, default=262_144)
+    parser.add_argument("--low-watermark", type=int, default=65_536)
+    parser.add_argument("--sink-delay-us", type=float, default=5.0, help="busy time per ledger change in the sink")
+    parser.add_argument("--run-once", nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_once:
+        production_path, recovery_path, high, low, delay = args.run_once
+        run_once(production_path, recovery_path, None if high == "none" else int(high), int(low), float(delay))
+        return
+
+    from mock_data_generator import MockDataGenerator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        production_path = os.path.join(tmp, "factory.parquet")
+        recovery_path = os.path.join(tmp, "returns.parquet")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator = MockDataGenerator()
+            generator.write_factory_output(args.records, path=production_path, streaming_updates=False)
+            generator.write_return_logs(production_path, recovery_path)
+        print(f"🚰 {args.records:,} products into a sink taking {args.sink_delay_us:g} µs per ledger change")
+        print(f"{'ingest':>10} {'seconds':>8} {'peak RSS MB':>12} {'peak depth':>11} {'pauses':>7} {'throttled s':>12}")
+        for label, high in (("unbounded", "none"), ("bounded", str(args.high_watermark))):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-once", production_path, recovery_path, high,
+                 str(args.low_watermark), str(args.sink_delay_us)],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            sources = result['sources']
+            print(f"{label:>10} {result['seconds']:>8.2f} {result['peak_rss_mb']:>12,.0f} "
+                  f"{max(s['peak_depth'] for s in sources):>11,} {sum(s['pauses'] for s in sources):>7} "
+                  f"{sum(s['throttled_seconds'] for s in sources):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
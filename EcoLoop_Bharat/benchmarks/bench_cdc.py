@@ -0,0 +1,96 @@
+"""
+CDC benchmark: binary diff frames vs the JSON-lines ledger output
+Writes the same stream of ledger diffs (mostly inserts, some updates and
+retractions, in ticks of --tick rows) through CdcWriter and as JSON lines,
+then times a consumer catching up from a cursor halfway through the stream.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_cdc.py --diffs 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+from cdc import CDC_COLUMNS, INSERT, OPS, RETRACT, UPDATE, CdcReader, CdcWriter
+
+import pyarrow as pa
+
+LEDGER_FIELDS = [
+    pa.field('product_id', pa.string()), pa.field('material_type', pa.string()),
+    pa.field('manufacturer', pa.string()), pa.field('weight_kg', pa.float64()), pa.field('recovered', pa.bool_()),
+    pa.field('recovery_center', pa.string()), pa.field('circular_credit', pa.float64()),
+    pa.field('status', pa.string()),
+]
+
+
+def ticks(count, tick, rng):
+    for start in range(0, count, tick):
+        diffs = []
+        for n in range(start, min(start + tick, count)):
+            recovered = rng.random() < 0.6
+            op = rng.choices((INSERT, UPDATE, RETRACT), (0.8, 0.15, 0.05))[0]
+            diffs.append((op, start, rng.getrandbits(128), {
+                'product_id': f"{n:013d}", 'material_type': rng.choice(("PET", "HDPE", "LDPE", "Glass")),
+                'manufacturer': rng.choice(("Hindustan Unilever", "Parle Agro", "ITC", "Dabur")),
+                'weight_kg': round(rng.uniform(0.01, 2.0), 3), 'recovered': recovered,
+                'recovery_center': "Pune MRF" if recovered else None,
+                'circular_credit': round(rng.uniform(0.5, 20), 2) if recovered else None,
+                'status': "RECOVERED" if recovered else "IN_TRANSIT",
+            }))
+        yield diffs
+
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--diffs", type=int, default=1_000_000)
+    parser.add_argument("--tick", type=int, default=1_000, help="diffs per Pathway tick (one frame)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cdc_dir, jsonl = os.path.join(tmp, "cdc"), os.path.join(tmp, "ledger.jsonl")
+        writer = CdcWriter(cdc_dir, pa.schema(CDC_COLUMNS + LEDGER_FIELDS))
+        start = time.perf_counter()
+        for diffs in ticks(args.diffs, args.tick, random.Random(7)):
+            writer.write(diffs)
+        writer.close()
+        cdc_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(jsonl, "w") as f:
+            for diffs in ticks(args.diffs, args.tick, random.Random(7)):
+                for op, tick, _, row in diffs:
+                    f.write(json.dumps({**row, 'time': tick, 'diff': -1 if op == RETRACT else 1}) + "\n")
+        json_write = time.perf_counter() - start
+
+        cursor = os.path.join(tmp, "consumer.cursor")
+        CdcReader(cdc_dir, cursor).commit(args.diffs // 2)
+        start = time.perf_counter()
+        caught_up = sum(len(batch) for batch in CdcReader(cdc_dir, cursor).batches())
+        cdc_catch_up = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(jsonl) as f:
+            replayed = sum(1 for n, line in enumerate(f) if n >= args.diffs // 2 and json.loads(line))
+        json_catch_up = time.perf_counter() - start
+
+        print(f"🧾 {args.diffs:,} ledger diffs ({', '.join(OPS.values())}), {args.tick:,} per tick")
+        print(f"{'sink':>8} {'MB':>8} {'bytes/diff':>11} {'write s':>8} {'catch-up s':>11} {'diffs/s':>12}")
+        for name, mb, write, catch_up, rows in (
+            ("cdc", directory_mb(cdc_dir), cdc_write, cdc_catch_up, caught_up),
+            ("jsonl", os.path.getsize(jsonl) / 2**20, json_write, json_catch_up, replayed),
+        ):
+            print(f"{name:>8} {mb:>8,.1f} {mb * 2**20 / args.diffs:>11,.1f} {write:>8.2f} {catch_up:>11.3f} "
+                  f"{rows / catch_up:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Ingest benchmark: CSV text vs Parquet and Arrow IPC for generator output and engine input
+Writes the same factory output in each format, then times reading it back
+twice: the raw decode with pyarrow, and the engine's static ingest into a
+Pathway table (pw.io.csv.read for CSV, read_columnar for Parquet/Arrow).
+Reports file size, write time, and ingest MB/s (of the file on disk) and rows/s.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_columnar_ingest.py --records 1000000
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import pathway as pw
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+from pathway.internals.parse_graph import G
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from processor import read_columnar
+from schema import ProductStream
+from mock_data_generator import OUTPUT_FORMATS, MockDataGenerator
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def decode(path, fmt):
+    if fmt == "csv":
+        return pa_csv.read_csv(path)
+    return ds.dataset(path, format="ipc" if fmt == "arrow" else fmt).to_table()
+
+
+def engine_ingest(path, fmt):
+    G.clear()
+    if fmt == "csv":
+        table = pw.io.csv.read(path, schema=ProductStream, mode="static")
+    else:
+        table = read_columnar(path, ProductStream)
+    pw.io.null.write(table)
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    args = parser.parse_args()
+
+    # Pathway logs every connector batch
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        generator = MockDataGenerator()
+        print(f"📦 {args.records:,} factory records")
+        print(f"{'format':>8} {'MB':>8} {'write s':>8} {'decode MB/s':>12} {'rows/s':>12} "
+              f"{'engine MB/s':>12} {'rows/s':>12}")
+        for fmt, suffix in OUTPUT_FORMATS.items():
+            path = os.path.join(tmp, f"factory{suffix}")
+            write = timed(lambda: generator.write_factory_output(args.records, path=path, chunk_size=args.chunk_size,
+                                                                 streaming_updates=False))
+            size = os.path.getsize(path) / 2**20
+            read = timed(lambda: decode(path, fmt))
+            ingest = timed(lambda: engine_ingest(path, fmt))
+            print(f"{fmt:>8} {size:>8,.1f} {write:>8.2f} {size / read:>12,.1f} {args.records / read:>12,.0f} "
+                  f"{size / ingest:>12,.1f} {args.records / ingest:>12,.0f}")
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
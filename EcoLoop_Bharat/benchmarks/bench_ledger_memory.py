@@ -0,0 +1,135 @@
+"""
+Memory benchmark: per-session ledger copies vs the shared ledger store
+Simulates N concurrent dashboard sessions, each holding its ledger frame and
+its filtered selection, and reports the private memory of the process.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_ledger_memory.py --rows 500000 --sessions 50
+"""
+import argparse
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ui"))
+from ledger_store import LedgerStore, apply_filters, ledger_partitions, publish_ledger
+
+ZONES = ['North', 'South', 'East', 'West', 'Central']
+STATUSES = ["All", "Recovered Only", "Leaked Only", "Critical Leaks (>30 days)"]
+
+
+def synthetic_ledger(rows, seed=42):
+    """Ledger frame with the dashboard's column layout"""
+    rng = np.random.default_rng(seed)
+    cities = np.array([f"City-{i:02d}" for i in range(25)])
+    city = rng.choice(cities, rows)
+    return pd.DataFrame({
+        'product_id': [f"PROD-{i:08d}" for i in range(rows)],
+        'manufacturer_name': rng.choice([f"Manufacturer-{i}" for i in range(12)], rows),
+        'material_type': rng.choice(['Plastic', 'E-Waste', 'Metal', 'Paper', 'Glass', 'Organic'], rows),
+        'weight_kg': rng.uniform(0.1, 100, rows),
+        'carbon_footprint': rng.uniform(0.5, 50, rows),
+        'manufacturing_date': rng.uniform(1.76e9, 1.77e9, rows),
+        'city': city,
+        'zone': np.array(ZONES)[np.searchsorted(cities, city) % len(ZONES)],
+        'waste_category': rng.choice(['High-Value', 'Medium-Value', 'Low-Value'], rows),
+        'recovered': rng.random(rows) < 0.68,
+        'circular_credit_amount': rng.uniform(50, 10000, rows),
+        'recovery_center_name': rng.choice([f"Center-{i}" for i in range(12)], rows),
+        'days_in_transit': rng.uniform(1, 90, rows),
+        'gps_lat': rng.uniform(8, 31, rows),
+        'gps_lon': rng.uniform(70, 92, rows),
+    })
+
+
+def random_filters(rng):
+    """One session's sidebar selection; most users keep the defaults"""
+    zone = rng.choice(['All'] * 3 + ZONES)
+    status = rng.choice(STATUSES)
+    return (zone, 'All', 'All', 'All', status, 'All')
+
+
+def legacy_apply_filters(df, filters):
+    """The pre-store behaviour: copy the whole frame, then narrow it step by step"""
+    zone, _, _, _, status, _ = filters
+    filtered_df = df.copy()
+    if zone != 'All':
+        filtered_df = filtered_df[filtered_df['zone'] == zone]
+    if status == "Recovered Only":
+        filtered_df = filtered_df[filtered_df['recovered'] == True]
+    elif status == "Leaked Only":
+        filtered_df = filtered_df[filtered_df['recovered'] == False]
+    elif status == "Critical Leaks (>30 days)":
+        filtered_df = filtered_df[(filtered_df['recovered'] == False) & (filtered_df['days_in_transit'] > 30)]
+    return filtered_df
+
+
+def private_memory_mb():
+    """Private (unshared) memory of this process; mapped file pages are excluded"""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        private_kb = sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+        return private_kb / 1024
+    except (OSError, KeyError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, path, sessions):
+    """Hold `sessions` live sessions in this process and print private memory"""
+    rng = random.Random(7)
+    baseline = private_memory_mb()
+    held = []
+    if mode == "copy":
+        # st.cache_data pickles the cached value and unpickles a copy per caller
+        payload = pickle.dumps(LedgerStore(path).table.to_pandas())
+        for _ in range(sessions):
+            session_df = pickle.loads(payload)
+            held.append((session_df, legacy_apply_filters(session_df, random_filters(rng))))
+    else:
+        # st.cache_resource hands every session the same mapped store
+        store = LedgerStore(path)
+        for _ in range(sessions):
+            held.append((store.frame, apply_filters(store.frame, *random_filters(rng))))
+    print(f"{private_memory_mb() - baseline:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--mode", choices=["copy", "shared"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.path, args.sessions)
+        return
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = publish_ledger(synthetic_ledger(args.rows), ("bench", args.rows), cache_dir=cache_dir)
+        disk = sum(os.path.getsize(os.path.join(path, f)) for f in ledger_partitions(path))
+        print(f"📦 Ledger: {args.rows:,} rows, {disk / 2**20:.1f} MB on disk")
+        print(f"👥 Sessions: {args.sessions}")
+        results = {}
+        for mode in ("copy", "shared"):
+            # Fresh interpreter per mode so allocations don't leak between runs
+            out = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--path", path, "--sessions", str(args.sessions)],
+                check=True, capture_output=True, text=True
+            )
+            results[mode] = float(out.stdout.strip().splitlines()[-1])
+            print(f"   {mode:>6}: {results[mode]:10.1f} MB private")
+        if results["shared"] > 0:
+            print(f"✅ Shared store uses {results['copy'] / results['shared']:.1f}x less private memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Speed benchmark: legacy per-row factory generator vs the vectorized, chunked one
+Both write the same number of records to CSV (plus the data/live streaming
+sample) in a scratch directory, followed by the recovery logs derived from
+them in memory and streamed from disk. A second, larger run of the chunked
+generators reports their throughput and peak memory.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_mock_generator.py --records 100000 --large 10000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from mock_data_generator import MockDataGenerator
+
+
+def peak_rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100_000, help="records for the side-by-side comparison")
+    parser.add_argument("--large", type=int, default=0, help="records for a chunked-only run (0 to skip)")
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The generator writes to data/ relative to the working directory
+        os.chdir(tmp)
+        generator = MockDataGenerator()
+        legacy = timed(lambda: generator.generate_factory_output(args.records))
+        chunked = timed(lambda: generator.write_factory_output(args.records, chunk_size=args.chunk_size))
+        print(f"🏭 Factory output, {args.records:,} records")
+        print(f"  legacy loop:  {legacy:8.2f} s  ({args.records / legacy:>12,.0f} rows/s)")
+        print(f"  vectorized:   {chunked:8.2f} s  ({args.records / chunked:>12,.0f} rows/s)  {legacy / chunked:.0f}x")
+        production_df = pd.read_csv("data/factory_output.csv")
+        in_memory = timed(lambda: generator.generate_return_logs(production_df))
+        streamed = timed(lambda: generator.write_return_logs())
+        print(f"♻️ Recovery logs from {args.records:,} products")
+        print(f"  in memory:    {in_memory:8.2f} s  ({args.records / in_memory:>12,.0f} rows/s)")
+        print(f"  from disk:    {streamed:8.2f} s  ({args.records / streamed:>12,.0f} rows/s)")
+
+        if args.large:
+            large = timed(lambda: generator.write_factory_output(args.large, chunk_size=args.chunk_size))
+            size = os.path.getsize("data/factory_output.csv") / 2**20
+            print(f"🏭 {args.large:,} records: {large:.1f} s ({args.large / large:,.0f} rows/s), "
+                  f"{size:,.0f} MB CSV, peak RSS {peak_rss_mb():,.0f} MB")
+            large = timed(lambda: generator.write_return_logs())
+            size = os.path.getsize("data/return_logs.csv") / 2**20
+            print(f"♻️ their recovery logs: {large:.1f} s ({args.large / large:,.0f} products/s), "
+                  f"{size:,.0f} MB CSV, peak RSS {peak_rss_mb():,.0f} MB")
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Projection benchmark: full input schemas vs the columns the pipeline stages read
+Ingests the same production and recovery files with the full ProductStream /
+RecoveryStream schemas and with the processor's projected schemas, then runs
+the circular-ledger join_left and the per-manufacturer reduce on them. Each
+run is a fresh process, so peak RSS covers one ingest and its join state.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_projection_pushdown.py --records 1000000 --formats csv parquet
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+sys.path.insert(0, ENGINE_DIR)
+sys.path.insert(0, DATA_DIR)
+
+
+def peak_rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_once(production_path, recovery_path, projected):
+    """One ingest + ledger join + EPR reduce; prints seconds and peak RSS as JSON"""
+    import pathway as pw
+    from processor import INPUT_SCHEMAS, columnar_format, projected_schema, read_columnar
+
+    logging.disable(logging.WARNING)
+    tables = {}
+    for stream, path in (('production', production_path), ('recovery', recovery_path)):
+        schema = projected_schema(stream) if projected else INPUT_SCHEMAS[stream]
+        tables[stream] = read_columnar(path, schema) if columnar_format(path) else \
+            pw.io.csv.read(path, schema=schema, mode="static")
+    ledger = tables['production'].join_left(
+        tables['recovery'], pw.left.product_id == pw.right.product_id
+    ).select(
+        product_id=pw.left.product_id,
+        material_type=pw.left.material_type,
+        manufacturer=pw.left.manufacturer_name,
+        weight_kg=pw.left.weight_kg,
+        recovered=pw.right.product_id.is_not_none(),
+        recovery_center=pw.right.recovery_center_name,
+        circular_credit=pw.right.circular_credit_amount,
+        carbon_saved=pw.if_else(pw.right.product_id.is_not_none(), pw.left.carbon_footprint * 0.7, 0.0),
+    )
+    compliance = ledger.groupby(pw.this.manufacturer).reduce(
+        manufacturer=pw.this.manufacturer,
+        total_products=pw.reducers.count(),
+        recovered_products=pw.reducers.sum(pw.if_else(pw.this.recovered, 1, 0)),
+        total_carbon_saved=pw.reducers.sum(pw.this.carbon_saved),
+    )
+    pw.io.null.write(ledger)
+    pw.io.null.write(compliance)
+    start = time.perf_counter()
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", choices=["csv", "parquet", "arrow"], default=["csv", "parquet"])
+    parser.add_argument("--run-once", nargs=3, metavar=("PRODUCTION", "RECOVERY", "PROJECTED"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_once:
+        production_path, recovery_path, projected = args.run_once
+        run_once(production_path, recovery_path, projected == "1")
+        return
+
+    from mock_data_generator import MockDataGenerator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        generator = MockDataGenerator()
+        print(f"✂️ {args.records:,} products and their recoveries")
+        print(f"{'format':>8} {'schema':>10} {'seconds':>8} {'rows/s':>10} {'peak RSS MB':>12}")
+        for fmt in args.formats:
+            production_path = os.path.join(tmp, f"factory.{fmt}")
+            recovery_path = os.path.join(tmp, f"returns.{fmt}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.write_factory_output(args.records, path=production_path, streaming_updates=False)
+                generator.write_return_logs(production_path, recovery_path)
+            for projected in (False, True):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run-once", production_path, recovery_path,
+                     "1" if projected else "0"],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{fmt:>8} {'projected' if projected else 'full':>10} {result['seconds']:>8.2f} "
+                      f"{args.records / result['seconds']:>10,.0f} {result['peak_rss_mb']:>12,.0f}")
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Recall benchmark: batch lookups through the BatchIndex vs scanning the ledger
+Feeds a BatchIndex through Pathway from generated production and recovery
+files (the ledger is the processor's join_left, replicated here), then times
+a batch's members and state counts from the index against the same answer
+computed by filtering the whole ledger frame.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_recall_index.py --records 500000
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pathway as pw
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from processor import projected_schema
+from recall_index import BatchIndex
+from mock_data_generator import MockDataGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    # Pathway logs every connector batch
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        production_path = os.path.join(tmp, "factory.csv")
+        recovery_path = os.path.join(tmp, "returns.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator = MockDataGenerator()
+            generator.write_factory_output(args.records, path=production_path, streaming_updates=False)
+            generator.write_return_logs(production_path, recovery_path)
+        products = pw.io.csv.read(production_path, schema=projected_schema('production', ['index_recall_batches']),
+                                  mode="static")
+        recoveries = pw.io.csv.read(recovery_path, schema=projected_schema('recovery'), mode="static")
+        ledger = products.join_left(recoveries, pw.left.product_id == pw.right.product_id).select(
+            product_id=pw.left.product_id,
+            batch_number=pw.left.batch_number,
+            recovered=pw.right.product_id.is_not_none(),
+            status=pw.if_else(pw.right.product_id.is_not_none(), "RECOVERED", "IN_TRANSIT"),
+        )
+        index = BatchIndex()
+        index.attach(products, ledger)
+        frame = {}
+        pw.io.subscribe(ledger, on_change=lambda key, row, time, is_addition: frame.__setitem__(key, row))
+        start = time.perf_counter()
+        pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+        print(f"🧪 indexed {args.records:,} products in {len(index):,} batches "
+              f"in {time.perf_counter() - start:.1f}s")
+    frame = pd.DataFrame(list(frame.values()))
+
+    batches = random.Random(7).choices(frame['batch_number'].unique().tolist(), k=args.queries)
+    start = time.perf_counter()
+    for batch_number in batches:
+        index.batch(batch_number)
+    indexed = (time.perf_counter() - start) / args.queries
+    start = time.perf_counter()
+    for batch_number in batches:
+        members = frame[frame['batch_number'] == batch_number]
+        members[['product_id', 'status']].to_dict('records'), members['recovered'].sum()
+    scanned = (time.perf_counter() - start) / args.queries
+    size = sum(index.counts(b)['total'] for b in batches) / args.queries
+    print(f"mean batch {size:,.0f} products: index {indexed * 1e3:.3f} ms, "
+          f"ledger scan {scanned * 1e3:.3f} ms ({scanned / indexed:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
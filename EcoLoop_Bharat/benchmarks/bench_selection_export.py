@@ -0,0 +1,91 @@
+"""
+Memory benchmark: exporting the filtered selection
+Compares materialising `filtered_df` and writing it with pandas against the
+streamed SelectionExportJob, which filters and appends one record batch at a
+time. Each method runs in a fresh interpreter and reports its peak RSS.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_selection_export.py --rows 2000000 --format csv
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ui"))
+from bench_ledger_memory import synthetic_ledger
+from epr_export import SelectionExportJob
+from ledger_store import LedgerStore, apply_filters, publish_ledger
+
+# A broad selection: every leaked product
+FILTERS = ('All', 'All', 'All', 'All', 'Leaked Only', 'All')
+
+
+def run_method(method, ledger_dir, fmt, out_dir):
+    start = time.perf_counter()
+    if method == "in-memory":
+        filtered_df = apply_filters(LedgerStore(ledger_dir).frame, *FILTERS)
+        path = os.path.join(out_dir, f"selection.{fmt}")
+        if fmt == "parquet":
+            filtered_df.to_parquet(path, index=False)
+        else:
+            filtered_df.to_csv(path, index=False)
+        rows = len(filtered_df)
+    else:
+        job = SelectionExportJob(ledger_dir, fmt, filters=FILTERS, export_dir=out_dir).start()
+        job.join()
+        path, rows = job.path, job.rows_written
+    return {
+        "method": method,
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+        "file_mb": os.path.getsize(path) / 2**20,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def peak_rss_mb():
+    # VmHWM restarts at exec; ru_maxrss would carry over the parent's peak after fork
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--method", help=argparse.SUPPRESS)
+    parser.add_argument("--ledger", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        print(json.dumps(run_method(args.method, args.ledger, args.format, args.out)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🧪 Publishing a {args.rows:,}-row synthetic ledger...")
+        ledger_dir = publish_ledger(synthetic_ledger(args.rows), ("bench", args.rows), cache_dir=tmp)
+        print(f"{'method':<12} {'rows':>10} {'seconds':>8} {'file MB':>8} {'peak MB':>8}")
+        for method in ("in-memory", "streamed"):
+            out_dir = os.path.join(tmp, method)
+            os.makedirs(out_dir)
+            # Fresh interpreter per method so peak RSS is not shared
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--method", method, "--ledger", ledger_dir,
+                 "--out", out_dir, "--format", args.format],
+                check=True, capture_output=True, text=True
+            )
+            row = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{row['method']:<12} {row['rows']:>10,} {row['seconds']:>8.2f} {row['file_mb']:>8.0f} "
+                  f"{row['peak_rss_mb']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
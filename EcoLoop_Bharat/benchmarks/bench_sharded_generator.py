@@ -0,0 +1,66 @@
+"""
+Scaling benchmark: sharded factory generation against worker count
+Generates the same sharded dataset with 1, 2, 4, ... worker processes,
+reports throughput and speedup, and checks that every run produced
+byte-identical shard files.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/bench_sharded_generator.py --records 4000000 --workers 1 2 4 8
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from mock_data_generator import MockDataGenerator
+
+
+def digest(paths):
+    sha = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+    return sha.hexdigest()[:16]
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = [w for w in (1, 2, 4, 8, 16, 32) if w <= cores] or [1]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=4_000_000)
+    parser.add_argument("--shard-size", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    # One fixed clock for every run, so the outputs are comparable byte for byte
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        generator = MockDataGenerator()
+        print(f"🧩 {args.records:,} records in shards of {args.shard_size:,} ({cores} CPU cores)")
+        print(f"{'workers':>7} {'seconds':>8} {'rows/s':>12} {'speedup':>8}  digest")
+        baseline, digests = None, set()
+        for workers in args.workers:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                paths = generator.write_factory_shards(args.records, out_dir=f"w{workers}",
+                                                       shard_size=args.shard_size, workers=workers, now=now)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            output = digest(paths)
+            digests.add(output)
+            print(f"{workers:>7} {seconds:>8.2f} {args.records / seconds:>12,.0f} {baseline / seconds:>7.2f}x  {output}")
+        os.chdir("/")
+    print("✅ Identical output for every worker count" if len(digests) == 1 else "❌ Output differs between runs")
+    sys.exit(0 if len(digests) == 1 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Skew benchmark: the processor's join_left and groupby(manufacturer) stages per workload profile
+Generates the same number of products and their recovery logs with each
+generator workload profile, then times the circular-ledger join (production
+left-joined to recoveries on product_id) alone and followed by the per-
+manufacturer EPR reduce, in Pathway's static mode. Key-skew statistics are
+printed next to the timings. Set PATHWAY_THREADS to see how the skew spreads
+(or fails to spread) across workers.
+
+Usage (from EcoLoop_Bharat/):
+    PATHWAY_THREADS=4 python benchmarks/bench_skewed_joins.py --records 1000000 --profiles uniform skewed hot_keys
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import pathway as pw
+from pathway.internals.parse_graph import G
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from schema import ProductStream, RecoveryStream
+from mock_data_generator import WORKLOAD_PROFILES, MockDataGenerator
+
+
+def circular_ledger(production_path, recovery_path):
+    """The processor's circular-ledger join, with its columns that feed the EPR reduce"""
+    production = pw.io.csv.read(production_path, schema=ProductStream, mode="static")
+    recovery = pw.io.csv.read(recovery_path, schema=RecoveryStream, mode="static")
+    return production.join_left(recovery, pw.left.product_id == pw.right.product_id).select(
+        product_id=pw.left.product_id,
+        manufacturer=pw.left.manufacturer_name,
+        recovered=pw.right.product_id.is_not_none(),
+        carbon_saved=pw.if_else(pw.right.product_id.is_not_none(), pw.left.carbon_footprint * 0.7, 0.0),
+    )
+
+
+def epr_compliance(ledger):
+    """The processor's per-manufacturer reduce"""
+    return ledger.groupby(pw.this.manufacturer).reduce(
+        manufacturer=pw.this.manufacturer,
+        total_products=pw.reducers.count(),
+        recovered_products=pw.reducers.sum(pw.if_else(pw.this.recovered, 1, 0)),
+        total_carbon_saved=pw.reducers.sum(pw.this.carbon_saved),
+    )
+
+
+def timed_run(build):
+    G.clear()
+    pw.io.null.write(build())
+    start = time.perf_counter()
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--profiles", nargs="+", choices=sorted(WORKLOAD_PROFILES), default=sorted(WORKLOAD_PROFILES))
+    args = parser.parse_args()
+
+    # Pathway logs every connector batch and source close
+    logging.disable(logging.WARNING)
+    now = datetime.now()
+    print(f"🔗 {args.records:,} products per profile, PATHWAY_THREADS={os.environ.get('PATHWAY_THREADS', '1')}")
+    print(f"{'profile':>10} {'recoveries':>11} {'top mfg':>8} {'max scans':>9} {'join s':>7} {'+groupby s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        for profile in args.profiles:
+            generator = MockDataGenerator(profile)
+            production_path = os.path.join(tmp, f"{profile}-factory.csv")
+            recovery_path = os.path.join(tmp, f"{profile}-returns.csv")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.write_factory_output(args.records, path=production_path, streaming_updates=False, now=now)
+                generator.write_return_logs(production_path, recovery_path)
+
+            manufacturers = pd.read_csv(production_path, usecols=['manufacturer_id'])['manufacturer_id']
+            scans = pd.read_csv(recovery_path, usecols=['product_id'])['product_id'].value_counts()
+
+            join = timed_run(lambda: circular_ledger(production_path, recovery_path))
+            reduce = timed_run(lambda: epr_compliance(circular_ledger(production_path, recovery_path)))
+            print(f"{profile:>10} {scans.sum():>11,} {manufacturers.value_counts(normalize=True).iloc[0]:>8.0%} "
+                  f"{scans.iloc[0]:>9,} {join:>7.2f} {reduce:>10.2f}")
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Headless load test: N concurrent dashboard sessions with random interactions
+Each simulated user is a Streamlit AppTest session running ui/dashboard.py in
+this process, so sessions share the process-wide caches exactly like browser
+sessions on one server. Users switch tabs and change sidebar filters at
+random; every rerun is timed. Each N runs in a fresh interpreter so its CPU
+and peak memory are measured in isolation.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/load_dashboard.py --sessions 1 5 10 25 --reruns 20
+    python benchmarks/load_dashboard.py --save-baseline benchmarks/load_baseline.json
+    python benchmarks/load_dashboard.py --baseline benchmarks/load_baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ui", "dashboard.py")
+
+TABS = [
+    "🗺️ Live Leakage Map",
+    "📊 Recovery Analytics",
+    "🏭 EPR Compliance",
+    "🤖 AI Waste Advisor",
+    "🔮 Predictive Intelligence",
+    "🚨 Live Alerts",
+]
+
+# Sidebar selectboxes a regulator is likely to touch
+FILTERS = ["🌍 Zone", "🧪 Material", "🏙️ City", "📦 Waste Category", "✅ Status", "🏭 Manufacturer", "🕒 Time Range"]
+
+# Metrics compared against a saved baseline (lower is better)
+GATED_METRICS = ("p50_ms", "p90_ms", "p99_ms", "peak_rss_mb")
+
+
+def simulate_user(user_id, reruns, seed, latencies, errors):
+    """One session: an initial load, then `reruns` random tab switches or filter changes"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + user_id)
+    at = AppTest.from_file(os.path.abspath(DASHBOARD), default_timeout=300)
+    at.session_state["active_tab"] = rng.choice(TABS)
+    for step in range(reruns + 1):
+        if step > 0:
+            if rng.random() < 0.4:
+                at.session_state["active_tab"] = rng.choice(TABS)
+            else:
+                widgets = [w for w in at.selectbox if w.label in FILTERS]
+                widget = rng.choice(widgets)
+                choices = [o for o in widget.options if o != "Custom"]
+                widget.set_value(rng.choice(choices))
+        start = time.perf_counter()
+        at.run()
+        latencies.append((step == 0, (time.perf_counter() - start) * 1000))
+        if at.exception:
+            errors.append(f"user {user_id}, step {step}: {at.exception[0].value}")
+
+
+def run_level(sessions, reruns, seed):
+    """Run `sessions` concurrent users in this process and return their metrics"""
+    latencies, errors = [], []
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.perf_counter()
+    users = [
+        threading.Thread(target=simulate_user, args=(i, reruns, seed, latencies, errors))
+        for i in range(sessions)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    wall = time.perf_counter() - wall_start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu = (usage.ru_utime - usage_before.ru_utime) + (usage.ru_stime - usage_before.ru_stime)
+    # Cold first loads are reported separately; the gate looks at interactive reruns
+    warm = np.array([ms for first, ms in latencies if not first] or [0.0])
+    cold = np.array([ms for first, ms in latencies if first] or [0.0])
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50_ms": float(np.percentile(warm, 50)),
+        "p90_ms": float(np.percentile(warm, 90)),
+        "p99_ms": float(np.percentile(warm, 99)),
+        "max_ms": float(warm.max()),
+        "first_load_p50_ms": float(np.percentile(cold, 50)),
+        "throughput_rps": len(latencies) / wall,
+        "cpu_cores": cpu / wall,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "errors": errors,
+    }
+
+
+def check_regressions(results, baseline, tolerance):
+    """Metrics worse than baseline * (1 + tolerance) for the same session count"""
+    by_sessions = {row["sessions"]: row for row in baseline}
+    failures = []
+    for row in results:
+        reference = by_sessions.get(row["sessions"])
+        if reference is None:
+            continue
+        for metric in GATED_METRICS:
+            limit = reference[metric] * (1 + tolerance)
+            if row[metric] > limit:
+                failures.append(f"N={row['sessions']}: {metric} {row[metric]:.1f} > {limit:.1f} "
+                                f"(baseline {reference[metric]:.1f})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--reruns", type=int, default=20, help="interactions per session after the first load")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--save-baseline", help="write the results as the regression baseline")
+    parser.add_argument("--baseline", help="fail if any gated metric regresses against this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.level:
+        print(json.dumps(run_level(args.level, args.reruns, args.seed)))
+        return
+
+    # The dashboard resolves data/ relative to the working directory
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    print(f"👥 Dashboard load test: {args.reruns} interactions per session")
+    print(f"{'N':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'first':>8} {'rps':>6} {'cores':>6} {'peak MB':>8}")
+    results = []
+    for sessions in args.sessions:
+        # Fresh interpreter per level so caches and peak RSS don't carry over
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--level", str(sessions),
+             "--reruns", str(args.reruns), "--seed", str(args.seed)],
+            check=True, capture_output=True, text=True
+        )
+        row = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(row)
+        print(f"{sessions:>4} {row['p50_ms']:>7.0f}ms {row['p90_ms']:>7.0f}ms {row['p99_ms']:>7.0f}ms "
+              f"{row['max_ms']:>7.0f}ms {row['first_load_p50_ms']:>7.0f}ms {row['throughput_rps']:>6.1f} "
+              f"{row['cpu_cores']:>6.2f} {row['peak_rss_mb']:>8.0f}")
+        for error in row["errors"][:3]:
+            print(f"     ❌ {error}")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"💾 Results written to {path}")
+
+    failed = any(row["errors"] for row in results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"❌ Regression: {failure}")
+        if not failures:
+            print(f"✅ No regression beyond {args.tolerance:.0%} of {args.baseline}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Load test for the digital-twin lookup API
+Feeds a TwinIndex through Pathway from generated production and recovery files
+(the ledger is the processor's join_left, replicated here), then measures
+point-lookup latency twice: in process against the hash index, and over HTTP
+with concurrent keep-alive clients against the uvicorn server.
+
+Usage (from EcoLoop_Bharat/):
+    python benchmarks/load_twin_api.py --records 200000 --clients 8 --requests 20000
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pathway as pw
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from processor import projected_schema
+from twin_api import TwinIndex, start_server
+from mock_data_generator import MockDataGenerator
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def build_index(production_path, recovery_path):
+    products = pw.io.csv.read(production_path, schema=projected_schema('production', ['serve_digital_twins']),
+                              mode="static")
+    recoveries = pw.io.csv.read(recovery_path, schema=projected_schema('recovery'), mode="static")
+    ledger = products.join_left(recoveries, pw.left.product_id == pw.right.product_id).select(
+        product_id=pw.left.product_id,
+        recovered=pw.right.product_id.is_not_none(),
+        status=pw.if_else(pw.right.product_id.is_not_none(), "RECOVERED", "IN_TRANSIT"),
+        recovery_center=pw.right.recovery_center_name,
+        recovery_date=pw.right.recovery_date,
+        circular_credit=pw.right.circular_credit_amount,
+        carbon_saved=pw.if_else(pw.right.product_id.is_not_none(), pw.left.carbon_footprint * 0.7, 0.0),
+    )
+    index = TwinIndex()
+    index.attach(products, ledger)
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    return index
+
+
+def http_client(host, port, keys, latencies, errors):
+    connection = http.client.HTTPConnection(host, port)
+    for key in keys:
+        start = time.perf_counter()
+        connection.request("GET", f"/twins/{key}")
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20_000, help="HTTP requests across all clients")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    # Pathway logs every connector batch
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        production_path = os.path.join(tmp, "factory.csv")
+        recovery_path = os.path.join(tmp, "returns.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator = MockDataGenerator()
+            generator.write_factory_output(args.records, path=production_path, streaming_updates=False)
+            generator.write_return_logs(production_path, recovery_path)
+        keys = pd.read_csv(production_path, usecols=['product_id'])['product_id'].tolist()
+        start = time.perf_counter()
+        index = build_index(production_path, recovery_path)
+        print(f"🔎 indexed {len(index):,} twins ({index.updates:,} updates) in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(7)
+    sample = [rng.choice(keys) for _ in range(100_000)]
+    latencies = []
+    for key in sample:
+        start = time.perf_counter()
+        index.get(key)
+        latencies.append(time.perf_counter() - start)
+    print(f"in-process get: p50 {percentile(latencies, 0.5) * 1e6:.2f} µs, "
+          f"p99 {percentile(latencies, 0.99) * 1e6:.2f} µs")
+
+    server = start_server(index, port=args.port)
+    while not server.started:
+        time.sleep(0.05)
+    per_client = args.requests // args.clients
+    latencies, errors, threads = [], [], []
+    for n in range(args.clients):
+        keys_for_client = [rng.choice(keys) for _ in range(per_client)]
+        threads.append(threading.Thread(target=http_client,
+                                        args=("127.0.0.1", args.port, keys_for_client, latencies, errors)))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.should_exit = True
+    print(f"HTTP, {args.clients} clients: {len(latencies) / elapsed:,.0f} req/s, "
+          f"p50 {percentile(latencies, 0.5) * 1e3:.2f} ms, p99 {percentile(latencies, 0.99) * 1e3:.2f} ms, "
+          f"{len(errors)} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Live event emitter for EcoLoop Bharat
+Runs the mock data generator as a continuous feed: production events arrive
+as a Poisson process whose rate follows a diurnal cycle and festival-season
+bursts, and a share of the products is recovered days later. Some recoveries
+are reported late, after events that happened after them. Events are
+appended to the live files or sent to a local socket, and the throughput
+actually achieved is logged, so the processor can be load-tested against a
+sustained, realistic stream.
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import shutil
+import socket
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from mock_data_generator import WORKLOAD_PROFILES, MockDataGenerator
+from product_ids import ProductIdAllocator
+
+LIVE_DIR = "data/live"
+LOG_PATH = "data/logs/emitter_throughput.jsonl"
+
+# Live file names per stream and output format
+LIVE_FILES = {
+    ('production', 'jsonl'): "stream.jsonl",
+    ('recovery', 'jsonl'): "recovery_stream.jsonl",
+    ('production', 'csv'): "new_products.csv",
+    ('recovery', 'csv'): "new_recoveries.csv",
+}
+
+# Diwali season: 2.5x the usual volume for a week, starting six hours in
+FESTIVAL_SEASON = [(6.0, 168.0, 2.5)]
+
+
+class FileSink:
+    """Appends each stream to its live file in data/live"""
+    def __init__(self, out_dir=LIVE_DIR, fmt="jsonl"):
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported live file format: {fmt}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.fmt = fmt
+        self.paths = {stream: os.path.join(out_dir, LIVE_FILES[(stream, fmt)]) for stream in ('production', 'recovery')}
+        self._files = {stream: open(path, "ab") for stream, path in self.paths.items()}
+
+    def write(self, stream, table):
+        sink = self._files[stream]
+        if self.fmt == "jsonl":
+            sink.write(table.to_pandas().to_json(orient="records", lines=True).encode())
+        else:
+            # Header only when the file is new
+            options = pa_csv.WriteOptions(include_header=sink.tell() == 0, quoting_style="needed")
+            pa_csv.write_csv(table, sink, write_options=options)
+        sink.flush()
+
+    def close(self):
+        for sink in self._files.values():
+            sink.close()
+
+
+class SocketSink:
+    """
+    Sends both streams as JSON lines over one TCP connection; every line
+    carries a "stream" field ("production" or "recovery")
+    """
+    def __init__(self, host="127.0.0.1", port=9999, connect_timeout=30.0):
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                self._socket = socket.create_connection((host, port), timeout=5)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.5)
+
+    def write(self, stream, table):
+        df = table.to_pandas()
+        df.insert(0, 'stream', stream)
+        self._socket.sendall(df.to_json(orient="records", lines=True).encode())
+
+    def close(self):
+        self._socket.close()
+
+
+class LiveEmitter:
+    """
+    `rate` is the target number of production events per wall-clock second at
+    the daily average; `speed` is how many simulated seconds pass per wall
+    second (3600 plays one day in 24 s). `bursts` are (start_hour, hours,
+    multiplier) windows in simulated time. A `late_fraction` of recoveries is
+    held back for an extra exponential delay averaging `late_mean_hours`.
+    Recoveries come 1-30 simulated days after manufacture, so the first ones
+    appear a simulated day in (a day of wall time at speed 1, 24 s at 3600).
+    Those due after the current simulated day are spilled to one file per
+    report day and loaded when that day starts, so memory holds one day of
+    scheduled recoveries rather than a month.
+    """
+    def __init__(self, sink, rate=100.0, speed=1.0, recovery_rate=0.65, diurnal_amplitude=0.5, peak_hour=11.0,
+                 bursts=(), late_fraction=0.05, late_mean_hours=6.0, tick=0.1, seed=42, start=None,
+                 log_path=LOG_PATH, log_every=5.0, generator=None):
+        self.sink = sink
+        self.rate = rate
+        self.speed = speed
+        self.recovery_rate = recovery_rate
+        self.diurnal_amplitude = diurnal_amplitude
+        self.peak_hour = peak_hour
+        self.bursts = list(bursts)
+        self.late_fraction = late_fraction
+        self.late_mean_hours = late_mean_hours
+        self.tick = tick
+        self.seed = seed
+        self.log_path = log_path
+        self.log_every = log_every
+        self.generator = generator or MockDataGenerator()
+
+        self.rng = np.random.default_rng(seed)
+        self.start = start or datetime.now()
+        self.sim_start = self.start.timestamp()
+        self.sim_now = self.sim_start
+        self.product_ids = ProductIdAllocator()
+        self.emitted = {'production': 0, 'recovery': 0, 'late': 0}
+        self.expected = 0.0  # products the target rate called for so far
+        # Scheduled recoveries of the loaded days, bucketed by the tick they are due in, and a heap of those ticks
+        self._pending = {}
+        self._due = []
+        # Later days' recoveries: day -> (spill path, sink, writer, rows)
+        self._loaded_day = int(self.sim_start // 86400)
+        self._spill_dir = None
+        self._spills = {}
+
+    def intensity(self, sim_ts):
+        """Rate multiplier at simulated time(s): the diurnal cycle times any active burst"""
+        sim_ts = np.asarray(sim_ts, dtype=float)
+        hour = (sim_ts % 86400) / 3600
+        multiplier = 1 + self.diurnal_amplitude * np.cos(2 * np.pi * (hour - self.peak_hour) / 24)
+        elapsed_hours = (sim_ts - self.sim_start) / 3600
+        for start_hour, hours, factor in self.bursts:
+            active = (elapsed_hours >= start_hour) & (elapsed_hours < start_hour + hours)
+            multiplier = np.where(active, multiplier * factor, multiplier)
+        return multiplier
+
+    def advance(self, sim_to):
+        """Emit every event that happens (or is reported) up to simulated time `sim_to`"""
+        sim_from, self.sim_now = self.sim_now, sim_to
+        if sim_to <= sim_from:
+            return 0
+
+        # Non-homogeneous Poisson arrivals: the rate is held constant over one step
+        expected = self.rate * float(self.intensity((sim_from + sim_to) / 2)) * (sim_to - sim_from) / self.speed
+        n = int(self.rng.poisson(expected))
+        self.expected += expected
+        emitted = 0
+        if n:
+            timestamps = np.sort(self.rng.uniform(sim_from, sim_to, n))
+            first = self.emitted['production']
+            products = self.generator.product_records(
+                timestamps, np.arange(first, first + n), self.rng, self.product_ids, seed=self.seed
+            )
+            self.sink.write('production', products)
+            self.emitted['production'] += n
+            emitted += n
+            self._schedule(products)
+
+        while self._loaded_day < sim_to // 86400:
+            self._loaded_day += 1
+            if self._loaded_day in self._spills:
+                self._hold_by_tick(self._release_spill(self._loaded_day))
+
+        due = []
+        while self._due and self._due[0] <= self._bucket(sim_to):
+            due.extend(self._pending.pop(heapq.heappop(self._due)))
+        if due:
+            recoveries = pa.concat_tables(due)
+            report_at = recoveries.column('report_at').to_numpy()
+            ready = report_at < sim_to
+            if not ready.all():
+                self._hold(self._bucket(sim_to), recoveries.filter(pa.array(~ready)))
+            recoveries = recoveries.filter(pa.array(ready))
+            order = np.argsort(recoveries.column('report_at').to_numpy(), kind="stable")
+            recoveries = recoveries.take(order)
+            self.emitted['late'] += int(recoveries.column('late').to_numpy().sum())
+            recoveries = recoveries.drop_columns(['report_at', 'late'])
+            if recoveries.num_rows:
+                self.sink.write('recovery', recoveries)
+                self.emitted['recovery'] += recoveries.num_rows
+                emitted += recoveries.num_rows
+        return emitted
+
+    def _bucket(self, sim_ts):
+        return int(sim_ts // (self.tick * self.speed))
+
+    def _schedule(self, products):
+        # Recoveries 1-30 days after manufacture (no "now" cap: the future is simulated too)
+        recoveries = self.generator.recovery_records(products.to_pandas(), self.recovery_rate, self.rng, np.inf)
+        if recoveries.num_rows == 0:
+            return
+        report_at = recoveries.column('recovery_date').to_numpy()
+        late = self.rng.random(len(report_at)) < self.late_fraction
+        report_at = report_at + np.where(late, self.rng.exponential(self.late_mean_hours * 3600, len(report_at)), 0.0)
+        recoveries = recoveries.append_column('report_at', pa.array(report_at)).append_column('late', pa.array(late))
+        days = (report_at // 86400).astype(np.int64)
+        loaded = days <= self._loaded_day
+        if not loaded.all():
+            self._spill(recoveries.filter(pa.array(~loaded)), days[~loaded])
+            recoveries = recoveries.filter(pa.array(loaded))
+        self._hold_by_tick(recoveries)
+
+    def _hold_by_tick(self, recoveries):
+        report_at = recoveries.column('report_at').to_numpy()
+        buckets = (report_at // (self.tick * self.speed)).astype(np.int64)
+        order = np.argsort(buckets, kind="stable")
+        recoveries = recoveries.take(order)
+        values, starts = np.unique(buckets[order], return_index=True)
+        for bucket, start, end in zip(values, starts, list(starts[1:]) + [len(order)]):
+            self._hold(int(bucket), recoveries.slice(start, end - start))
+
+    def _spill(self, recoveries, days):
+        """Append recoveries reported after the loaded days to their day's spill file"""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="live-recoveries-")
+        order = np.argsort(days, kind="stable")
+        recoveries = recoveries.take(order)
+        day_values, starts = np.unique(days[order], return_index=True)
+        for day, start, end in zip(day_values, starts, list(starts[1:]) + [len(order)]):
+            day = int(day)
+            if day not in self._spills:
+                spill_path = os.path.join(self._spill_dir, f"day-{day}.arrow")
+                sink = pa.OSFile(spill_path, "wb")
+                self._spills[day] = [spill_path, sink, pa.ipc.new_stream(sink, recoveries.schema), 0]
+            self._spills[day][2].write_table(recoveries.slice(start, end - start))
+            self._spills[day][3] += end - start
+
+    def _release_spill(self, day):
+        spill_path, sink, writer, _ = self._spills.pop(day)
+        writer.close()
+        sink.close()
+        with pa.OSFile(spill_path, "rb") as source:
+            table = pa.ipc.open_stream(source).read_all()
+        os.remove(spill_path)
+        return table
+
+    def close(self):
+        """Drop the spilled recoveries and close the sink"""
+        for _, sink, writer, _ in self._spills.values():
+            writer.close()
+            sink.close()
+        self._spills.clear()
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+        self.sink.close()
+
+    def _hold(self, bucket, recoveries):
+        if bucket not in self._pending:
+            self._pending[bucket] = []
+            heapq.heappush(self._due, bucket)
+        self._pending[bucket].append(recoveries)
+
+    @property
+    def pending(self):
+        in_memory = sum(t.num_rows for tables in self._pending.values() for t in tables)
+        return in_memory + sum(rows for _, _, _, rows in self._spills.values())
+
+    @property
+    def pending_in_memory(self):
+        return sum(t.num_rows for tables in self._pending.values() for t in tables)
+
+    def run(self, duration=None, max_events=None):
+        """Emit in real time until `duration` wall seconds or `max_events` events have passed"""
+        wall_start = time.perf_counter()
+        window = self._window(wall_start)
+        try:
+            while True:
+                now = time.perf_counter()
+                if duration is not None and now - wall_start >= duration:
+                    break
+                if max_events is not None and self.emitted['production'] + self.emitted['recovery'] >= max_events:
+                    break
+                self.advance(self.sim_start + (now - wall_start) * self.speed)
+
+                if now - window['start'] >= self.log_every:
+                    self._log_throughput(window, now)
+                    window = self._window(now)
+
+                # Sleep to the next tick boundary; a step that overran it is logged as lag
+                spent = time.perf_counter() - now
+                window['overrun'] = max(window['overrun'], spent - self.tick)
+                next_tick = wall_start + (math.floor((time.perf_counter() - wall_start) / self.tick) + 1) * self.tick
+                time.sleep(max(0.0, next_tick - time.perf_counter()))
+        finally:
+            self._log_throughput(window, time.perf_counter())
+            self.close()
+        return self.emitted['production'] + self.emitted['recovery']
+
+    def _window(self, start):
+        return {'start': start, 'expected': self.expected, 'overrun': 0.0, **self.emitted}
+
+    def _log_throughput(self, window, now):
+        seconds = max(now - window['start'], 1e-9)
+        entry = {
+            'ts': time.time(),
+            'sim_time': datetime.fromtimestamp(self.sim_now).isoformat(timespec="seconds"),
+            'seconds': round(seconds, 3),
+            'target_products_per_s': round((self.expected - window['expected']) / seconds, 1),
+            'products_per_s': round((self.emitted['production'] - window['production']) / seconds, 1),
+            'recoveries_per_s': round((self.emitted['recovery'] - window['recovery']) / seconds, 1),
+            'products': self.emitted['production'],
+            'recoveries': self.emitted['recovery'],
+            'late_recoveries': self.emitted['late'],
+            'pending_recoveries': self.pending,
+            'max_overrun_ms': round(max(window['overrun'], 0.0) * 1000, 1),
+        }
+        print(f"📡 {entry['sim_time']}  {entry['products_per_s']:>9,.1f} products/s "
+              f"(target {entry['target_products_per_s']:,.1f}), {entry['recoveries_per_s']:,.1f} recoveries/s  "
+              f"[{entry['products']:,} products, {entry['recoveries']:,} recoveries, "
+              f"{entry['late_recoveries']:,} late, {entry['pending_recoveries']:,} pending]")
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(entry) + "\n")
+
+
+def parse_burst(spec):
+    """START_HOUR:HOURS:MULTIPLIER, e.g. 2:0.5:8 for an eight-fold spike two hours in"""
+    start_hour, hours, factor = (float(part) for part in spec.split(":"))
+    return start_hour, hours, factor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=100.0, help="production events per second at the daily average")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="simulated seconds per wall-clock second (recoveries start one simulated day in)")
+    parser.add_argument("--duration", type=float, help="wall-clock seconds to run (default: until interrupted)")
+    parser.add_argument("--max-events", type=int)
+    parser.add_argument("--recovery-rate", type=float, default=0.65)
+    parser.add_argument("--diurnal", type=float, default=0.5, help="amplitude of the daily cycle (0 = flat)")
+    parser.add_argument("--festival", action="store_true", help="add the Diwali-season surge")
+    parser.add_argument("--burst", type=parse_burst, action="append", default=[], metavar="START_H:HOURS:X")
+    parser.add_argument("--late-fraction", type=float, default=0.05, help="share of recoveries reported late")
+    parser.add_argument("--late-hours", type=float, default=6.0, help="mean extra reporting delay of late recoveries")
+    parser.add_argument("--profile", choices=sorted(WORKLOAD_PROFILES), default="uniform",
+                        help="generator workload profile (its skews and hot products; lateness comes from --late-*)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--socket", metavar="HOST:PORT", help="send JSON lines to a local socket instead of files")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.socket:
+        host, port = args.socket.rsplit(":", 1)
+        sink = SocketSink(host, int(port))
+    else:
+        sink = FileSink(LIVE_DIR, args.format)
+    emitter = LiveEmitter(
+        sink, rate=args.rate, speed=args.speed, recovery_rate=args.recovery_rate, diurnal_amplitude=args.diurnal,
+        bursts=(FESTIVAL_SEASON if args.festival else []) + args.burst, late_fraction=args.late_fraction,
+        late_mean_hours=args.late_hours, seed=args.seed, generator=MockDataGenerator(args.profile)
+    )
+    print(f"🚀 Emitting ~{args.rate:,.0f} products/s at {args.speed:g}x time "
+          f"→ {args.socket or LIVE_DIR} (Ctrl+C to stop)")
+    try:
+        emitter.run(duration=args.duration, max_events=args.max_events)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,97 @@ Creates streams that demonstrate Pathway's real-time capabilities
 """
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 import random
 import json
+import glob
 import hashlib
 import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Product IDs follow the engine's time-sortable scheme
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+from product_ids import ProductIdAllocator, manufacturer_number
+from snapshots import MANIFEST, SNAPSHOT_ROOT, publish_snapshot
+
+# GPS coordinates (rough Indian centers)
+CITY_COORDS = {
+    "Delhi": (28.6139, 77.2090),
+    "Mumbai": (19.0760, 72.8777),
+    "Bengaluru": (12.9716, 77.5946),
+    "Chennai": (13.0827, 80.2707),
+    "Kolkata": (22.5726, 88.3639),
+    "Pune": (18.5204, 73.8567),
+    "Ahmedabad": (23.0225, 72.5714),
+    "Hyderabad": (17.3850, 78.4867),
+    "Jamshedpur": (22.8046, 86.2029),
+    "Noida": (28.5355, 77.3910),
+    "Anand": (22.5645, 72.9289)
+}
+INDIA_CENTER = (20.5937, 78.9629)
+
+SHARD_DIR = "data/shards"
+
+# Bulk output formats, chosen by file extension: CSV text, or columnar
+# Parquet / Arrow IPC files with typed, zstd-compressed columns
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Circular credit (₹ per kg recovered) by material category; anything else earns 10
+CREDIT_RATES = {
+    'plastic': 15,
+    'e_waste': 45,
+    'metal': 35,
+    'paper': 8,
+    'glass': 5,
+    'organic': 3
+}
+CONDITIONS = ['excellent', 'good', 'damaged', 'end_of_life']
+CONDITION_WEIGHTS = [0.2, 0.4, 0.3, 0.1]
+RECYCLING_METHODS = ['mechanical', 'chemical', 'pyrolysis', 'composting']
+
+# Production columns the recovery logs are derived from
+RETURN_LOG_INPUTS = ['product_id', 'material_type', 'material_category', 'weight_kg', 'manufacturing_date']
+
+# Workload profiles: how skewed the generated data is. Skews are Zipf exponents
+# over the manufacturer, material and recovery-center lists (0 = uniform); a
+# `hot_fraction` of products are viral SKUs, always recovered and scanned
+# `hot_scans` times on average; a `late_fraction` of recoveries is reported
+# (and logged) an exponential `late_mean_days` after it happened.
+DEFAULT_PROFILE = {
+    'manufacturer_skew': 0.0,
+    'material_skew': 0.0,
+    'center_skew': 0.0,
+    'hot_fraction': 0.0,
+    'hot_scans': 1,
+    'late_fraction': 0.0,
+    'late_mean_days': 0.0,
+}
+WORKLOAD_PROFILES = {
+    'uniform': {},
+    # A few producers dominate volume; recoveries concentrate in a few cities
+    'skewed': {'manufacturer_skew': 1.2, 'material_skew': 0.8, 'center_skew': 1.0},
+    # Viral SKUs: 0.1% of products account for about a third of the recovery scans
+    'hot_keys': {'hot_fraction': 0.001, 'hot_scans': 300},
+    # One recovery in five reaches the log days late, out of recovery_date order
+    'late': {'late_fraction': 0.2, 'late_mean_days': 3.0},
+    'production': {'manufacturer_skew': 1.2, 'material_skew': 0.8, 'center_skew': 1.0,
+                   'hot_fraction': 0.001, 'hot_scans': 300, 'late_fraction': 0.2, 'late_mean_days': 3.0},
+}
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
 
 class MockDataGenerator:
     """
     Generate realistic Indian waste management data
     """
-    def __init__(self):
+    def __init__(self, profile='uniform'):
         np.random.seed(42)
         random.seed(42)
         
@@ -56,22 +136,31 @@ class MockDataGenerator:
             {"type": "Organic Waste", "category": "organic", "recyclable": 0.95, "carbon_per_kg": 0.2},
         ]
         
+        # Workload profile: a WORKLOAD_PROFILES name or a dict of DEFAULT_PROFILE overrides
+        if isinstance(profile, str):
+            if profile not in WORKLOAD_PROFILES:
+                raise ValueError(f"Unknown workload profile: {profile}")
+            profile = WORKLOAD_PROFILES[profile]
+        unknown = set(profile) - set(DEFAULT_PROFILE)
+        if unknown:
+            raise ValueError(f"Unknown workload profile settings: {', '.join(sorted(unknown))}")
+        self.profile = {**DEFAULT_PROFILE, **profile}
+        self.product_ids = ProductIdAllocator()
+        
         # Create data directories
         os.makedirs("data/live", exist_ok=True)
         os.makedirs("data/archive", exist_ok=True)
     
-    def generate_product_id(self, material_code, manufacturer_id):
+    def generate_product_id(self, manufacturer_id, timestamp=None):
         """Generate unique product ID with QR code"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        random_part = random.randint(1000, 9999)
-        product_id = f"{material_code}{manufacturer_id}{timestamp}{random_part}"
+        product_id = self.product_ids.next(manufacturer_id, timestamp)
         
         # Generate QR hash (simulated)
         qr_hash = hashlib.sha256(product_id.encode()).hexdigest()[:16]
         
         return product_id, qr_hash
     
-    def generate_factory_output(self, num_records=1000):
+    def generate_factory_output(self, num_records=1000, path='data/factory_output.csv'):
         """
         Generate manufacturing output stream
         """
@@ -79,17 +168,21 @@ class MockDataGenerator:
         
         # Start from 30 days ago to create history
         start_date = datetime.now() - timedelta(days=30)
+        mfg_weights = _zipf_weights(len(self.manufacturers), self.profile['manufacturer_skew'])
+        material_weights = _zipf_weights(len(self.materials), self.profile['material_skew'])
         
         for i in range(num_records):
-            # Random manufacturer
-            mfg = random.choice(self.manufacturers)
+            # Random manufacturer (weighted by the workload profile's skew)
+            if self.profile['manufacturer_skew']:
+                mfg = random.choices(self.manufacturers, mfg_weights)[0]
+            else:
+                mfg = random.choice(self.manufacturers)
             
             # Random material
-            material = random.choice(self.materials)
-            
-            # Generate product ID
-            material_code = material['type'][:3].upper()
-            product_id, qr_hash = self.generate_product_id(material_code, mfg['id'])
+            if self.profile['material_skew']:
+                material = random.choices(self.materials, material_weights)[0]
+            else:
+                material = random.choice(self.materials)
             
             # Random timestamp in last 30 days (weighted towards recent)
             days_ago = random.expovariate(0.2)  # Exponential to favor recent
@@ -101,25 +194,10 @@ class MockDataGenerator:
             # Carbon footprint calculation
             carbon = weight * material['carbon_per_kg']
             
-            # GPS coordinates (rough Indian centers)
-            gps_coords = {
-                "Delhi": (28.6139, 77.2090),
-                "Mumbai": (19.0760, 72.8777),
-                "Bengaluru": (12.9716, 77.5946),
-                "Chennai": (13.0827, 80.2707),
-                "Kolkata": (22.5726, 88.3639),
-                "Pune": (18.5204, 73.8567),
-                "Ahmedabad": (23.0225, 72.5714),
-                "Hyderabad": (17.3850, 78.4867),
-                "Jamshedpur": (22.8046, 86.2029),
-                "Noida": (28.5355, 77.3910),
-                "Anand": (22.5645, 72.9289)
-            }
-            
-            lat, lon = gps_coords.get(mfg['city'], (20.5937, 78.9629))
+            lat, lon = CITY_COORDS.get(mfg['city'], INDIA_CENTER)
             
             record = {
-                'product_id': product_id,
+                'product_id': None,  # allocated in time order below
                 'batch_number': f"BATCH-{timestamp.strftime('%Y%m')}-{random.randint(1,999):03d}",
                 'manufacturer_id': mfg['id'],
                 'manufacturer_name': mfg['name'],
@@ -132,7 +210,7 @@ class MockDataGenerator:
                 'manufacturing_date': timestamp.timestamp(),
                 'expiry_date': (timestamp + timedelta(days=random.randint(30, 365))).timestamp() 
                               if material['category'] in ['organic', 'paper'] else None,
-                'qr_code_hash': qr_hash,
+                'qr_code_hash': None,
                 'gps_lat': lat + random.uniform(-0.1, 0.1),
                 'gps_lon': lon + random.uniform(-0.1, 0.1),
                 'source': 'manufacturing'
@@ -142,8 +220,12 @@ class MockDataGenerator:
         df = pd.DataFrame(records)
         df = df.sort_values('manufacturing_date')
         
+        # Product IDs increase with manufacturing time, so they are handed out in time order
+        df['product_id'] = self.product_ids.allocate(df['manufacturing_date'], df['manufacturer_id'])
+        df['qr_code_hash'] = [hashlib.sha256(pid.encode()).hexdigest()[:16] for pid in df['product_id']]
+        
         # Save to CSV
-        df.to_csv('data/factory_output.csv', index=False)
+        df.to_csv(path, index=False)
         print(f"✅ Generated {num_records} factory output records")
         
         # Also create streaming version (continuous updates)
@@ -151,72 +233,300 @@ class MockDataGenerator:
         
         return df
     
-    def generate_return_logs(self, production_df, recovery_rate=0.65):
+    def factory_plan(self, num_records, shard_size=250_000, seed=42, now=None):
+        """
+        Split a factory dataset into shards that can be generated independently.
+        Shard k holds the products whose timestamp falls in the k-th of
+        equal-probability slices of the timestamp distribution. Shard sizes come
+        from one multinomial draw and each shard's rows from its own
+        SeedSequence child, so the data depends on (num_records, shard_size,
+        seed, now) but never on how many workers generate it.
+        """
+        num_shards = max(1, -(-num_records // shard_size))
+        root = np.random.SeedSequence(seed)
+        counts = np.random.default_rng(root).multinomial(num_records, [1 / num_shards] * num_shards)
+        firsts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        now = now or datetime.now()
+        return [
+            {'shard': k, 'shards': num_shards, 'first': int(first), 'rows': int(rows),
+             'num_records': num_records, 'seed': seed, 'seed_seq': child, 'now': now}
+            for k, (first, rows, child) in enumerate(zip(firsts, counts, root.spawn(num_shards)))
+        ]
+
+    def factory_shard(self, shard):
+        """
+        Vectorized factory output for one shard of `factory_plan`, as an Arrow table.
+        Same columns and distributions as `generate_factory_output`, drawn with
+        NumPy. Timestamps come out sorted, and every shard starts where the
+        previous one ended, so the shards concatenate into a time-ordered dataset.
+        """
+        rng = np.random.default_rng(shard['seed_seq'])
+        n = shard['rows']
+        start_ts = (shard['now'] - timedelta(days=30)).timestamp()
+
+        # Sorted uniforms in this shard's probability slice (normalised exponential spacings),
+        # mapped through the inverse CDF of Exp(0.2) days capped at 30
+        low, high = shard['shard'] / shard['shards'], (shard['shard'] + 1) / shard['shards']
+        spacings = rng.standard_exponential(n + 1)
+        u = low + (high - low) * np.cumsum(spacings[:-1]) / spacings.sum()
+        timestamps = start_ts + np.minimum(-np.log1p(-u) / 0.2, 30) * 86400
+
+        # Product IDs past the millisecond the previous shard may have ended in
+        boundary = start_ts + min(-np.log1p(-low) / 0.2, 30) * 86400
+        product_ids = ProductIdAllocator(after=boundary if shard['shard'] else None)
+        return self.product_records(
+            timestamps, np.arange(shard['first'], shard['first'] + n), rng, product_ids, seed=shard['seed']
+        )
+
+    def product_records(self, timestamps, rank, rng, product_ids, seed=42):
+        """
+        Factory records for the given (sorted) manufacturing timestamps, as an
+        Arrow table. Product IDs come from the `product_ids` allocator, `rank`
+        numbers the products (it makes QR hashes unique), every other column
+        is drawn from `rng`.
+        """
+        n = len(timestamps)
+        # Simulated QR hashes: a 64-bit mix of (seed, row) instead of one SHA-256 per product
+        hash_key = np.uint64((seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+
+        mfg_ids = pa.array([m['id'] for m in self.manufacturers])
+        mfg_names = pa.array([m['name'] for m in self.manufacturers])
+        mfg_numbers = np.array([manufacturer_number(m['id']) for m in self.manufacturers])
+        mfg_coords = np.array([CITY_COORDS.get(m['city'], INDIA_CENTER) for m in self.manufacturers])
+        material_types = pa.array([m['type'] for m in self.materials])
+        material_categories = pa.array([m['category'] for m in self.materials])
+        recyclable = np.array([m['recyclable'] for m in self.materials])
+        carbon_per_kg = np.array([m['carbon_per_kg'] for m in self.materials])
+        perishable = np.array([m['category'] in ['organic', 'paper'] for m in self.materials])
+
+        mfg = _skewed_choice(rng, n, len(self.manufacturers), self.profile['manufacturer_skew'])
+        material = _skewed_choice(rng, n, len(self.materials), self.profile['material_skew'])
+        weight = rng.uniform(0.5, 50.0, n)
+        months = timestamps.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+        expiry_days = rng.integers(30, 366, n)
+
+        batch_number = pc.binary_join_element_wise(
+            "BATCH-", _padded((1970 + months // 12) * 100 + months % 12 + 1, 6),
+            "-", _padded(rng.integers(1, 1000, n), 3), ""
+        )
+        return pa.table({
+            'product_id': pa.array(product_ids.allocate(timestamps, mfg_numbers[mfg])),
+            'batch_number': batch_number,
+            'manufacturer_id': mfg_ids.take(mfg),
+            'manufacturer_name': mfg_names.take(mfg),
+            'material_type': material_types.take(material),
+            'material_category': material_categories.take(material),
+            'weight_kg': np.round(weight, 2),
+            'carbon_footprint': np.round(weight * carbon_per_kg[material], 2),
+            'recyclable_percentage': recyclable[material],
+            'gst_hsn_code': pa.array(3900000 + rng.integers(10, 100, n) * 1000 + rng.integers(100, 1000, n)).cast(pa.string()),
+            'manufacturing_date': timestamps,
+            'expiry_date': pa.array(np.where(perishable[material], timestamps + expiry_days * 86400.0, np.nan),
+                                    from_pandas=True),
+            'qr_code_hash': _hex64(_splitmix64(rank.astype(np.uint64) + hash_key)),
+            'gps_lat': mfg_coords[mfg, 0] + rng.uniform(-0.1, 0.1, n),
+            'gps_lon': mfg_coords[mfg, 1] + rng.uniform(-0.1, 0.1, n),
+            'source': pa.repeat('manufacturing', n),
+        })
+
+    def factory_chunks(self, num_records, chunk_size=250_000, seed=42, now=None):
+        """Vectorized factory output, one `factory_plan` shard (about `chunk_size` rows) at a time"""
+        for shard in self.factory_plan(num_records, chunk_size, seed, now):
+            yield self.factory_shard(shard)
+
+    def write_factory_shards(self, num_records, out_dir=SHARD_DIR, shard_size=250_000, seed=42, workers=None,
+                             now=None, fmt='csv'):
+        """
+        Generate `factory_plan` shards in a process pool, each to its own file
+        (in one of the OUTPUT_FORMATS). Returns the shard paths in time order;
+        concatenated they are the same dataset `write_factory_output` writes,
+        for any number of workers.
+        """
+        plan = self.factory_plan(num_records, shard_size, seed, now)
+        os.makedirs(out_dir, exist_ok=True)
+        for suffix in OUTPUT_FORMATS.values():
+            for stale in glob.glob(os.path.join(out_dir, f"factory-*{suffix}")):
+                os.remove(stale)
+        jobs = [(shard, os.path.join(out_dir, f"factory-{shard['shard']:05d}{OUTPUT_FORMATS[fmt]}")) for shard in plan]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = list(pool.map(self._write_shard, jobs))
+        print(f"✅ Generated {num_records:,} factory output records in {len(paths)} shards")
+        return paths
+
+    def _write_shard(self, job):
+        shard, path = job
+        table = self.factory_shard(shard)
+        writer = _open_writer(path, table.schema)
+        try:
+            writer.write_table(table)
+        finally:
+            writer.close()
+        return path
+
+    def write_factory_output(self, num_records, path='data/factory_output.csv', chunk_size=250_000, seed=42,
+                             streaming_updates=True, now=None):
+        """
+        Stream `factory_chunks` to CSV, Parquet or Arrow (by the extension of
+        `path`), one chunk at a time, so memory stays flat however many
+        records are generated
+        """
+        last = None
+        writer = None
+        try:
+            for chunk in self.factory_chunks(num_records, chunk_size, seed, now):
+                if writer is None:
+                    writer = _open_writer(path, chunk.schema)
+                writer.write_table(chunk)
+                last = chunk
+        finally:
+            if writer is not None:
+                writer.close()
+        print(f"✅ Generated {num_records:,} factory output records in chunks of {chunk_size:,}")
+
+        if streaming_updates and last is not None:
+            self.create_streaming_updates(last.slice(max(0, last.num_rows - 100)).to_pandas())
+        return path
+
+    def generate_return_logs(self, production_df, recovery_rate=0.65, seed=42, path='data/return_logs.csv'):
         """
         Generate recovery logs based on production data
         """
-        records = []
-        
-        # For each product, randomly decide if recovered
-        for _, product in production_df.iterrows():
-            # Decide if recovered (with some bias)
-            if random.random() < recovery_rate:
-                # Choose random recovery center
-                center = random.choice(self.recovery_centers)
-                
-                # Recovery date (between manufacturing and now)
-                mfg_date = datetime.fromtimestamp(product['manufacturing_date'])
-                max_delay = min(30, (datetime.now() - mfg_date).days)
-                delay_days = random.randint(1, max(1, max_delay))
-                recovery_date = mfg_date + timedelta(days=delay_days)
-                
-                # Recovery weight (usually less due to losses)
-                recovery_weight = product['weight_kg'] * random.uniform(0.7, 0.98)
-                
-                # Circular credit calculation (₹ per kg recovered)
-                credit_rates = {
-                    'plastic': 15,
-                    'e_waste': 45,
-                    'metal': 35,
-                    'paper': 8,
-                    'glass': 5,
-                    'organic': 3
-                }
-                credit_rate = credit_rates.get(product['material_category'], 10)
-                circular_credit = recovery_weight * credit_rate
-                
-                # Condition assessment
-                conditions = ['excellent', 'good', 'damaged', 'end_of_life']
-                weights = [0.2, 0.4, 0.3, 0.1]
-                condition = random.choices(conditions, weights=weights)[0]
-                
-                record = {
-                    'recovery_id': f"REC-{recovery_date.strftime('%Y%m%d')}-{random.randint(10000,99999)}",
-                    'product_id': product['product_id'],
-                    'recovery_center_id': center['id'],
-                    'recovery_center_name': center['name'],
-                    'recovery_date': recovery_date.timestamp(),
-                    'material_type': product['material_type'],
-                    'weight_recovered': round(recovery_weight, 2),
-                    'condition': condition,
-                    'recycling_method': random.choice(['mechanical', 'chemical', 'pyrolysis', 'composting']),
-                    'recovered_by': f"Collector-{random.randint(1,100)}",
-                    'circular_credit_amount': round(circular_credit, 2),
-                    'gps_lat': 12.9716 + random.uniform(-0.5, 0.5),  # Rough Bengaluru area
-                    'gps_lon': 77.5946 + random.uniform(-0.5, 0.5),
-                    'verification_hash': hashlib.sha256(f"{product['product_id']}{recovery_date}".encode()).hexdigest()[:16]
-                }
-                records.append(record)
-        
-        df = pd.DataFrame(records)
-        df = df.sort_values('recovery_date')
+        records = self.recovery_records(production_df, recovery_rate, np.random.default_rng(seed),
+                                         datetime.now().timestamp(), report=True)
+        records = records.sort_by('report_date').drop_columns(['report_date'])
         
         # Save to CSV
-        df.to_csv('data/return_logs.csv', index=False)
+        pa_csv.write_csv(records, path, write_options=pa_csv.WriteOptions(quoting_style="needed"))
         print(f"✅ Generated {len(records)} recovery records ({(len(records)/len(production_df))*100:.1f}% recovery rate)")
         
-        return df
-    
+        return records.to_pandas()
+
+    def return_log_chunks(self, production_path='data/factory_output.csv', recovery_rate=0.65, seed=42, now=None,
+                          block_size=4 << 20):
+        """
+        Vectorized recovery logs for a production file in any of the
+        OUTPUT_FORMATS (or the shard files of `write_factory_shards`, in
+        order) read a block at a time, yielded as
+        Arrow tables in the order they are reported: recovery_date order, apart
+        from the late reports of the workload profile.
+        Recoveries are spilled to one file per report day. A recovery comes at
+        least a day after manufacture, so once the production log has moved past
+        a day no later product can land in it: that day is sorted and released.
+        Memory is bounded by one block plus one day of recoveries. The production
+        log must be in manufacturing_date order, as both factory generators write it.
+        """
+        rng = np.random.default_rng(seed)
+        now_ts = (now or datetime.now()).timestamp()
+        paths = [production_path] if isinstance(production_path, str) else list(production_path)
+        spill_dir = tempfile.mkdtemp(prefix="return-logs-")
+        spills = {}
+        watermark = -np.inf
+        try:
+            for batch in _production_batches(paths, block_size):
+                if batch.num_rows == 0:
+                    continue
+                mfg_date = batch.column('manufacturing_date').to_numpy()
+                if mfg_date.min() < watermark:
+                    raise ValueError(f"{', '.join(paths)} is not in manufacturing_date order")
+                watermark = mfg_date.max()
+
+                records = self.recovery_records(batch.to_pandas(), recovery_rate, rng, now_ts, report=True)
+                days = (records.column('report_date').to_numpy() // 86400).astype(np.int64)
+                order = np.argsort(days, kind="stable")
+                records = records.take(order)
+                day_values, starts = np.unique(days[order], return_index=True)
+                for day, start, end in zip(day_values, starts, list(starts[1:]) + [len(order)]):
+                    if day not in spills:
+                        spill_path = os.path.join(spill_dir, f"day-{day}.arrow")
+                        sink = pa.OSFile(spill_path, "wb")
+                        spills[day] = (spill_path, sink, pa.ipc.new_stream(sink, records.schema))
+                    spills[day][2].write_table(records.slice(start, end - start))
+
+                # Every later recovery falls after watermark + 1 day
+                for day in sorted(d for d in spills if d * 86400 <= watermark):
+                    yield _release_spill(*spills.pop(day))
+            for day in sorted(spills):
+                yield _release_spill(*spills.pop(day))
+        finally:
+            for _, sink, writer in spills.values():
+                writer.close()
+                sink.close()
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    def write_return_logs(self, production_path='data/factory_output.csv', path='data/return_logs.csv',
+                          recovery_rate=0.65, seed=42):
+        """Stream `return_log_chunks` to CSV, Parquet or Arrow (by the extension of `path`)"""
+        recovered = 0
+        writer = None
+        try:
+            for chunk in self.return_log_chunks(production_path, recovery_rate, seed):
+                if writer is None:
+                    writer = _open_writer(path, chunk.schema)
+                writer.write_table(chunk)
+                recovered += chunk.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        print(f"✅ Generated {recovered:,} recovery records")
+        return path
+
+    def recovery_records(self, production_df, recovery_rate, rng, now_ts, report=False):
+        """
+        Recovery records for one frame of products, drawn column by column.
+        Hot products of the workload profile are scanned several times. With
+        `report`, a `report_date` column says when each record reaches the log.
+        """
+        recovered = rng.random(len(production_df)) < recovery_rate
+        scans = recovered.astype(np.int64)
+        if self.profile['hot_fraction']:
+            hot = _hot_products(production_df['product_id'].to_numpy(dtype=object), self.profile['hot_fraction'])
+            scans = np.where(hot, 1 + rng.poisson(self.profile['hot_scans'] - 1, len(scans)), scans)
+        products = production_df.iloc[np.repeat(np.arange(len(production_df)), scans)]
+        n = len(products)
+
+        # Recovery date (between manufacturing and now), whole days after manufacture
+        mfg_date = products['manufacturing_date'].to_numpy(dtype=float)
+        max_delay = np.clip(np.floor((now_ts - mfg_date) / 86400), 1, 30).astype(np.int64)
+        recovery_date = mfg_date + rng.integers(1, max_delay + 1) * 86400.0
+
+        # Recovery weight (usually less due to losses) and circular credit (₹ per kg recovered)
+        recovery_weight = products['weight_kg'].to_numpy(dtype=float) * rng.uniform(0.7, 0.98, n)
+        credit_rate = products['material_category'].map(CREDIT_RATES).fillna(10).to_numpy(dtype=float)
+
+        center = _skewed_choice(rng, n, len(self.recovery_centers), self.profile['center_skew'])
+        product_ids = products['product_id'].to_numpy(dtype=object)
+        # Simulated verification hash of (product, recovery date) instead of one SHA-256 per record
+        verification = pd.util.hash_array(product_ids, categorize=False) ^ recovery_date.view(np.uint64)
+
+        records = pa.table({
+            'recovery_id': pc.binary_join_element_wise(
+                "REC-", pa.array(_yyyymmdd(recovery_date)).cast(pa.string()),
+                "-", pa.array(rng.integers(10000, 100000, n)).cast(pa.string()), ""
+            ),
+            'product_id': pa.array(product_ids, type=pa.string()),
+            'recovery_center_id': pa.array([c['id'] for c in self.recovery_centers]).take(center),
+            'recovery_center_name': pa.array([c['name'] for c in self.recovery_centers]).take(center),
+            'recovery_date': recovery_date,
+            'material_type': pa.array(products['material_type'].to_numpy(dtype=object), type=pa.string()),
+            'weight_recovered': np.round(recovery_weight, 2),
+            'condition': pa.array(CONDITIONS).take(rng.choice(len(CONDITIONS), n, p=CONDITION_WEIGHTS)),
+            'recycling_method': pa.array(RECYCLING_METHODS).take(rng.integers(0, len(RECYCLING_METHODS), n)),
+            'recovered_by': pc.binary_join_element_wise(
+                "Collector-", pa.array(rng.integers(1, 101, n)).cast(pa.string()), ""
+            ),
+            'circular_credit_amount': np.round(recovery_weight * credit_rate, 2),
+            'gps_lat': 12.9716 + rng.uniform(-0.5, 0.5, n),  # Rough Bengaluru area
+            'gps_lon': 77.5946 + rng.uniform(-0.5, 0.5, n),
+            'verification_hash': _hex64(_splitmix64(verification)),
+        })
+        if report:
+            report_date = recovery_date
+            if self.profile['late_fraction']:
+                late = rng.random(n) < self.profile['late_fraction']
+                report_date = report_date + np.where(late, rng.exponential(self.profile['late_mean_days'] * 86400, n), 0.0)
+            records = records.append_column('report_date', pa.array(report_date))
+        return records
+
     def create_streaming_updates(self, production_df):
         """
         Create streaming updates for live demo
@@ -240,17 +550,18 @@ class MockDataGenerator:
         
         print("✅ Created streaming updates in data/live/")
     
-    def generate_complete_dataset(self):
+    def generate_complete_dataset(self, out_dir='data'):
         """
         Generate complete mock dataset
         """
         print("📊 Generating EcoLoop Bharat mock data...")
         
         # Generate production data
-        production_df = self.generate_factory_output(5000)
+        production_df = self.generate_factory_output(5000, path=os.path.join(out_dir, 'factory_output.csv'))
         
         # Generate recovery data with 65% recovery rate
-        recovery_df = self.generate_return_logs(production_df, recovery_rate=0.65)
+        recovery_df = self.generate_return_logs(production_df, recovery_rate=0.65,
+                                                path=os.path.join(out_dir, 'return_logs.csv'))
         
         # Create leakage hotspots (areas with poor recovery)
         hotspots = [
@@ -259,7 +570,7 @@ class MockDataGenerator:
             {"city": "Bengaluru", "recovery_rate": 0.72, "alert": "Good recovery in Whitefield"},
         ]
         
-        with open('data/hotspots.json', 'w') as f:
+        with open(os.path.join(out_dir, 'hotspots.json'), 'w') as f:
             json.dump(hotspots, f, indent=2)
         
         print("\n✅ Mock data generation complete!")
@@ -269,6 +580,149 @@ class MockDataGenerator:
         
         return production_df, recovery_df
 
+
+def _output_format(path):
+    """Which of the OUTPUT_FORMATS a path is, by extension (CSV unless it says otherwise)"""
+    suffix = os.path.splitext(path)[1].lower()
+    return next((fmt for fmt, ext in OUTPUT_FORMATS.items() if ext == suffix), 'csv')
+
+
+def _open_writer(path, schema):
+    """A CSV, Parquet or Arrow IPC file writer for `path`, all with write_table/close"""
+    fmt = _output_format(path)
+    if fmt == 'parquet':
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    if fmt == 'arrow':
+        return pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    return pa_csv.CSVWriter(path, schema, write_options=pa_csv.WriteOptions(quoting_style="needed"))
+
+
+def _production_batches(paths, block_size):
+    """Record batches of the recovery-log input columns of one or more production files"""
+    for path in paths:
+        fmt = _output_format(path)
+        if fmt == 'parquet':
+            # About as many rows as a CSV block of the same size holds
+            yield from pq.ParquetFile(path).iter_batches(batch_size=max(1024, block_size // 128),
+                                                         columns=RETURN_LOG_INPUTS)
+        elif fmt == 'arrow':
+            with pa.memory_map(path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i).select(RETURN_LOG_INPUTS)
+        else:
+            yield from pa_csv.open_csv(
+                path,
+                read_options=pa_csv.ReadOptions(block_size=block_size),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=RETURN_LOG_INPUTS,
+                    column_types={'product_id': pa.string(), 'manufacturing_date': pa.float64(),
+                                  'weight_kg': pa.float64()}
+                )
+            )
+
+
+def _release_spill(path, sink, writer):
+    """Close one day's spill file and return its recoveries in report order"""
+    writer.close()
+    sink.close()
+    with pa.OSFile(path, "rb") as source:
+        table = pa.ipc.open_stream(source).read_all()
+    os.remove(path)
+    return table.sort_by('report_date').drop_columns(['report_date'])
+
+
+def _zipf_weights(k, skew):
+    """Zipf-like probabilities of k ranked items, P(i) proportional to 1 / (i + 1) ** skew"""
+    weights = 1.0 / np.arange(1, k + 1) ** skew
+    return weights / weights.sum()
+
+
+def _skewed_choice(rng, n, k, skew):
+    """n draws from range(k): uniform, or Zipf-like with the given skew"""
+    if not skew:
+        return rng.integers(0, k, n)
+    return rng.choice(k, n, p=_zipf_weights(k, skew))
+
+
+def _hot_products(product_ids, fraction):
+    """
+    Which products are hot: a hash of the product ID below `fraction`, so the
+    same products are hot however the production log is chunked
+    """
+    return pd.util.hash_array(product_ids, categorize=False) < np.uint64(min(fraction, 1.0) * 2.0**64 - 1)
+
+
+def _yyyymmdd(timestamps):
+    """UTC calendar dates of timestamps as YYYYMMDD integers"""
+    days = timestamps.astype('datetime64[s]').astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]')
+    return ((years.astype(np.int64) + 1970) * 10000 + (months - years).astype(np.int64) * 100
+            + (days - months).astype(np.int64) + 101)
+
+
+def _padded(values, width):
+    """Integers as zero-padded strings"""
+    return pc.utf8_lpad(pa.array(values).cast(pa.string()), width, padding="0")
+
+
+def _splitmix64(x):
+    """SplitMix64 finalizer: a well-mixed 64-bit hash of each uint64"""
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _hex64(values):
+    """uint64 values as 16-character lowercase hex strings"""
+    digits = np.empty((len(values), 16), dtype=np.uint8)
+    for i in range(16):
+        digits[:, i] = HEX_DIGITS[(values >> np.uint64(60 - 4 * i)) & np.uint64(0xF)]
+    return pa.array(digits.view("S16").ravel()).cast(pa.string())
+
+
 if __name__ == "__main__":
-    generator = MockDataGenerator()
-    prod_df, rec_df = generator.generate_complete_dataset()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate EcoLoop Bharat mock data")
+    parser.add_argument("--records", type=int,
+                        help="stream this many factory records with the vectorized generator instead of the demo dataset")
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="csv",
+                        help="file format of the --records output (Parquet and Arrow are zstd-compressed columnar files)")
+    parser.add_argument("--profile", choices=sorted(WORKLOAD_PROFILES), default="uniform",
+                        help="workload profile: skewed manufacturers, hot products, late recoveries")
+    parser.add_argument("--workers", type=int,
+                        help="generate the factory output as shards (published as shards/ in the snapshot) "
+                             "with this many processes")
+    args = parser.parse_args()
+
+    generator = MockDataGenerator(args.profile)
+    suffix = OUTPUT_FORMATS[args.format]
+    # Outputs are written aside and published as one immutable snapshot version,
+    # so the dashboard and engine never read a half-written file
+    incoming = os.path.join(SNAPSHOT_ROOT, f".incoming-{os.getpid()}")
+    os.makedirs(incoming, exist_ok=True)
+    if args.records and args.workers:
+        shards = generator.write_factory_shards(args.records, out_dir=os.path.join(incoming, "shards"),
+                                                shard_size=args.chunk_size, workers=args.workers, fmt=args.format)
+        outputs = {'shards': os.path.join(incoming, "shards"),
+                   f"return_logs{suffix}": generator.write_return_logs(
+                       production_path=shards, path=os.path.join(incoming, f"return_logs{suffix}"))}
+    elif args.records:
+        production_path = generator.write_factory_output(
+            args.records, path=os.path.join(incoming, f"factory_output{suffix}"), chunk_size=args.chunk_size
+        )
+        outputs = {f"factory_output{suffix}": production_path,
+                   f"return_logs{suffix}": generator.write_return_logs(
+                       production_path=production_path, path=os.path.join(incoming, f"return_logs{suffix}"))}
+    else:
+        prod_df, rec_df = generator.generate_complete_dataset(out_dir=incoming)
+        outputs = {name: os.path.join(incoming, name)
+                   for name in ("factory_output.csv", "return_logs.csv", "hotspots.json")}
+    manifest = publish_snapshot(outputs, link_to={name: os.path.join("data", name) for name in outputs})
+    shutil.rmtree(incoming, ignore_errors=True)
+    print(f"📸 Published snapshot v{manifest['version']} ({SNAPSHOT_ROOT}/{MANIFEST})")
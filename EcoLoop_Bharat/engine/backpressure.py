@@ -0,0 +1,126 @@
+"""
+Ingest Flow Control for EcoLoop Bharat
+Bounded buffering between the input sources and the processing graph. A
+source is read on its own thread into a WatermarkBuffer. The buffer stops
+the reader once the buffered rows reach the high watermark and lets it go
+again only after they drain to the low watermark. The engine side is bounded
+by Pathway's max_backlog_size, so when the join or the sinks lag, the
+connector blocks, the buffer fills and intake pauses instead of memory
+growing. IngestMetrics records queue depth and time spent throttled per source.
+"""
+import threading
+import time
+from abc import abstractmethod
+
+import pathway as pw
+
+# Rows buffered per source before intake pauses, and the depth it resumes at
+INGEST_HIGH_WATERMARK = 262_144
+INGEST_LOW_WATERMARK = 65_536
+
+
+class IngestMetrics:
+    """Flow-control counters of one source (updated by its buffer)"""
+    def __init__(self, name):
+        self.name = name
+        self.depth = 0             # rows buffered now
+        self.peak_depth = 0
+        self.rows = 0              # rows handed to the engine
+        self.pauses = 0            # times the reader hit the high watermark
+        self.throttled_seconds = 0.0
+        self.throttled_since = None
+
+    def as_dict(self):
+        throttled = self.throttled_seconds
+        if self.throttled_since is not None:
+            throttled += time.perf_counter() - self.throttled_since
+        return {
+            'source': self.name, 'depth': self.depth, 'peak_depth': self.peak_depth, 'rows': self.rows,
+            'pauses': self.pauses, 'throttled': self.throttled_since is not None,
+            'throttled_seconds': round(throttled, 3),
+        }
+
+
+class WatermarkBuffer:
+    """
+    Batches of rows between one reader thread and the engine feeder, bounded
+    by high / low watermarks (in rows) with hysteresis: a batch that would
+    take the depth past the high watermark waits until it drains to the low
+    one (a single oversized batch is let into an empty buffer).
+    high_watermark=None disables the bound.
+    """
+    def __init__(self, high_watermark=INGEST_HIGH_WATERMARK, low_watermark=INGEST_LOW_WATERMARK, metrics=None):
+        if high_watermark is not None and not 0 <= low_watermark < high_watermark:
+            raise ValueError("need 0 <= low_watermark < high_watermark")
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.metrics = metrics or IngestMetrics("ingest")
+        self._batches = []
+        self._cond = threading.Condition()
+
+    def put(self, batch):
+        """Queue a batch (None marks the end); blocks while intake is paused"""
+        with self._cond:
+            metrics = self.metrics
+            rows = 0 if batch is None else len(batch)
+            if self.high_watermark is not None and metrics.depth and metrics.depth + rows > self.high_watermark:
+                metrics.pauses += 1
+                metrics.throttled_since = time.perf_counter()
+                self._cond.wait_for(lambda: metrics.depth <= self.low_watermark)
+                metrics.throttled_seconds += time.perf_counter() - metrics.throttled_since
+                metrics.throttled_since = None
+            self._batches.append(batch)
+            metrics.depth += rows
+            metrics.peak_depth = max(metrics.peak_depth, metrics.depth)
+            self._cond.notify_all()
+
+    def get(self):
+        """Next batch, waiting for the reader; None at the end of the source"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._batches)
+            return self._batches.pop(0)
+
+    def done(self, rows):
+        """Rows of a batch from get() are now in the engine"""
+        with self._cond:
+            self.metrics.depth -= rows
+            self.metrics.rows += rows
+            self._cond.notify_all()
+
+
+class BoundedSubject(pw.io.python.ConnectorSubject):
+    """
+    Connector subject whose source is read ahead on a separate thread into a
+    WatermarkBuffer. Subclasses implement `read_batches`, yielding lists of
+    row tuples in `self.columns` order; each batch is one engine commit.
+    """
+    def __init__(self, columns, name="ingest", high_watermark=INGEST_HIGH_WATERMARK,
+                 low_watermark=INGEST_LOW_WATERMARK):
+        super().__init__()
+        self.columns = columns
+        self.metrics = IngestMetrics(name)
+        self.buffer = WatermarkBuffer(high_watermark, low_watermark, self.metrics)
+        self.error = None
+
+    @abstractmethod
+    def read_batches(self):
+        """Lists of row tuples in `self.columns` order, read on the reader thread"""
+
+    def _read_ahead(self):
+        try:
+            for batch in self.read_batches():
+                self.buffer.put(batch)
+        except Exception as error:  # surfaced on the engine thread
+            self.error = error
+        finally:
+            self.buffer.put(None)
+
+    def run(self):
+        threading.Thread(target=self._read_ahead, name=f"{self.metrics.name}-reader", daemon=True).start()
+        while (batch := self.buffer.get()) is not None:
+            for values in batch:
+                self.next(**dict(zip(self.columns, values)))
+            self.commit()
+            self.buffer.done(len(batch))
+        if self.error is not None:
+            raise self.error
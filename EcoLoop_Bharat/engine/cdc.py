@@ -0,0 +1,228 @@
+"""
+Change-Data-Capture Sink for EcoLoop Bharat
+Row-level diffs of the circular ledger (insert / update / retract) for
+downstream consumers such as circular-credit billing, written to rotating
+local files with monotonic sequence numbers and read back from a resumable
+consumer cursor.
+
+File layout (little-endian):
+    b"ECOCDC01" | u32 schema length | Arrow schema
+    frames: u32 payload length | u32 crc32 | u64 first seq | u32 rows | payload
+Each frame is one Pathway tick's diffs as a serialized Arrow record batch
+(_seq, _op, _time, _key, then the ledger columns). Files are named after
+the first sequence number they hold, so a consumer finds its file by name
+and skips whole frames by header without decoding them. A torn frame at
+the tail (writer mid-append or crashed) is ignored and overwritten on restart.
+"""
+import os
+import struct
+import typing
+import zlib
+from bisect import bisect_right
+
+import pyarrow as pa
+
+import pathway as pw
+
+MAGIC = b"ECOCDC01"
+FRAME_HEADER = struct.Struct("<IIQI")
+SCHEMA_LENGTH = struct.Struct("<I")
+
+# Diff operations (the _op column)
+INSERT, UPDATE, RETRACT = 0, 1, 2
+OPS = {INSERT: "insert", UPDATE: "update", RETRACT: "retract"}
+
+CDC_COLUMNS = [
+    pa.field('_seq', pa.uint64(), nullable=False),
+    pa.field('_op', pa.uint8(), nullable=False),
+    pa.field('_time', pa.int64(), nullable=False),
+    pa.field('_key', pa.binary(16), nullable=False),  # Pathway row key, 128 bits
+]
+ARROW_TYPES = {str: pa.string(), float: pa.float64(), int: pa.int64(), bool: pa.bool_()}
+
+
+def arrow_schema(table):
+    """CDC record schema for a Pathway table; unmapped column types are written as strings"""
+    fields = list(CDC_COLUMNS)
+    for column, hint in table.schema.typehints().items():
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        fields.append(pa.field(column, ARROW_TYPES.get(args[0] if len(args) == 1 else hint, pa.string())))
+    return pa.schema(fields)
+
+
+def segment_files(directory):
+    """(first seq, path) of every CDC file in a directory, in sequence order"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted((int(name[:-4]), os.path.join(directory, name))
+                  for name in os.listdir(directory) if name.endswith(".cdc") and name[:-4].isdigit())
+
+
+def read_frames(path, after=0):
+    """
+    The file's Arrow schema, (first seq, rows, payload) of each complete
+    frame after `after`, the last sequence number in the file, and the byte
+    offset where its valid frames end. Frames wholly at or before `after` are
+    skipped by header, without reading their payload.
+    """
+    frames, last_seq = [], None
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an EcoLoop CDC file")
+        (length,) = SCHEMA_LENGTH.unpack(f.read(SCHEMA_LENGTH.size))
+        schema = pa.ipc.read_schema(pa.py_buffer(f.read(length)))
+        end = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while end + FRAME_HEADER.size <= size:
+            length, crc, first_seq, rows = FRAME_HEADER.unpack(f.read(FRAME_HEADER.size))
+            if end + FRAME_HEADER.size + length > size:
+                break
+            if first_seq + rows - 1 <= after:
+                f.seek(length, os.SEEK_CUR)
+            else:
+                payload = f.read(length)
+                if zlib.crc32(payload) != crc:
+                    break
+                frames.append((first_seq, rows, payload))
+            end, last_seq = f.tell(), first_seq + rows - 1
+    return schema, frames, last_seq, end
+
+
+class CdcWriter:
+    """
+    Appends diff frames to rotating files under `directory`. On open it
+    resumes after the last complete frame on disk, so sequence numbers stay
+    monotonic across restarts.
+    """
+    def __init__(self, directory, schema, max_file_bytes=64 * 2**20, fsync=False):
+        self.directory = directory
+        self.schema = schema
+        self.max_file_bytes = max_file_bytes
+        self.fsync = fsync
+        self.last_seq = 0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+        segments = segment_files(directory)
+        if segments:
+            first, path = segments[-1]
+            file_schema, _, last_seq, end = read_frames(path, after=float("inf"))
+            self.last_seq = first - 1 if last_seq is None else last_seq
+            if file_schema.equals(schema):
+                # Drop any torn frame and keep appending to the live file
+                self._file = open(path, "r+b")
+                self._file.truncate(end)
+                self._file.seek(end)
+
+    def write(self, diffs):
+        """Append one frame of (op, time, key, row) diffs; returns the last sequence number"""
+        if not diffs:
+            return self.last_seq
+        if self._file is None or self._file.tell() >= self.max_file_bytes:
+            self._rotate()
+        first_seq = self.last_seq + 1
+        columns = {
+            '_seq': range(first_seq, first_seq + len(diffs)),
+            '_op': [op for op, _, _, _ in diffs],
+            '_time': [time for _, time, _, _ in diffs],
+            '_key': [int(key).to_bytes(16, "little") for _, _, key, _ in diffs],
+        }
+        for field in self.schema:
+            if field.name not in columns:
+                values = [row.get(field.name) for _, _, _, row in diffs]
+                columns[field.name] = values if field.type != pa.string() else \
+                    [None if value is None else str(value) for value in values]
+        payload = pa.RecordBatch.from_pydict(columns, schema=self.schema).serialize()
+        self._file.write(FRAME_HEADER.pack(payload.size, zlib.crc32(payload), first_seq, len(diffs)))
+        self._file.write(payload)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.last_seq += len(diffs)
+        return self.last_seq
+
+    def _rotate(self):
+        self.close()
+        path = os.path.join(self.directory, f"{self.last_seq + 1:020d}.cdc")
+        self._file = open(path, "wb")
+        schema = self.schema.serialize()
+        self._file.write(MAGIC + SCHEMA_LENGTH.pack(schema.size))
+        self._file.write(schema)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CdcSink:
+    """
+    Subscribes a CdcWriter to a Pathway table. Within a tick, a retraction
+    and an insertion of the same key become one update (carrying the new
+    row); a lone insertion is an insert and a lone retraction a retract
+    (carrying the old row).
+    """
+    def __init__(self, directory, max_file_bytes=64 * 2**20, fsync=False):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.fsync = fsync
+        self.writer = None
+        self._pending = {}  # key -> [retracted row, inserted row] for the open tick
+
+    def attach(self, table):
+        self.writer = CdcWriter(self.directory, arrow_schema(table), self.max_file_bytes, self.fsync)
+        pw.io.subscribe(table, on_change=self.on_change, on_time_end=self.on_time_end, on_end=self.writer.close)
+        return self
+
+    def on_change(self, key, row, time, is_addition):
+        self._pending.setdefault(key, [None, None])[1 if is_addition else 0] = row
+
+    def on_time_end(self, time):
+        diffs = []
+        for key, (old, new) in self._pending.items():
+            if new is None:
+                diffs.append((RETRACT, time, key, old))
+            else:
+                diffs.append((INSERT if old is None else UPDATE, time, key, new))
+        self._pending.clear()
+        self.writer.write(diffs)
+
+
+class CdcReader:
+    """
+    Resumable consumer over a CDC directory. The cursor (last processed
+    sequence number) lives in `cursor_path` and only moves on commit(), so
+    a consumer that dies re-reads from its last commit.
+    """
+    def __init__(self, directory, cursor_path=None):
+        self.directory = directory
+        self.cursor_path = cursor_path
+        self.position = 0
+        if cursor_path and os.path.exists(cursor_path):
+            with open(cursor_path) as f:
+                self.position = int(f.read().strip() or 0)
+
+    def batches(self, max_rows=None):
+        """Record batches of diffs after the cursor, in sequence order; stops at the writer's tail"""
+        segments = segment_files(self.directory)
+        # The file holding position + 1 is the last one starting at or before it
+        start = max(bisect_right([first for first, _ in segments], self.position + 1) - 1, 0)
+        read = 0
+        for _, path in segments[start:]:
+            schema, frames, _, _ = read_frames(path, after=self.position)
+            for first_seq, rows, payload in frames:
+                batch = pa.ipc.read_record_batch(pa.py_buffer(payload), schema)
+                if first_seq <= self.position:
+                    batch = batch.slice(self.position + 1 - first_seq)
+                yield batch
+                read += len(batch)
+                if max_rows is not None and read >= max_rows:
+                    return
+
+    def commit(self, seq):
+        """Record `seq` as processed (written atomically)"""
+        self.position = seq
+        if self.cursor_path:
+            tmp = f"{self.cursor_path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(str(seq))
+            os.replace(tmp, self.cursor_path)
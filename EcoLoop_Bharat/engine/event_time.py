@@ -0,0 +1,156 @@
+"""
+Event-Time Watermarks for EcoLoop Bharat
+manufacturing_date and recovery_date are event times, and scanner uploads
+from Tier-2 cities can arrive hours or days after the event. Each source has
+an allowed lateness. A source's watermark is the latest event time seen,
+minus that lateness.
+- Windows close once the watermark passes their end. Pathway's cutoff
+  behavior then finalizes them and frees their state.
+- An event that arrives for a closed window goes to a side output instead.
+- Every event's lateness is counted in a histogram.
+Like Pathway's cutoff, the watermark only moves at tick boundaries: events
+of one tick are judged against the latest event time of earlier ticks.
+"""
+import csv
+import math
+import os
+import threading
+from datetime import timedelta
+
+import pathway as pw
+
+# Event-time column of each input stream
+EVENT_TIME_COLUMNS = {'production': 'manufacturing_date', 'recovery': 'recovery_date'}
+# How far behind the latest event an event may arrive and still be counted
+ALLOWED_LATENESS = {'production': timedelta(hours=6), 'recovery': timedelta(days=2)}
+# (duration, hop) of the sliding event-time windows over each source; unwindowed sources are absent
+WINDOWS = {'recovery': (timedelta(days=7), timedelta(days=1))}
+# Lateness histogram buckets: (label, upper bound in seconds)
+LATENESS_BUCKETS = [
+    ('on_time', 0), ('<1m', 60), ('<1h', 3600), ('<6h', 6 * 3600), ('<1d', 86400), ('<2d', 2 * 86400),
+    ('<7d', 7 * 86400), ('>=7d', math.inf),
+]
+
+
+def finalizing_behavior(allowed_lateness):
+    """Pathway window behavior that finalizes windows (and frees their state) past the allowed lateness"""
+    return pw.temporal.common_behavior(cutoff=allowed_lateness.total_seconds(), keep_results=True)
+
+
+def windowed_recovery(recovery, window=WINDOWS['recovery'][0], hop=WINDOWS['recovery'][1],
+                      allowed_lateness=ALLOWED_LATENESS['recovery']):
+    """
+    Sliding event-time windows of recoveries per recovery centre, finalized
+    after the allowed lateness (allowed_lateness=None keeps every window open)
+    """
+    return recovery.windowby(
+        pw.this.recovery_date,
+        window=pw.temporal.sliding(hop=hop.total_seconds(), duration=window.total_seconds()),
+        instance=pw.this.recovery_center_id,
+        behavior=None if allowed_lateness is None else finalizing_behavior(allowed_lateness),
+    ).reduce(
+        region=pw.this._pw_instance,
+        window_start=pw.this._pw_window_start,
+        window_end=pw.this._pw_window_end,
+        recovery_count=pw.reducers.count(),
+        total_weight=pw.reducers.sum(pw.this.weight_recovered),
+        avg_credit=pw.reducers.avg(pw.this.circular_credit_amount),
+    )
+
+
+class LatenessTracker:
+    """
+    Watermark and lateness of one source, observed through pw.io.subscribe.
+    An event is late when the cutoff of the source's sliding windows (see
+    windowed_recovery) drops it from at least one of its windows: a window
+    ending at `end` takes no more events once an earlier tick has seen an
+    event time >= end + allowed lateness. Without windows an event is its own
+    zero-length window. Late events are appended to `side_output` (CSV, with
+    the lateness in seconds and the number of windows that missed them), if given.
+    """
+    def __init__(self, source, allowed_lateness=None, time_column=None, side_output=None, windows=None):
+        self.source = source
+        self.time_column = time_column or EVENT_TIME_COLUMNS[source]
+        if allowed_lateness is None:
+            allowed_lateness = ALLOWED_LATENESS[source]
+        self.allowed_lateness = allowed_lateness.total_seconds()
+        self.side_output = side_output
+        duration, hop = windows or WINDOWS.get(source, (timedelta(0), None))
+        self.window = duration.total_seconds()
+        self.hop = None if hop is None else hop.total_seconds()
+        self.max_event_time = None   # of the ticks before the open one
+        self._tick_max = None
+        self.events = 0
+        self.late_events = 0
+        self.max_lateness = 0.0
+        self.histogram = {label: 0 for label, _ in LATENESS_BUCKETS}
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+
+    def attach(self, table):
+        pw.io.subscribe(table, on_change=self.on_change, on_time_end=self.on_time_end, on_end=self.close)
+        return self
+
+    @property
+    def watermark(self):
+        """Windows ending at or before this event time are closed (None before the first tick)"""
+        return None if self.max_event_time is None else self.max_event_time - self.allowed_lateness
+
+    def window_ends(self, event_time):
+        """Ends of the windows an event falls in (windows start at multiples of the hop)"""
+        if self.hop is None:
+            return [event_time]
+        first = math.floor((event_time - self.window) / self.hop) + 1
+        return [k * self.hop + self.window for k in range(first, math.floor(event_time / self.hop) + 1)]
+
+    def on_change(self, key, row, time, is_addition):
+        event_time = row.get(self.time_column)
+        if not is_addition or event_time is None:
+            return
+        with self._lock:
+            if self._tick_max is None or event_time > self._tick_max:
+                self._tick_max = event_time
+            lateness = 0.0 if self.max_event_time is None else max(self.max_event_time - event_time, 0.0)
+            self.events += 1
+            self.max_lateness = max(self.max_lateness, lateness)
+            label = next(label for label, bound in LATENESS_BUCKETS if lateness <= bound)
+            self.histogram[label] += 1
+            if self.max_event_time is None:
+                return
+            missed = sum(end + self.allowed_lateness <= self.max_event_time for end in self.window_ends(event_time))
+            if missed:
+                self.late_events += 1
+                self._write_late(row, lateness, missed)
+
+    def on_time_end(self, time):
+        with self._lock:
+            if self._tick_max is not None and (self.max_event_time is None or self._tick_max > self.max_event_time):
+                self.max_event_time = self._tick_max
+            self._tick_max = None
+
+    def _write_late(self, row, lateness, missed):
+        if self.side_output is None:
+            return
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.side_output) or ".", exist_ok=True)
+            new_file = not os.path.exists(self.side_output)
+            self._file = open(self.side_output, "a", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row) + ['lateness_seconds', 'missed_windows'])
+            if new_file:
+                self._writer.writeheader()
+        self._writer.writerow({**row, 'lateness_seconds': round(lateness, 3), 'missed_windows': missed})
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = self._writer = None
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'source': self.source, 'watermark': self.watermark, 'allowed_lateness_seconds': self.allowed_lateness,
+                'events': self.events, 'late_events': self.late_events, 'max_lateness_seconds': self.max_lateness,
+                'lateness_histogram': dict(self.histogram),
+            }
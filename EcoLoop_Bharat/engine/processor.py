@@ -9,43 +9,227 @@ import numpy as np
 from typing import Optional, Dict, Any
 import json
 import hashlib
+import os
+import threading
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
 from schema import ProductStream, RecoveryStream, AlertStream, MaterialCategory
+from twin_api import TWIN_PRODUCT_COLUMNS, TwinIndex, start_server
+from recall_index import BatchIndex
+from cdc import CdcSink
+from event_time import ALLOWED_LATENESS, LatenessTracker, windowed_recovery
+from backpressure import INGEST_HIGH_WATERMARK, INGEST_LOW_WATERMARK, BoundedSubject
+
+# Columnar inputs, read natively for static and backfill runs
+COLUMNAR_FORMATS = {".parquet": "parquet", ".arrow": "arrow"}
+
+# Input columns each pipeline stage reads. Ingest keeps only the union for the
+# stages being run (projection pushdown); the rest stay in the source files,
+# available through EcoLoopProcessor.lookup.
+STAGE_COLUMNS = {
+    'create_circular_ledger': {
+        'production': ['product_id', 'material_type', 'material_category', 'manufacturer_name', 'weight_kg',
+                       'carbon_footprint', 'manufacturing_date'],
+        'recovery': ['product_id', 'recovery_center_name', 'recovery_date', 'circular_credit_amount'],
+    },
+    'detect_leakage_patterns': {
+        'recovery': ['recovery_date', 'recovery_center_id', 'weight_recovered', 'circular_credit_amount'],
+    },
+    'calculate_epr_compliance': {},  # reads the circular ledger only
+    'predict_future_leakage': {
+        'production': ['product_id', 'weight_kg', 'recyclable_percentage', 'material_category', 'manufacturing_date'],
+    },
+    # Optional: the digital-twin lookup API serves the full production record
+    'serve_digital_twins': {
+        'production': TWIN_PRODUCT_COLUMNS,
+    },
+    # Optional: batch recall index over batch_number
+    'index_recall_batches': {
+        'production': ['product_id', 'batch_number'],
+    },
+}
+PIPELINE_STAGES = ['create_circular_ledger', 'detect_leakage_patterns', 'calculate_epr_compliance',
+                   'predict_future_leakage']
+INPUT_SCHEMAS = {'production': ProductStream, 'recovery': RecoveryStream}
+
+def projected_schema(stream, stages=PIPELINE_STAGES):
+    """The input schema of a stream cut down to the columns the given stages read"""
+    schema = INPUT_SCHEMAS[stream]
+    needed = {column for stage in stages for column in STAGE_COLUMNS[stage].get(stream, [])}
+    return schema.without(*[column for column in schema.column_names() if column not in needed])
+
+def columnar_format(path):
+    """Parquet or Arrow format of a file (or of the shard files in a directory), or None for text inputs"""
+    if os.path.isdir(path):
+        suffixes = {os.path.splitext(name)[1].lower() for name in os.listdir(path)}
+        found = [fmt for suffix, fmt in COLUMNAR_FORMATS.items() if suffix in suffixes]
+        return found[0] if found else None
+    return COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower())
+
+class ColumnarSubject(BoundedSubject):
+    """
+    Feeds the engine typed rows from Parquet or Arrow IPC files, one record
+    batch at a time: values are decoded column by column instead of parsed
+    from text, only the schema's columns are read, and decoded batches wait in
+    a watermark-bounded buffer until the engine takes them
+    """
+    def __init__(self, files, fmt, columns, batch_size=65_536, name="columnar",
+                 high_watermark=INGEST_HIGH_WATERMARK, low_watermark=INGEST_LOW_WATERMARK):
+        super().__init__(columns, name, high_watermark, low_watermark)
+        self.files = files
+        self.fmt = fmt
+        self.batch_size = batch_size
+
+    def read_batches(self):
+        dataset = ds.dataset(self.files, format="ipc" if self.fmt == "arrow" else self.fmt)
+        for batch in dataset.to_batches(columns=self.columns, batch_size=self.batch_size):
+            yield list(zip(*(column.to_pylist() for column in batch.columns)))
+
+def read_columnar(path, schema, name=None, high_watermark=INGEST_HIGH_WATERMARK,
+                  low_watermark=INGEST_LOW_WATERMARK, subjects=None):
+    """
+    Static Pathway table from a Parquet or Arrow IPC file, or a directory of them (e.g. generator shards).
+    Intake is bounded by the watermarks (high_watermark=None reads without flow control); the
+    subject, with its IngestMetrics, is appended to `subjects` if given.
+    """
+    subject = ColumnarSubject(input_files(path), columnar_format(path), list(schema.column_names()),
+                              name=name or "columnar",
+                              high_watermark=high_watermark, low_watermark=low_watermark)
+    if subjects is not None:
+        subjects.append(subject)
+    return pw.io.python.read(subject, schema=schema, autocommit_duration_ms=None, name=name,
+                             max_backlog_size=high_watermark)
+
+def input_files(path):
+    """The files of an input: the path itself, or the shard files of a directory in order"""
+    if not os.path.isdir(path):
+        return [path]
+    fmt = columnar_format(path)
+    suffix = next((s for s, f in COLUMNAR_FORMATS.items() if f == fmt), ".csv")
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(suffix))
+
+def lookup_columns(path, key, values, columns):
+    """
+    Rows of an input file (or shard directory) whose `key` is one of `values`,
+    with the requested columns: a lazy lookup of columns ingest left behind.
+    Scans only the key and requested columns, a block or row group at a time.
+    """
+    fmt = columnar_format(path)
+    wanted = pa.array(list(values), type=pa.string())
+    names = [key] + [column for column in columns if column != key]
+    matches = []
+    for file in input_files(path):
+        if fmt:
+            dataset = ds.dataset(file, format="ipc" if fmt == "arrow" else fmt)
+            batches = dataset.to_batches(columns=names, filter=pc.field(key).isin(wanted))
+        else:
+            batches = pa_csv.open_csv(file, convert_options=pa_csv.ConvertOptions(
+                include_columns=names, column_types={key: pa.string()}
+            ))
+        for batch in batches:
+            matches.append(batch.filter(pc.is_in(batch.column(key), value_set=wanted)))
+    if not matches:
+        return pd.DataFrame(columns=names)
+    return pa.Table.from_batches(matches).to_pandas()
 
 class EcoLoopProcessor:
     """
     Main processing engine using Pathway's Rust-powered streaming
     """
-    def __init__(self):
+    def __init__(self, production_path="data/factory_output.csv", recovery_path="data/return_logs.csv",
+                 stages=PIPELINE_STAGES, cdc_dir=None):
         self.start_time = datetime.now()
+        # CSV inputs are streamed; Parquet/Arrow inputs (files or shard directories) are read statically
+        self.production_path = production_path
+        self.recovery_path = recovery_path
+        # Ingest reads only the input columns these stages use
+        self.stages = list(stages)
+        # Rotating binary change-data-capture files of ledger diffs, if set
+        self.cdc_dir = cdc_dir
+        self.production_schema = projected_schema('production', stages)
+        self.recovery_schema = projected_schema('recovery', stages)
         self.leakage_threshold_hours = 48  # CPCB standard
         self.recovery_target_percentage = 0.75  # Swachh Bharat target
+        # Ingest flow control: rows buffered per source before intake pauses, and where it resumes
+        self.ingest_high_watermark = INGEST_HIGH_WATERMARK
+        self.ingest_low_watermark = INGEST_LOW_WATERMARK
+        self.ingest_subjects = []
+        # Event-time lateness each source tolerates before its events are late
+        self.allowed_lateness = dict(ALLOWED_LATENESS)
+        self.lateness_trackers = []
         
+    def read_columnar_stream(self, path, schema, name):
+        return read_columnar(path, schema, name=name, high_watermark=self.ingest_high_watermark,
+                             low_watermark=self.ingest_low_watermark, subjects=self.ingest_subjects)
+
+    def ingest_metrics(self):
+        """Queue depth and throttling of every watermark-buffered source"""
+        return [subject.metrics.as_dict() for subject in self.ingest_subjects]
+
+    def track_lateness(self, side_output_dir="data/live"):
+        """Per-source event-time watermarks; events behind them go to late_<source>.csv"""
+        for source, stream in (('production', self.production_stream), ('recovery', self.recovery_stream)):
+            tracker = LatenessTracker(source, self.allowed_lateness[source],
+                                      side_output=os.path.join(side_output_dir, f"late_{source}.csv"))
+            self.lateness_trackers.append(tracker.attach(stream))
+        return self
+
+    def report_ingest_metrics(self, path="data/live/ingest_metrics.json", interval=5.0):
+        """Rewrite the ingest and lateness metrics to `path` every `interval` seconds from a background thread"""
+        def report():
+            while True:
+                tmp = f"{path}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump({'updated': datetime.now().isoformat(), 'sources': self.ingest_metrics(),
+                               'max_backlog_size': self.ingest_high_watermark,
+                               'lateness': [tracker.metrics() for tracker in self.lateness_trackers]}, f, indent=2)
+                os.replace(tmp, path)
+                time.sleep(interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        threading.Thread(target=report, name="ingest-metrics", daemon=True).start()
+        return self
+
     def setup_streams(self):
         """Initialize data streams from multiple sources"""
         
         # 1. Production Stream (Simulating IoT/ERP integration)
-        self.production_stream = pw.io.csv.read(
-            "data/factory_output.csv",
-            schema=ProductStream,
-            mode="streaming",
-            csv_settings=pw.io.CsvParserSettings(
-                delimiter=",",
-                quote_char='"',
-                double_quote=True,
-                escape_char="\\"
+        # Every source is bounded: the engine holds at most ingest_high_watermark unprocessed
+        # rows per connector (reads block beyond it), and columnar sources also buffer
+        # between the watermarks with metrics
+        if columnar_format(self.production_path):
+            self.production_stream = self.read_columnar_stream(self.production_path, self.production_schema,
+                                                               "production")
+        else:
+            self.production_stream = pw.io.csv.read(
+                self.production_path,
+                schema=self.production_schema,
+                mode="streaming",
+                csv_settings=pw.io.CsvParserSettings(
+                    delimiter=",",
+                    quote_char='"',
+                    double_quote=True,
+                    escape_char="\\"
+                ),
+                max_backlog_size=self.ingest_high_watermark
             )
-        )
         
         # 2. Recovery Stream (Simulating QR scan data from recycling centers)
-        self.recovery_stream = pw.io.csv.read(
-            "data/return_logs.csv",
-            schema=RecoveryStream,
-            mode="streaming",
-            csv_settings=pw.io.CsvParserSettings(
-                delimiter=",",
-                quote_char='"'
+        if columnar_format(self.recovery_path):
+            self.recovery_stream = self.read_columnar_stream(self.recovery_path, self.recovery_schema, "recovery")
+        else:
+            self.recovery_stream = pw.io.csv.read(
+                self.recovery_path,
+                schema=self.recovery_schema,
+                mode="streaming",
+                csv_settings=pw.io.CsvParserSettings(
+                    delimiter=",",
+                    quote_char='"'
+                ),
+                max_backlog_size=self.ingest_high_watermark
             )
-        )
         
         # 3. Real-time Kafka Stream (For live demo)
         try:
@@ -56,8 +240,9 @@ class EcoLoopProcessor:
                     "auto.offset.reset": "latest"
                 },
                 topic="waste-stream",
-                schema=ProductStream,
-                format="json"
+                schema=self.production_schema,
+                format="json",
+                max_backlog_size=self.ingest_high_watermark
             )
             print("✅ Connected to Kafka stream")
         except:
@@ -65,6 +250,15 @@ class EcoLoopProcessor:
         
         return self
 
+    def lookup(self, stream, values, columns, key="product_id"):
+        """
+        Input columns ingest left out (e.g. qr_code_hash, recovered_by) for a
+        few keys, read on demand from the source of the 'production' or
+        'recovery' stream
+        """
+        path = self.production_path if stream == "production" else self.recovery_path
+        return lookup_columns(path, key, values, columns)
+
     def create_circular_ledger(self):
         """
         Real-time join of production vs recovery
@@ -125,18 +319,15 @@ class EcoLoopProcessor:
         Demonstrates Pathway's windowing and pattern matching
         """
         
-        # Time-windowed analysis (7-day rolling window)
+        # Time-windowed analysis (7-day rolling window on recovery_date, event time)
         window_size = timedelta(days=7)
         
-        # Calculate recovery rates by region
-        regional_recovery = self.recovery_stream.windowby(
-            pw.this.recovery_date,
-            window=window_size
-        ).reduce(
-            region=pw.this.recovery_center_id,
-            recovery_count=pw.reducers.count(),
-            total_weight=pw.reducers.sum(pw.this.weight_recovered),
-            avg_credit=pw.reducers.avg(pw.this.circular_credit_amount)
+        # Calculate recovery rates by region; a window is final (and its state freed)
+        # once the recovery watermark passes its end, later scans go to the side output
+        self.regional_recovery = windowed_recovery(
+            self.recovery_stream,
+            window=window_size,
+            allowed_lateness=self.allowed_lateness['recovery']
         )
         
         # Identify leakage hotspots (products >48hrs unrecovered)
@@ -229,6 +420,27 @@ class EcoLoopProcessor:
         
         return self
 
+    def serve_digital_twins(self, host="127.0.0.1", port=8766):
+        """
+        Digital-twin lookup API: a TwinIndex kept in step with the production
+        stream and the circular ledger, served over HTTP while the engine runs
+        """
+        self.twin_index = TwinIndex()
+        self.twin_index.attach(self.production_stream, self.circular_ledger)
+        self.twin_server = start_server(self.twin_index, host, port, batches=getattr(self, 'batch_index', None))
+        print(f"🔎 Digital twin API on http://{host}:{port}/twins/{{product_id}}")
+        return self
+
+    def index_recall_batches(self):
+        """
+        Batch recall index: batch_number -> products and their recovered /
+        leaked / in-transit counts, maintained from the ledger as it changes
+        (served on /batches/{batch_number} alongside the twin API)
+        """
+        self.batch_index = BatchIndex()
+        self.batch_index.attach(self.production_stream, self.circular_ledger)
+        return self
+
     def run_pipeline(self):
         """
         Execute the complete Pathway pipeline
@@ -243,6 +455,10 @@ class EcoLoopProcessor:
          .detect_leakage_patterns()
          .calculate_epr_compliance()
          .predict_future_leakage())
+        if 'index_recall_batches' in self.stages:
+            self.index_recall_batches()
+        if 'serve_digital_twins' in self.stages:
+            self.serve_digital_twins()
         
         # Output streams for dashboard
         pw.io.csv.write(
@@ -266,6 +482,14 @@ class EcoLoopProcessor:
             "data/live/streaming_output.jsonl"
         )
         
+        # Event-time lateness and ingest flow-control metrics (late_*.csv, ingest_metrics.json)
+        self.track_lateness()
+        self.report_ingest_metrics()
+        
+        # Row-level ledger diffs for CDC consumers (billing)
+        if self.cdc_dir:
+            self.cdc_sink = CdcSink(self.cdc_dir).attach(self.circular_ledger)
+        
         # WebSocket output for live updates
         pw.io.websocket.connect(
             self.circular_ledger,
@@ -283,5 +507,33 @@ class EcoLoopProcessor:
 
 # Entry point
 if __name__ == "__main__":
-    processor = EcoLoopProcessor()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="EcoLoop Bharat processing engine")
+    parser.add_argument("--production", default="data/factory_output.csv",
+                        help="production CSV (streamed) or Parquet/Arrow file or shard directory (static backfill)")
+    parser.add_argument("--recovery", default="data/return_logs.csv",
+                        help="recovery CSV (streamed) or Parquet/Arrow file or shard directory (static backfill)")
+    parser.add_argument("--twin-api", action="store_true",
+                        help="serve the digital-twin lookup API on port 8766 (reads the full production record)")
+    parser.add_argument("--recall-index", action="store_true",
+                        help="index products by batch_number for recalls (served on /batches/ with --twin-api)")
+    parser.add_argument("--cdc", metavar="DIR",
+                        help="write circular-ledger diffs as rotating binary CDC files to DIR (e.g. data/live/cdc)")
+    parser.add_argument("--high-watermark", type=int, default=INGEST_HIGH_WATERMARK,
+                        help="rows buffered per source before intake pauses (also the engine's max backlog)")
+    parser.add_argument("--low-watermark", type=int, default=INGEST_LOW_WATERMARK,
+                        help="buffered rows at which paused intake resumes")
+    parser.add_argument("--allowed-lateness-hours", type=float, nargs=2, metavar=("PRODUCTION", "RECOVERY"),
+                        help="event-time lateness tolerated per source before events go to data/live/late_*.csv")
+    args = parser.parse_args()
+
+    stages = (PIPELINE_STAGES + (['index_recall_batches'] if args.recall_index else [])
+              + (['serve_digital_twins'] if args.twin_api else []))
+    processor = EcoLoopProcessor(args.production, args.recovery, stages=stages, cdc_dir=args.cdc)
+    processor.ingest_high_watermark = args.high_watermark
+    processor.ingest_low_watermark = args.low_watermark
+    if args.allowed_lateness_hours:
+        processor.allowed_lateness = {source: timedelta(hours=hours) for source, hours
+                                      in zip(('production', 'recovery'), args.allowed_lateness_hours)}
     processor.run_pipeline()
\ No newline at end of file
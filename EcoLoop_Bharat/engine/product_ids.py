@@ -0,0 +1,150 @@
+"""
+Product ID scheme for EcoLoop Bharat
+Snowflake-style IDs: a 64-bit value made of the manufacturing time in
+milliseconds, the manufacturer number and a per-millisecond sequence,
+written as 13 Crockford base32 characters. IDs sort by manufacturing time
+(as strings too), never collide within a manufacturer, and decode to
+manufacturer and time without a lookup, so the engine can range-partition
+and prune on product_id alone.
+"""
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Milliseconds are counted from 2024-01-01 UTC: 42 bits last until 2163
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+TIME_BITS = 42
+MANUFACTURER_BITS = 10
+SEQUENCE_BITS = 12
+
+ID_LENGTH = 13
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32, in ASCII order
+MANUFACTURER_ID_FORMAT = "M{:03d}"
+
+_ALPHABET_BYTES = np.frombuffer(ALPHABET.encode(), dtype=np.uint8)
+_DIGIT_VALUES = np.full(256, -1, dtype=np.int64)
+_DIGIT_VALUES[_ALPHABET_BYTES] = np.arange(32)
+_SHIFTS = np.array([60 - 5 * i for i in range(ID_LENGTH)], dtype=np.uint64)
+
+
+def manufacturer_number(manufacturer_id):
+    """Number of a manufacturer ID ("M007", or already 7 -> 7), as packed into product IDs"""
+    number = int(str(manufacturer_id).lstrip("M"))
+    if not 0 <= number < 1 << MANUFACTURER_BITS:
+        raise ValueError(f"Manufacturer {manufacturer_id} does not fit in {MANUFACTURER_BITS} bits")
+    return number
+
+
+def manufacturer_id(number):
+    """Manufacturer ID of a packed manufacturer number (7 -> "M007")"""
+    return MANUFACTURER_ID_FORMAT.format(int(number))
+
+
+class ProductIdAllocator:
+    """
+    Hands out product IDs that increase strictly within each manufacturer.
+    A product gets the millisecond it was made in and the next free sequence
+    number; when a manufacturer makes more than 4096 products in a
+    millisecond, the surplus borrows the following milliseconds, as Snowflake
+    does. IDs are only time-accurate if products are allocated in time order.
+    `after` makes every ID fall in a later millisecond than that timestamp,
+    so generators working on consecutive time slices cannot collide.
+    """
+    def __init__(self, after=None):
+        self.floor = 0 if after is None else (int(_milliseconds(after)) + 1) << SEQUENCE_BITS
+        # Last (time << SEQUENCE_BITS | sequence) handed out, per manufacturer number
+        self.last = {}
+
+    def allocate(self, timestamps, manufacturer_ids):
+        """
+        IDs for products made at `timestamps` (epoch seconds) by `manufacturer_ids`
+        (IDs or their numbers), as a string array
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        unique_ids, inverse = np.unique(np.asarray(manufacturer_ids), return_inverse=True)
+        numbers = np.array([manufacturer_number(m) for m in unique_ids], dtype=np.int64)[inverse.reshape(-1)]
+        if len(numbers) == 1:
+            numbers = np.repeat(numbers, len(timestamps))
+        slots = _milliseconds(timestamps) << SEQUENCE_BITS
+
+        values = np.empty(len(timestamps), dtype=np.uint64)
+        order = np.argsort(numbers, kind="stable")
+        groups, starts = np.unique(numbers[order], return_index=True)
+        for number, start, end in zip(groups, starts, list(starts[1:]) + [len(order)]):
+            rows = order[start:end]
+            # slot_i = max(slot_{i-1} + 1, time_i): a running maximum once the row index is taken out
+            i = np.arange(len(rows))
+            floor = max(self.floor, self.last.get(int(number), -1) + 1)
+            slot = np.maximum.accumulate(np.maximum(slots[rows] - i, floor)) + i
+            self.last[int(number)] = int(slot[-1])
+            values[rows] = _pack(slot, number)
+        return format_product_ids(values)
+
+    def next(self, manufacturer_id, timestamp=None):
+        """One product ID, for a product made now (or at `timestamp`)"""
+        timestamp = datetime.now().timestamp() if timestamp is None else timestamp
+        return str(self.allocate([timestamp], [manufacturer_id])[0])
+
+
+def format_product_ids(values):
+    """Packed 64-bit ID values as 13-character base32 strings"""
+    values = np.asarray(values, dtype=np.uint64)
+    digits = _ALPHABET_BYTES[(values[:, None] >> _SHIFTS) & np.uint64(31)]
+    return digits.astype(np.uint8).view(f"S{ID_LENGTH}").ravel().astype(f"U{ID_LENGTH}")
+
+
+def parse_product_ids(product_ids):
+    """13-character product IDs back to their packed 64-bit values"""
+    product_ids = np.asarray(product_ids, dtype=str).reshape(-1)
+    if (np.char.str_len(product_ids) != ID_LENGTH).any():
+        raise ValueError("Not a product ID in the EcoLoop scheme")
+    raw = product_ids.astype(f"S{ID_LENGTH}")
+    digits = _DIGIT_VALUES[raw.view(np.uint8).reshape(len(raw), ID_LENGTH)]
+    if (digits < 0).any() or (digits[:, 0] > 15).any():
+        raise ValueError("Not a product ID in the EcoLoop scheme")
+    return np.bitwise_or.reduce(digits.astype(np.uint64) << _SHIFTS, axis=1)
+
+
+def decode_product_ids(product_ids):
+    """Manufacturer numbers, manufacturing timestamps (ms resolution) and sequences of product IDs"""
+    values = parse_product_ids(product_ids)
+    sequence = values & np.uint64((1 << SEQUENCE_BITS) - 1)
+    number = (values >> np.uint64(SEQUENCE_BITS)) & np.uint64((1 << MANUFACTURER_BITS) - 1)
+    millis = values >> np.uint64(SEQUENCE_BITS + MANUFACTURER_BITS)
+    return number.astype(np.int64), EPOCH + millis.astype(np.int64) / 1000, sequence.astype(np.int64)
+
+
+def decode_product_id(product_id):
+    """(manufacturer ID, manufacturing timestamp, sequence) of one product ID"""
+    numbers, timestamps, sequences = decode_product_ids([product_id])
+    return manufacturer_id(numbers[0]), float(timestamps[0]), int(sequences[0])
+
+
+def id_range(start, end):
+    """
+    Product-ID bounds of a manufacturing-time range: products made in
+    [start, end) have low <= product_id < high, for range partitioning and
+    pruning on product_id. Products pushed into a later millisecond by a
+    sequence overflow may fall just past `high`.
+    """
+    shift = SEQUENCE_BITS + MANUFACTURER_BITS
+    low = int(_milliseconds(max(start, EPOCH))) << shift
+    high = min(math.ceil((end - EPOCH) * 1000), (1 << TIME_BITS) - 1) << shift
+    low, high = format_product_ids([low, max(low, high)])
+    return str(low), str(high)
+
+
+def _milliseconds(timestamps):
+    millis = np.floor((np.asarray(timestamps, dtype=float) - EPOCH) * 1000).astype(np.int64)
+    if (millis < 0).any() or (millis >= 1 << TIME_BITS).any():
+        raise ValueError("Product timestamps must fall between 2024 and 2163")
+    return millis
+
+
+def _pack(slot, number):
+    """(time << SEQUENCE_BITS | sequence) and a manufacturer number as one 64-bit value"""
+    slot = slot.astype(np.uint64)
+    sequence_mask = np.uint64((1 << SEQUENCE_BITS) - 1)
+    return (((slot >> np.uint64(SEQUENCE_BITS)) << np.uint64(SEQUENCE_BITS + MANUFACTURER_BITS))
+            | (np.uint64(number) << np.uint64(SEQUENCE_BITS)) | (slot & sequence_mask))
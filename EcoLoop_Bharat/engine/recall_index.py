@@ -0,0 +1,119 @@
+"""
+Batch Recall Index for EcoLoop Bharat
+A secondary index from batch_number to the batch's products and their current
+recovery state, kept incrementally from the production stream and the
+circular ledger through pw.io.subscribe. When a contaminated batch is
+recalled, its members and recovered / leaked / in-transit counts are read in
+time proportional to the batch, never the ledger.
+"""
+import threading
+
+import pathway as pw
+
+# Recovery states a batch is counted by
+RECALL_STATES = ('recovered', 'leaked', 'in_transit')
+
+
+def recall_state(entries):
+    """A product's state from its ledger entries ((recovered, status) pairs)"""
+    if any(recovered for recovered, _ in entries):
+        return 'recovered'
+    if any((status or "").startswith("LEAKED") for _, status in entries):
+        return 'leaked'
+    return 'in_transit'  # also products the ledger has not reached yet
+
+
+class BatchIndex:
+    """
+    batch_number -> member product IDs, with per-batch state counts updated
+    on every change. `on_product` and `on_ledger` are pw.io.subscribe
+    callbacks; either stream may reach a product first.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._members = {}    # batch_number -> {product_id: None}, in arrival order
+        self._batch_of = {}   # product_id -> batch_number
+        self._ledger = {}     # product_id -> {pathway key: (recovered, status)}
+        self._state = {}      # product_id -> recall state
+        self._counts = {}     # batch_number -> {state: count}
+
+    def attach(self, products, ledger):
+        """Subscribe to a production table (product_id, batch_number) and the circular ledger"""
+        pw.io.subscribe(products, on_change=self.on_product)
+        pw.io.subscribe(ledger, on_change=self.on_ledger)
+
+    def on_product(self, key, row, time, is_addition):
+        product_id, batch_number = row['product_id'], row['batch_number']
+        with self._lock:
+            if is_addition:
+                self._remove(product_id)
+                self._batch_of[product_id] = batch_number
+                self._members.setdefault(batch_number, {})[product_id] = None
+                self._count(batch_number, self.state(product_id), 1)
+            elif self._batch_of.get(product_id) == batch_number:
+                # Only the row it retracts: an update's insertion may have arrived first
+                self._remove(product_id)
+
+    def on_ledger(self, key, row, time, is_addition):
+        product_id = row['product_id']
+        with self._lock:
+            entries = self._ledger.setdefault(product_id, {})
+            entry = (bool(row['recovered']), row['status'])
+            if is_addition:
+                entries[key] = entry
+            elif entries.get(key) == entry:
+                del entries[key]
+            if not entries:
+                del self._ledger[product_id]
+            old, new = self.state(product_id), recall_state(entries.values())
+            if new == 'in_transit':
+                self._state.pop(product_id, None)
+            else:
+                self._state[product_id] = new
+            batch_number = self._batch_of.get(product_id)
+            if batch_number is not None and old != new:
+                self._count(batch_number, old, -1)
+                self._count(batch_number, new, 1)
+
+    def _remove(self, product_id):
+        batch_number = self._batch_of.pop(product_id, None)
+        if batch_number is None:
+            return
+        members = self._members[batch_number]
+        del members[product_id]
+        self._count(batch_number, self.state(product_id), -1)
+        if not members:
+            del self._members[batch_number]
+            del self._counts[batch_number]
+
+    def _count(self, batch_number, state, delta):
+        counts = self._counts.setdefault(batch_number, dict.fromkeys(RECALL_STATES, 0))
+        counts[state] += delta
+
+    def state(self, product_id):
+        """Current recall state of a product"""
+        return self._state.get(product_id, 'in_transit')
+
+    def counts(self, batch_number):
+        """{'total', 'recovered', 'leaked', 'in_transit'} for a batch, or None; O(1)"""
+        with self._lock:
+            counts = self._counts.get(batch_number)
+            if counts is None:
+                return None
+            return {'total': len(self._members[batch_number]), **counts}
+
+    def batch(self, batch_number):
+        """A batch's counts and every member with its state, or None; O(batch size)"""
+        with self._lock:
+            members = self._members.get(batch_number)
+            if members is None:
+                return None
+            return {
+                'batch_number': batch_number,
+                'total': len(members),
+                **self._counts[batch_number],
+                'products': [{'product_id': product_id, 'state': self.state(product_id)} for product_id in members],
+            }
+
+    def __len__(self):
+        return len(self._members)
@@ -0,0 +1,191 @@
+"""
+Versioned Snapshot Publication for EcoLoop Bharat
+Bulk outputs (factory output, return logs) are published as immutable
+versions: files are moved into a fresh `v<version>` directory that is
+renamed into place, then a small manifest with the version, row counts and
+checksums is swapped in with os.replace. Readers pick a version from the
+manifest, so they never see a partly written file and can tell "nothing
+changed" from one small JSON read.
+
+    data/snapshots/
+        MANIFEST.json         # {"version": 7, "files": {name: {path, rows, bytes, sha256}}}
+        v00000006/ ...        # kept for readers still on the previous version
+        v00000007/factory_output.csv, return_logs.csv
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SNAPSHOT_ROOT = "data/snapshots"
+MANIFEST = "MANIFEST.json"
+
+
+def version_dir(version, root=SNAPSHOT_ROOT):
+    return os.path.join(root, f"v{version:08d}")
+
+
+def _files(path):
+    if os.path.isdir(path):
+        return [os.path.join(d, f) for d, _, files in sorted(os.walk(path)) for f in sorted(files)]
+    return [path]
+
+
+def _count_rows(path):
+    if path.endswith(".parquet"):
+        return pq.ParquetFile(path).metadata.num_rows
+    if path.endswith(".arrow"):
+        reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    if path.endswith(".csv"):
+        with open(path, "rb") as f:
+            newlines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+        return max(newlines - 1, 0)  # header line
+    return None
+
+
+def describe(path):
+    """Row count (CSV, Parquet, Arrow; summed over a shard directory), size and SHA-256 of an output"""
+    digest, size, rows = hashlib.sha256(), 0, 0
+    for file in _files(path):
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+                size += len(block)
+        count = _count_rows(file)
+        rows = None if rows is None or count is None else rows + count
+    return {'rows': rows, 'bytes': size, 'sha256': digest.hexdigest()}
+
+
+def read_manifest(root=SNAPSHOT_ROOT):
+    """The current manifest, or None before the first publication"""
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_version(root=SNAPSHOT_ROOT):
+    """Current published version (a cheap change signal for readers), or None"""
+    manifest = read_manifest(root)
+    return None if manifest is None else manifest['version']
+
+
+def snapshot_path(name, version=None, root=SNAPSHOT_ROOT):
+    """
+    Path of an output in a published version (the current one by default),
+    or None if it is not published. A pinned version that has been pruned
+    resolves to the current one.
+    """
+    if version is not None:
+        path = os.path.join(version_dir(version, root), name)
+        if os.path.exists(path):
+            return path
+    manifest = read_manifest(root)
+    if manifest is None or name not in manifest['files']:
+        return None
+    return os.path.join(root, manifest['files'][name]['path'])
+
+
+def published_versions(root=SNAPSHOT_ROOT):
+    """Versions still on disk, oldest first"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(name[1:]) for name in os.listdir(root) if name.startswith("v") and name[1:].isdigit())
+
+
+def snapshot_files(version, root=SNAPSHOT_ROOT):
+    """{name: path} of every output of a version still on disk ({} once it is pruned)"""
+    directory = version_dir(version, root)
+    if not os.path.isdir(directory):
+        return {}
+    return {name: os.path.join(directory, name) for name in sorted(os.listdir(directory))}
+
+
+def verify_snapshot(manifest, root=SNAPSHOT_ROOT):
+    """True if every file of a manifest still matches its recorded checksum"""
+    return all(
+        describe(os.path.join(root, entry['path']))['sha256'] == entry['sha256']
+        for entry in manifest['files'].values()
+    )
+
+
+@contextmanager
+def _publish_lock(root):
+    with open(os.path.join(root, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _replace_with_link(source, target):
+    # Hard link when possible (no copy); either way the target is swapped in atomically.
+    # Shard directories are only read through the snapshot.
+    if os.path.isdir(source):
+        return
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+def publish_snapshot(sources, root=SNAPSHOT_ROOT, link_to=None, keep=3, move=True):
+    """
+    Publish {name: path} outputs (files or shard directories) as the next
+    immutable version and return its manifest. Sources are moved in (or
+    copied with move=False); `link_to` maps names to legacy paths that are
+    re-pointed at the published files so their readers also switch
+    atomically. The newest `keep` versions are kept.
+    """
+    os.makedirs(root, exist_ok=True)
+    stage = os.path.join(root, f".stage-{os.getpid()}")
+    shutil.rmtree(stage, ignore_errors=True)
+    os.makedirs(stage)
+    files = {}
+    for name, source in sources.items():
+        target = os.path.join(stage, name)
+        if move:
+            shutil.move(source, target)
+        elif os.path.isdir(source):
+            shutil.copytree(source, target)
+        else:
+            shutil.copyfile(source, target)
+        files[name] = describe(target)
+
+    with _publish_lock(root):
+        current = snapshot_version(root) or 0
+        version = current + 1
+        while os.path.exists(version_dir(version, root)):
+            version += 1
+        os.rename(stage, version_dir(version, root))
+        for name, entry in files.items():
+            entry['path'] = os.path.relpath(os.path.join(version_dir(version, root), name), root)
+        manifest = {
+            'version': version,
+            'published_at': datetime.now(timezone.utc).isoformat(),
+            'files': files,
+        }
+        tmp = os.path.join(root, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, os.path.join(root, MANIFEST))
+
+        for name, target in (link_to or {}).items():
+            _replace_with_link(os.path.join(root, files[name]['path']), target)
+
+        # Drop superseded versions; readers that still hold them open keep their files
+        versions = sorted(name for name in os.listdir(root) if name.startswith("v") and name[1:].isdigit())
+        for old in versions[:-keep]:
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return manifest
@@ -0,0 +1,159 @@
+"""
+Digital Twin Lookup API for EcoLoop Bharat
+An in-memory index of every product's circular history (production record,
+recovery status, centre, credits), fed incrementally from the engine's
+production stream and circular ledger through pw.io.subscribe, and served
+over HTTP for field staff and scanner apps.
+Point lookups are hash-index hits on product_id or qr_code_hash: each
+product's twin is rebuilt as an immutable dict when its rows change, so
+readers never lock or assemble anything.
+"""
+import threading
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+
+import pathway as pw
+
+# Production columns a twin carries (everything the scanner apps show)
+TWIN_PRODUCT_COLUMNS = [
+    'product_id', 'qr_code_hash', 'batch_number', 'manufacturer_id', 'manufacturer_name', 'material_type',
+    'material_category', 'weight_kg', 'carbon_footprint', 'recyclable_percentage', 'manufacturing_date',
+    'expiry_date', 'gps_lat', 'gps_lon',
+]
+# Circular-ledger columns a twin carries, one entry per ledger row
+TWIN_LEDGER_COLUMNS = ['recovered', 'status', 'recovery_center', 'recovery_date', 'circular_credit', 'carbon_saved']
+
+
+class TwinIndex:
+    """
+    Hash indexes from product_id and qr_code_hash to each product's current
+    twin. `on_product` and `on_ledger` are pw.io.subscribe callbacks; updates
+    arrive as a retraction and an insertion of the same Pathway key.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()  # serializes writers only
+        self._products = {}   # product_id -> production record
+        self._ledger = {}     # product_id -> {pathway key: ledger entry}
+        self._twins = {}      # product_id -> twin, replaced whole on every change
+        self._by_qr = {}      # qr_code_hash -> product_id
+        self.updates = 0
+
+    def attach(self, products, ledger):
+        """Subscribe to a production table and the circular ledger (both keyed by product_id columns)"""
+        pw.io.subscribe(products, on_change=self.on_product)
+        pw.io.subscribe(ledger, on_change=self.on_ledger)
+
+    def on_product(self, key, row, time, is_addition):
+        product_id = row['product_id']
+        with self._lock:
+            record = {column: row.get(column) for column in TWIN_PRODUCT_COLUMNS}
+            if is_addition:
+                self._products[product_id] = record
+                if record['qr_code_hash']:
+                    self._by_qr[record['qr_code_hash']] = product_id
+            else:
+                # Only the row it retracts: an update's insertion may have arrived first
+                current = self._products.get(product_id)
+                if current == record:
+                    del self._products[product_id]
+                    current = None
+                qr = record['qr_code_hash']
+                if self._by_qr.get(qr) == product_id and (current is None or current['qr_code_hash'] != qr):
+                    del self._by_qr[qr]
+            self._rebuild(product_id)
+
+    def on_ledger(self, key, row, time, is_addition):
+        product_id = row['product_id']
+        with self._lock:
+            entries = self._ledger.setdefault(product_id, {})
+            entry = {column: row.get(column) for column in TWIN_LEDGER_COLUMNS}
+            if is_addition:
+                entries[key] = entry
+            elif entries.get(key) == entry:
+                del entries[key]
+            if not entries:
+                del self._ledger[product_id]
+            self._rebuild(product_id)
+
+    def _rebuild(self, product_id):
+        self.updates += 1
+        product = self._products.get(product_id)
+        entries = list(self._ledger.get(product_id, {}).values())
+        if product is None and not entries:
+            self._twins.pop(product_id, None)
+            return
+        recoveries = sorted(
+            ({'recovery_center': e['recovery_center'], 'recovery_date': e['recovery_date'],
+              'circular_credit': e['circular_credit'], 'carbon_saved': e['carbon_saved']}
+             for e in entries if e['recovered']),
+            key=lambda r: r['recovery_date'] or 0.0
+        )
+        status = "RECOVERED" if recoveries else (entries[0]['status'] if entries else "UNKNOWN")
+        self._twins[product_id] = {
+            'product_id': product_id,
+            'product': product,
+            'status': status,
+            'recovered': bool(recoveries),
+            'recoveries': recoveries,
+            'total_circular_credit': round(sum(r['circular_credit'] or 0.0 for r in recoveries), 2),
+            'total_carbon_saved': round(sum(r['carbon_saved'] or 0.0 for r in recoveries), 2),
+        }
+
+    def get(self, product_id):
+        """The twin of a product, or None"""
+        return self._twins.get(product_id)
+
+    def by_qr(self, qr_code_hash):
+        """The twin of the product with this QR code, or None"""
+        product_id = self._by_qr.get(qr_code_hash)
+        return None if product_id is None else self._twins.get(product_id)
+
+    def __len__(self):
+        return len(self._twins)
+
+
+def create_app(index, batches=None):
+    """
+    FastAPI app serving twins from a TwinIndex, and batch recalls from a
+    recall_index.BatchIndex when one is given. Handlers are coroutines (a
+    lookup never blocks, so no thread-pool hop) and return the twin dicts as
+    JSON directly, since they hold plain values already.
+    """
+    app = FastAPI(title="EcoLoop Bharat Digital Twins")
+
+    @app.get("/twins/{product_id}")
+    async def twin(product_id: str):
+        found = index.get(product_id)
+        if found is None:
+            raise HTTPException(status_code=404, detail=f"Unknown product {product_id}")
+        return JSONResponse(found)
+
+    @app.get("/twins/qr/{qr_code_hash}")
+    async def twin_by_qr(qr_code_hash: str):
+        found = index.by_qr(qr_code_hash)
+        if found is None:
+            raise HTTPException(status_code=404, detail=f"Unknown QR code {qr_code_hash}")
+        return JSONResponse(found)
+
+    if batches is not None:
+        @app.get("/batches/{batch_number}")
+        async def batch(batch_number: str):
+            found = batches.batch(batch_number)
+            if found is None:
+                raise HTTPException(status_code=404, detail=f"Unknown batch {batch_number}")
+            return JSONResponse(found)
+
+    @app.get("/health")
+    async def health():
+        return {'twins': len(index), 'updates': index.updates}
+
+    return app
+
+
+def start_server(index, host="127.0.0.1", port=8766, batches=None):
+    """Serve a TwinIndex (and optional BatchIndex) from a background thread; returns the uvicorn server"""
+    server = uvicorn.Server(uvicorn.Config(create_app(index, batches), host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="twin-api", daemon=True).start()
+    return server
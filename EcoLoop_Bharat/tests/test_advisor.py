@@ -0,0 +1,75 @@
+import unittest
+import pandas as pd
+from ui.advisor import AdvisorEngine, parse_query
+from ui.timeseries_store import TimeSeriesStore
+
+VOCABULARY = {
+    'city': ['Delhi NCR', 'Chennai', 'Mumbai'],
+    'material': ['Plastic', 'E-Waste'],
+    'manufacturer': ['Tata Steel'],
+}
+
+class TestAdvisor(unittest.TestCase):
+    def setUp(self):
+        self.store = TimeSeriesStore(pd.DataFrame({
+            'zone': ['South', 'North', 'South', 'West'],
+            'city': ['Chennai', 'Delhi NCR', 'Chennai', 'Mumbai'],
+            'material_type': ['Plastic', 'E-Waste', 'E-Waste', 'Plastic'],
+            'waste_category': ['Medium-Value', 'High-Value', 'High-Value', 'Medium-Value'],
+            'manufacturer_name': ['Tata Steel', 'Amul Dairy', 'Tata Steel', 'ITC Limited'],
+            'recovered': [True, False, True, False],
+            'days_in_transit': [3.0, 45.0, 12.0, 31.0],
+            'carbon_footprint': [10.0, 20.0, 30.0, 40.0],
+            'circular_credit_amount': [100.0, 0.0, 300.0, 0.0],
+            'manufacturing_date': [1767571200.0, 1767574800.0, 1767578400.0, 1767582000.0],
+        }))
+        self.filters = {'zone': 'All', 'city': 'All', 'material': 'All', 'category': 'All',
+                        'status': 'All', 'manufacturer': 'All'}
+
+    def test_parse_query_extracts_intent_and_entities(self):
+        self.assertEqual(parse_query("Show me non-compliant manufacturers in South India", VOCABULARY),
+                         ('non_compliant', {'zone': 'South'}))
+        self.assertEqual(parse_query("What's the recovery trend for E-Waste?", VOCABULARY),
+                         ('material_recovery', {'material': 'E-Waste'}))
+        self.assertEqual(parse_query("Predict leakage risk for next week", VOCABULARY)[0], 'prediction')
+        self.assertEqual(parse_query("plastic makers in delhi ncr below 40%", VOCABULARY),
+                         ('non_compliant', {'city': 'Delhi NCR', 'material': 'Plastic', 'threshold': 40.0}))
+        self.assertEqual(parse_query("how is battery doing?", {'material': ['Lithium Battery', 'Steel']}),
+                         ('material_recovery', {'material': ('Lithium Battery',)}))
+        self.assertEqual(parse_query("hello", VOCABULARY), (None, {}))
+
+    def test_answers_are_cached_per_version_with_eviction(self):
+        engine = AdvisorEngine(max_entries=2)
+        answer, _, cached = engine.ask("Which cities have the highest leakage rate?", self.filters, 1, self.store)
+        self.assertFalse(cached)
+        self.assertIn("Delhi NCR", answer)
+        _, _, cached = engine.ask("which cities have the  highest leakage rate?", self.filters, 1, self.store)
+        self.assertTrue(cached)
+        engine.ask("Which zones need immediate intervention?", self.filters, 1, self.store)
+        engine.ask("Which zones need immediate intervention?", self.filters, 2, self.store)
+        _, _, cached = engine.ask("Which cities have the highest leakage rate?", self.filters, 1, self.store)
+        self.assertFalse(cached)
+        self.assertEqual(len(engine._cache), 2)
+
+    def test_entities_narrow_the_filters(self):
+        engine = AdvisorEngine()
+        answer, _, _ = engine.ask("Show me non-compliant manufacturers in West India", self.filters, 1, self.store)
+        self.assertIn("Found **1**", answer)
+        self.assertIn("ITC Limited", answer)
+        answer, _, _ = engine.ask("What's the recovery trend for E-Waste?", self.filters, 1, self.store)
+        self.assertIn("Recovery rate: 50.0%", answer)
+
+    def test_entities_never_widen_the_sidebar_selection(self):
+        engine = AdvisorEngine()
+        south = dict(self.filters, zone='South')
+        answer, _, _ = engine.ask("Show me non-compliant manufacturers in West India", south, 1, self.store)
+        self.assertIn("**West** is outside your sidebar zone selection (**South**)", answer)
+        e_waste = dict(self.filters, material='E-Waste')
+        answer, _, _ = engine.ask("How is plastic doing?", e_waste, 1, self.store)
+        self.assertIn("outside your sidebar material selection", answer)
+        # A city in the selected zone is narrowed as before
+        answer, _, _ = engine.ask("What's the recovery trend in Chennai?", south, 1, self.store)
+        self.assertIn("**Plastic**: 100.0% recovery (1 products)", answer)
+
+if __name__ == '__main__':
+    unittest.main()
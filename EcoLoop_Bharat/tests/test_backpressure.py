@@ -0,0 +1,48 @@
+import threading
+import time
+import unittest
+from engine.backpressure import WatermarkBuffer
+
+class TestWatermarkBuffer(unittest.TestCase):
+    def test_intake_pauses_at_high_and_resumes_at_low(self):
+        buffer = WatermarkBuffer(high_watermark=10, low_watermark=4)
+        resumed_at = []
+
+        def reader():
+            for n in range(20):
+                paused = buffer.metrics.depth + 2 > 10
+                buffer.put([n, n])
+                if paused:
+                    resumed_at.append(buffer.metrics.depth - 2)
+            buffer.put(None)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(buffer.metrics.depth, 10)  # reader is parked at the high watermark
+        self.assertTrue(buffer.metrics.as_dict()['throttled'])
+        rows = 0
+        while (batch := buffer.get()) is not None:
+            time.sleep(0.002)  # slow downstream
+            buffer.done(len(batch))
+            rows += len(batch)
+        thread.join()
+
+        metrics = buffer.metrics.as_dict()
+        self.assertEqual((rows, metrics['rows'], metrics['depth']), (40, 40, 0))
+        self.assertLessEqual(metrics['peak_depth'], 10)
+        self.assertGreater(metrics['pauses'], 0)
+        self.assertGreater(metrics['throttled_seconds'], 0)
+        self.assertTrue(resumed_at and all(depth <= 4 for depth in resumed_at))
+
+    def test_unbounded_and_invalid_watermarks(self):
+        buffer = WatermarkBuffer(high_watermark=None)
+        for n in range(100):
+            buffer.put([n])
+        self.assertEqual(buffer.metrics.pauses, 0)
+        self.assertEqual(buffer.metrics.peak_depth, 100)
+        with self.assertRaises(ValueError):
+            WatermarkBuffer(high_watermark=4, low_watermark=4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# epr_export imports its ui siblings by bare name, as the dashboard does
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ui"))
+from epr_export import ExportJob, SelectionExportJob
+from ledger_store import publish_ledger
+
+class FailingExport(ExportJob):
+    def _reduce(self, spill_dir, tmp_path):
+        with open(tmp_path, "w") as f:
+            f.write("manufacturer\n")
+        raise OSError("disk full")
+
+class TestEprExport(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        rows = 5000
+        self.df = pd.DataFrame({
+            'manufacturer_name': rng.choice([f"Manufacturer-{i}" for i in range(40)], rows),
+            'zone': rng.choice(['North', 'South'], rows),
+            'city': 'Chennai',
+            'material_type': 'Plastic',
+            'waste_category': 'Medium-Value',
+            'recovered': rng.random(rows) < 0.7,
+            'days_in_transit': rng.uniform(1, 60, rows),
+            'carbon_footprint': rng.uniform(1, 10, rows),
+            'circular_credit_amount': rng.uniform(10, 100, rows),
+            'manufacturing_date': rng.uniform(1767225600.0, 1767225600.0 + 20 * 86400, rows),
+        })
+
+    def run_export(self, cache_dir, fmt, job_class=ExportJob, **kwargs):
+        path = publish_ledger(self.df, ("v", 1), cache_dir=os.path.join(cache_dir, "cache"))
+        job = job_class(path, fmt, export_dir=os.path.join(cache_dir, "exports"), batch_rows=300,
+                        **kwargs).start()
+        job.join(timeout=60)
+        self.assertEqual(job.state, "done", job.message)
+        self.assertEqual(job.progress, 1.0)
+        return job
+
+    def test_streamed_report_matches_in_memory_groupby(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            job = self.run_export(tmp, "csv", filters=('South', 'All', 'All', 'All', 'All', 'All'), buckets=4)
+            report = pd.read_csv(job.path).set_index('manufacturer').sort_index()
+            south = self.df[self.df['zone'] == 'South']
+            expected = south.groupby('manufacturer_name').agg(
+                total=('recovered', 'count'), recovered=('recovered', 'sum'),
+                credits=('circular_credit_amount', 'sum'))
+            self.assertEqual(job.rows_scanned, len(self.df))
+            self.assertEqual(report.index.tolist(), expected.index.tolist())
+            np.testing.assert_array_equal(report['total_products'], expected['total'])
+            np.testing.assert_array_equal(report['recovered_products'], expected['recovered'])
+            np.testing.assert_allclose(report['circular_credits'], expected['credits'], atol=0.01)
+            self.assertTrue(report['quality_score'].isna().all())
+
+    def test_parquet_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            job = self.run_export(tmp, "parquet", buckets=4)
+            report = pd.read_parquet(job.path)
+            self.assertEqual(report['total_products'].sum(), len(self.df))
+            self.assertEqual(set(report['compliance_status']) - {'Compliant', 'At Risk', 'Non-Compliant'}, set())
+
+    def test_selection_export_streams_filtered_rows(self):
+        start = 1767225600.0 + 5 * 86400
+        expected = self.df[(self.df['zone'] == 'North') & ~self.df['recovered'] & (self.df['manufacturing_date'] >= start)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt, read in (("csv", pd.read_csv), ("parquet", pd.read_parquet)):
+                job = self.run_export(tmp, fmt, job_class=SelectionExportJob,
+                                      filters=('North', 'All', 'All', 'All', 'Leaked Only', 'All'),
+                                      time_range=(start, None))
+                exported = read(job.path)
+                self.assertTrue(os.path.basename(job.path).startswith("ecoloop_selection_"))
+                self.assertEqual(job.rows_written, len(expected))
+                self.assertEqual(list(exported.columns), list(self.df.columns))
+                np.testing.assert_allclose(exported['manufacturing_date'].sort_values(),
+                                           expected['manufacturing_date'].sort_values())
+
+    def test_failed_or_cancelled_export_leaves_no_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = publish_ledger(self.df, ("v", 1), cache_dir=os.path.join(tmp, "cache"))
+            export_dir = os.path.join(tmp, "exports")
+            failed = FailingExport(path, export_dir=export_dir, batch_rows=300).start()
+            failed.join(timeout=60)
+            self.assertEqual(failed.state, "failed")
+            self.assertIn("disk full", failed.message)
+            for job_class in (ExportJob, SelectionExportJob):
+                job = job_class(path, export_dir=export_dir, batch_rows=300)
+                job.cancel()
+                job.start().join(timeout=60)
+                self.assertEqual(job.state, "cancelled")
+            self.assertEqual(os.listdir(export_dir), [])
+
+    def test_export_survives_its_ledger_version_being_dropped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, "cache")
+            path = publish_ledger(self.df, ("v", 1), cache_dir=cache_dir)
+            jobs = [job_class(path, export_dir=os.path.join(tmp, "exports"), batch_rows=300)
+                    for job_class in (ExportJob, SelectionExportJob)]
+            # Two newer versions push this one past keep=2 before the jobs run
+            publish_ledger(self.df, ("v", 2), cache_dir=cache_dir)
+            publish_ledger(self.df, ("v", 3), cache_dir=cache_dir)
+            self.assertFalse(os.path.exists(path))
+            for job in jobs:
+                job.start().join(timeout=60)
+                self.assertEqual(job.state, "done", job.message)
+                self.assertEqual(job.rows_scanned, len(self.df))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+import pandas as pd
+import pathway as pw
+from pathway.internals.parse_graph import G
+from engine.event_time import LatenessTracker, windowed_recovery
+
+DAY = 86400.0
+
+class Recovery(pw.Schema):
+    recovery_center_id: str
+    recovery_date: float
+    weight_recovered: float
+    circular_credit_amount: float
+
+def recoveries():
+    # Arrival order (__time__) differs from event order: a scan from day 1 arrives after day 10
+    return pw.debug.table_from_markdown(f'''
+        recovery_center_id | recovery_date | weight_recovered | circular_credit_amount | __time__
+        RC-01              | {1 * DAY}     | 1.0              | 10.0                   | 2
+        RC-01              | {3 * DAY}     | 2.0              | 20.0                   | 4
+        RC-01              | {10 * DAY}    | 4.0              | 40.0                   | 6
+        RC-01              | {9.5 * DAY}   | 8.0              | 80.0                   | 8
+        RC-01              | {1.5 * DAY}   | 16.0             | 160.0                  | 10
+    ''', schema=Recovery)
+
+class TestEventTime(unittest.TestCase):
+    def tearDown(self):
+        G.clear()
+
+    def test_windows_are_finalized_after_allowed_lateness(self):
+        windows = windowed_recovery(recoveries(), window=timedelta(days=2), hop=timedelta(days=1),
+                                    allowed_lateness=timedelta(days=1))
+        result = pw.debug.table_to_pandas(windows)
+        weights = dict(zip(result['window_start'] / DAY, result['total_weight']))
+        # The day-1.5 scan arrived when the watermark was at day 9: its windows were already final
+        self.assertEqual(weights[0.0], 1.0)
+        self.assertEqual(weights[1.0], 1.0)
+        # The day-9.5 scan was within the lateness and counted
+        self.assertEqual(weights[9.0], 12.0)
+        self.assertEqual(set(result['region']), {'RC-01'})
+
+    def test_tracker_watermark_histogram_and_side_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            side_output = os.path.join(tmp, "late_recovery.csv")
+            tracker = LatenessTracker('recovery', timedelta(days=1), side_output=side_output,
+                                      windows=(timedelta(days=2), timedelta(days=1))).attach(recoveries())
+            pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+            late = pd.read_csv(side_output)
+        metrics = tracker.metrics()
+        self.assertEqual((metrics['events'], metrics['late_events']), (5, 1))
+        self.assertEqual(tracker.watermark, 9 * DAY)
+        self.assertEqual(metrics['lateness_histogram']['on_time'], 3)
+        self.assertEqual(metrics['lateness_histogram']['<1d'], 1)
+        self.assertEqual(metrics['lateness_histogram']['<7d'], 0)
+        self.assertEqual(metrics['lateness_histogram']['>=7d'], 1)
+        self.assertEqual(late['weight_recovered'].tolist(), [16.0])
+        self.assertEqual(late['lateness_seconds'].tolist(), [8.5 * DAY])
+        self.assertEqual(late['missed_windows'].tolist(), [2])
+        self.assertEqual(LatenessTracker('recovery', timedelta(0)).allowed_lateness, 0.0)
+        self.assertEqual(LatenessTracker('recovery').allowed_lateness, 2 * DAY)
+
+    def test_side_output_follows_window_cutoff_within_a_tick(self):
+        # Day-10 and day-1 scans share a tick: the cutoff only sees day 10 from the next tick on
+        scans = pw.debug.table_from_markdown(f'''
+            recovery_center_id | recovery_date | weight_recovered | circular_credit_amount | __time__
+            RC-01              | {1 * DAY}     | 1.0              | 10.0                   | 2
+            RC-01              | {10 * DAY}    | 2.0              | 20.0                   | 2
+            RC-02              | {1 * DAY}     | 4.0              | 40.0                   | 2
+            RC-03              | {1 * DAY}     | 8.0              | 80.0                   | 2
+            RC-02              | {1.5 * DAY}   | 16.0             | 160.0                  | 4
+        ''', schema=Recovery)
+        windows = (timedelta(days=2), timedelta(days=1))
+        result = pw.debug.table_to_pandas(windowed_recovery(scans, *windows, allowed_lateness=timedelta(days=1)))
+        weights = {(region, start / DAY): weight
+                   for region, start, weight in zip(result['region'], result['window_start'], result['total_weight'])}
+        with tempfile.TemporaryDirectory() as tmp:
+            side_output = os.path.join(tmp, "late_recovery.csv")
+            tracker = LatenessTracker('recovery', timedelta(days=1), side_output=side_output,
+                                      windows=windows).attach(scans)
+            pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+            late = pd.read_csv(side_output)
+        # Every day-1 scan was counted by the windows and none is reported late
+        self.assertEqual((weights[('RC-01', 0.0)], weights[('RC-02', 0.0)], weights[('RC-03', 0.0)]), (1.0, 4.0, 8.0))
+        self.assertEqual(tracker.metrics()['lateness_histogram']['on_time'], 4)
+        # The day-1.5 scan of the next tick was dropped from both its windows
+        self.assertNotIn(20.0, weights.values())
+        self.assertEqual(late['weight_recovered'].tolist(), [16.0])
+        self.assertEqual(late['missed_windows'].tolist(), [2])
+        self.assertEqual(tracker.watermark, 9 * DAY)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ui.forecasting import city_outlook, forecast_recovery, holt_forecast
+from ui.timeseries_store import TimeSeriesStore
+
+class TestForecasting(unittest.TestCase):
+    def test_holt_tracks_linear_trends_per_series(self):
+        t = np.arange(30, dtype=float)
+        y = np.vstack([10 + 2 * t, np.full(30, 5.0), np.maximum(40 - t, 0)])
+        forecasts, _, _, _ = holt_forecast(y, horizon=3)
+        np.testing.assert_allclose(forecasts[0], [70, 72, 74], rtol=0.02)
+        np.testing.assert_allclose(forecasts[1], [5, 5, 5])
+        self.assertTrue((forecasts >= 0).all())
+        self.assertLess(forecasts[2, 0], 11)
+
+    def test_city_outlook_from_store(self):
+        days = np.repeat(np.arange(28), 10) * 86400.0 + 1767225600.0
+        rows = len(days)
+        store = TimeSeriesStore(pd.DataFrame({
+            'zone': 'South',
+            'city': np.where(np.arange(rows) % 2 == 0, 'Chennai', 'Bengaluru'),
+            'material_type': 'Plastic',
+            'waste_category': 'Medium-Value',
+            'manufacturer_name': 'Tata Steel',
+            # Chennai always recovers; Bengaluru only every other day
+            'recovered': (np.arange(rows) % 2 == 0) | (days // 86400 % 2 == 0),
+            'days_in_transit': 5.0,
+            'carbon_footprint': 1.0,
+            'circular_credit_amount': 10.0,
+            'manufacturing_date': days,
+        }))
+        forecasts = forecast_recovery(store, horizon=7, history_days=28)
+        self.assertEqual(len(forecasts), 2)
+        outlook = city_outlook(forecasts).set_index('City')
+        self.assertAlmostEqual(outlook.loc['Chennai', 'Current'], 100.0)
+        self.assertAlmostEqual(outlook.loc['Chennai', 'Predicted'], 100.0, places=3)
+        self.assertTrue(40 <= outlook.loc['Bengaluru', 'Predicted'] <= 60)
+        selection = pd.DataFrame({'city': ['Chennai'], 'material_type': ['Plastic']})
+        self.assertEqual(city_outlook(forecasts, selection)['City'].tolist(), ['Chennai'])
+
+if __name__ == '__main__':
+    unittest.main()
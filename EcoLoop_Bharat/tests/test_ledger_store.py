@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+from ui.ledger_store import LedgerStore, apply_filters, filter_expression, publish_ledger
+
+class TestLedgerStore(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'zone': ['South', 'North', 'South', 'West'],
+            'city': ['Chennai', 'Delhi NCR', 'Bengaluru', 'Mumbai'],
+            'material_type': ['Plastic', 'Metal', 'Plastic', 'Glass'],
+            'waste_category': ['Medium-Value', 'High-Value', 'Medium-Value', 'Low-Value'],
+            'manufacturer_name': ['Tata Steel', 'Amul Dairy', 'Tata Steel', 'ITC Limited'],
+            'recovered': [True, False, False, False],
+            'days_in_transit': [3.0, 45.0, 12.0, 31.0],
+            # 2026-01-01, 2026-01-02, 2026-01-01, 2026-01-05 (UTC)
+            'manufacturing_date': [1767225600.0, 1767312000.0, 1767229200.0, 1767571200.0],
+        })
+
+    def test_published_ledger_round_trips(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = publish_ledger(self.df, ("v", 1), cache_dir=cache_dir)
+            self.assertEqual(publish_ledger(self.df, ("v", 1), cache_dir=cache_dir), path)
+            store = LedgerStore(path)
+            self.assertEqual(len(store), 4)
+            self.assertEqual(sorted(store.frame['city'].tolist()), sorted(self.df['city'].tolist()))
+            self.assertEqual(os.listdir(cache_dir), [os.path.basename(path)])
+
+    def test_time_window_reads_only_overlapping_partitions(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = publish_ledger(self.df, ("v", 1), cache_dir=cache_dir)
+            store = LedgerStore(path, start_day='2026-01-02', end_day='2026-01-04')
+            self.assertEqual(store.total_partitions, 3)
+            self.assertEqual(store.partitions, ['day=2026-01-02.arrow'])
+            self.assertEqual(store.frame['city'].tolist(), ['Delhi NCR'])
+
+    def test_apply_filters(self):
+        self.assertIs(apply_filters(self.df, 'All', 'All', 'All', 'All', 'All', 'All'), self.df)
+        south = apply_filters(self.df, 'South', 'All', 'Plastic', 'All', 'Leaked Only', 'All')
+        self.assertEqual(south['city'].tolist(), ['Bengaluru'])
+        critical = apply_filters(self.df, 'All', 'All', 'All', 'All', 'Critical Leaks (>30 days)', 'All')
+        self.assertEqual(critical['city'].tolist(), ['Delhi NCR', 'Mumbai'])
+        window = apply_filters(self.df, 'All', 'All', 'All', 'All', 'All', 'All',
+                               time_range=(1767225600.0, 1767229200.0))
+        self.assertEqual(window['city'].tolist(), ['Chennai'])
+
+    def test_filter_expression_matches_apply_filters(self):
+        df = pd.concat([self.df, pd.DataFrame({'zone': [None], 'city': ['Pune'], 'recovered': [None], 'days_in_transit': [50.0],
+                                               'manufacturing_date': [1767225600.0]})], ignore_index=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        frame = table.to_pandas(types_mapper=pd.ArrowDtype)
+        self.assertIsNone(filter_expression('All', 'All', 'All', 'All', 'All', 'All'))
+        for filters, time_range in [
+            (('South', 'All', 'Plastic', 'All', 'Leaked Only', 'All'), None),
+            (('All', 'All', 'All', 'All', 'Critical Leaks (>30 days)', 'All'), None),
+            (('All', 'All', 'All', 'All', 'Recovered Only', 'Tata Steel'), None),
+            (('All', 'All', 'All', 'Medium-Value', 'All', 'All'), (1767225600.0, 1767229200.0)),
+            (('All', 'All', 'All', 'All', 'All', 'All'), (None, 1767312000.0)),
+        ]:
+            expected = apply_filters(frame, *filters, time_range=time_range)
+            streamed = table.filter(filter_expression(*filters, time_range=time_range))
+            self.assertEqual(streamed.column('city').to_pylist(), expected['city'].tolist(), filters)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# live_emitter imports the generator by bare name, as when run from data/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+from live_emitter import FileSink, LiveEmitter
+
+class ListSink:
+    def __init__(self):
+        self.tables = {'production': [], 'recovery': []}
+
+    def write(self, stream, table):
+        self.tables[stream].append(table.to_pandas())
+
+    def frame(self, stream):
+        return pd.concat(self.tables[stream], ignore_index=True)
+
+    def close(self):
+        pass
+
+class TestLiveEmitter(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2026, 10, 1, 0, 0, 0)
+
+    def run_days(self, emitter, days, step=3 * 3600):
+        for sim_ts in np.arange(emitter.sim_start + step, emitter.sim_start + days * 86400 + step, step):
+            emitter.advance(sim_ts)
+
+    def test_intensity_follows_the_day_and_bursts(self):
+        emitter = LiveEmitter(ListSink(), diurnal_amplitude=0.5, peak_hour=11, bursts=[(24, 24, 3.0)],
+                              start=self.start, log_path=None)
+        day = self.start.timestamp()
+        self.assertAlmostEqual(float(emitter.intensity(day + 11 * 3600)), 1.5)
+        self.assertAlmostEqual(float(emitter.intensity(day + 23 * 3600)), 0.5)
+        self.assertAlmostEqual(float(emitter.intensity(day + 35 * 3600)), 4.5)
+        self.assertAlmostEqual(float(emitter.intensity(day + 59 * 3600)), 1.5)
+
+    def test_poisson_arrivals_and_delayed_out_of_order_recoveries(self):
+        sink = ListSink()
+        # 1 product per simulated minute on average
+        emitter = LiveEmitter(sink, rate=1.0, speed=60.0, late_fraction=0.3, late_mean_hours=24,
+                              start=self.start, log_path=None)
+        self.run_days(emitter, 40)
+        products = sink.frame('production')
+        recoveries = sink.frame('recovery')
+        self.assertAlmostEqual(len(products) / (40 * 1440), 1.0, delta=0.03)
+        self.assertTrue(products['manufacturing_date'].is_monotonic_increasing)
+        self.assertTrue(products['product_id'].is_unique)
+
+        # Products from the last month may still be pending; the first week is fully resolved
+        first_week = products['manufacturing_date'] < emitter.sim_start + 7 * 86400
+        resolved = recoveries['product_id'].isin(products.loc[first_week, 'product_id'])
+        self.assertAlmostEqual(resolved.sum() / first_week.sum(), 0.65, delta=0.03)
+        delay = (recoveries['recovery_date'].to_numpy()
+                 - products.set_index('product_id').loc[recoveries['product_id'], 'manufacturing_date'].to_numpy())
+        self.assertTrue(((delay > 86400 - 1) & (delay < 30 * 86400 + 1)).all())
+        self.assertTrue(0.25 < emitter.emitted['late'] / len(recoveries) < 0.35)
+        # Late reports arrive after recoveries that happened later
+        self.assertFalse(recoveries['recovery_date'].is_monotonic_increasing)
+        self.assertEqual(emitter.emitted['recovery'], len(recoveries))
+
+    def test_later_days_recoveries_are_spilled(self):
+        sink = ListSink()
+        emitter = LiveEmitter(sink, rate=1.0, speed=60.0, start=self.start, log_path=None)
+        self.run_days(emitter, 5)
+        spill_dir = emitter._spill_dir
+        # Only the current day's recoveries are in memory; the next 30 days wait on disk
+        self.assertGreater(len(os.listdir(spill_dir)), 20)
+        self.assertLess(emitter.pending_in_memory * 10, emitter.pending)
+        released = emitter.emitted['recovery']
+        for sim_ts in emitter.sim_now + np.arange(1, 25) * 3600:
+            emitter.advance(sim_ts)
+        self.assertGreater(emitter.emitted['recovery'], released)
+        emitter.close()
+        self.assertFalse(os.path.exists(spill_dir))
+
+    def test_file_sink_appends_csv_with_one_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for _ in range(2):
+                emitter = LiveEmitter(FileSink(tmp, "csv"), rate=1.0, speed=60.0, start=self.start, log_path=None)
+                self.run_days(emitter, 1)
+                emitter.sink.close()
+            products = pd.read_csv(os.path.join(tmp, "new_products.csv"))
+        self.assertEqual(len(products), 2 * emitter.emitted['production'])
+        self.assertEqual(products['weight_kg'].dtype, float)
+
+if __name__ == '__main__':
+    unittest.main()
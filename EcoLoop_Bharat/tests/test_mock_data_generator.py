@@ -0,0 +1,162 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data.mock_data_generator import WORKLOAD_PROFILES, MockDataGenerator
+from engine.product_ids import decode_product_ids
+
+class TestMockDataGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = MockDataGenerator()
+        self.now = datetime(2026, 3, 1, 12, 0, 0)
+
+    def test_chunks_are_sorted_across_chunk_boundaries(self):
+        chunks = list(self.generator.factory_chunks(10_000, chunk_size=3_000, now=self.now))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(sum(c.num_rows for c in chunks), 10_000)
+        df = pd.concat([c.to_pandas() for c in chunks], ignore_index=True)
+        self.assertTrue(df['manufacturing_date'].is_monotonic_increasing)
+        self.assertTrue(df['product_id'].is_unique)
+        self.assertTrue(df['qr_code_hash'].str.fullmatch(r"[0-9a-f]{16}").all())
+        # Product IDs decode to their manufacturer and manufacturing time
+        numbers, timestamps, _ = decode_product_ids(df['product_id'])
+        np.testing.assert_array_equal(numbers, df['manufacturer_id'].str[1:].astype(int))
+        np.testing.assert_allclose(timestamps, df['manufacturing_date'], atol=2e-3)
+        for _, own in df.groupby('manufacturer_id')['product_id']:
+            self.assertTrue(own.is_monotonic_increasing)
+
+        # Same distributions as the per-row generator: Exp(0.2) days, capped at 30
+        days = (df['manufacturing_date'] - (self.now.timestamp() - 30 * 86400)) / 86400
+        self.assertTrue(((days >= 0) & (days <= 30)).all())
+        self.assertAlmostEqual(days.mean(), 5.0, delta=0.3)
+        perishable = df['material_category'].isin(['organic', 'paper'])
+        self.assertTrue(df.loc[perishable, 'expiry_date'].notna().all())
+        self.assertTrue(df.loc[~perishable, 'expiry_date'].isna().all())
+        np.testing.assert_allclose(df['carbon_footprint'] / df['weight_kg'],
+                                   df['material_type'].map({m['type']: m['carbon_per_kg'] for m in self.generator.materials}),
+                                   rtol=0.05)
+
+    def test_same_seed_reproduces_the_data(self):
+        first = list(self.generator.factory_chunks(2_000, chunk_size=500, seed=7, now=self.now))
+        second = list(self.generator.factory_chunks(2_000, chunk_size=500, seed=7, now=self.now))
+        other = next(self.generator.factory_chunks(2_000, chunk_size=500, seed=8, now=self.now))
+        self.assertTrue(all(a.equals(b) for a, b in zip(first, second)))
+        self.assertNotEqual(first[0].column('qr_code_hash')[0], other.column('qr_code_hash')[0])
+
+    def test_written_csv_matches_legacy_columns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.generator.write_factory_output(1_000, path=os.path.join(tmp, "factory.csv"), chunk_size=300,
+                                                     streaming_updates=False)
+            df = pd.read_csv(path)
+        legacy_columns = pd.read_csv("data/factory_output.csv", nrows=1).columns.tolist()
+        self.assertEqual(df.columns.tolist(), legacy_columns)
+        self.assertEqual(len(df), 1_000)
+
+    def test_shards_do_not_depend_on_worker_count(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            single = self.generator.write_factory_output(5_000, path=os.path.join(tmp, "factory.csv"), chunk_size=1_000,
+                                                         streaming_updates=False, now=self.now)
+            contents = []
+            for workers in (1, 3):
+                paths = self.generator.write_factory_shards(5_000, out_dir=os.path.join(tmp, f"w{workers}"),
+                                                            shard_size=1_000, workers=workers, now=self.now)
+                self.assertEqual(len(paths), 5)
+                contents.append([open(p, 'rb').read() for p in paths])
+            combined = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+            pd.testing.assert_frame_equal(combined, pd.read_csv(single))
+        self.assertEqual(contents[0], contents[1])
+        self.assertTrue(combined['manufacturing_date'].is_monotonic_increasing)
+
+    def test_return_logs_are_streamed_in_recovery_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            production_path = self.generator.write_factory_output(
+                20_000, path=os.path.join(tmp, "factory.csv"), streaming_updates=False
+            )
+            chunks = list(self.generator.return_log_chunks(production_path, recovery_rate=0.65, now=self.now,
+                                                           block_size=64 << 10))
+            production = pd.read_csv(production_path).set_index('product_id')
+        self.assertGreater(len(chunks), 2)
+        logs = pd.concat([c.to_pandas() for c in chunks], ignore_index=True)
+        self.assertTrue(logs['recovery_date'].is_monotonic_increasing)
+        self.assertTrue(logs['product_id'].is_unique)
+        self.assertAlmostEqual(len(logs) / len(production), 0.65, delta=0.02)
+
+        products = production.loc[logs['product_id']]
+        delay = (logs['recovery_date'].to_numpy() - products['manufacturing_date'].to_numpy()) / 86400
+        np.testing.assert_allclose(delay, np.round(delay), atol=1e-6)
+        self.assertTrue(((np.round(delay) >= 1) & (np.round(delay) <= 30)).all())
+        ratio = logs['weight_recovered'].to_numpy() / products['weight_kg'].to_numpy()
+        self.assertTrue(((ratio > 0.69) & (ratio < 0.99)).all())
+        self.assertAlmostEqual((logs['condition'] == 'good').mean(), 0.4, delta=0.02)
+
+    def test_return_logs_need_production_in_time_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "factory.csv")
+            next(self.generator.factory_chunks(5_000, now=self.now)).to_pandas()[::-1].to_csv(path, index=False)
+            with self.assertRaises(ValueError):
+                list(self.generator.return_log_chunks(path, now=self.now, block_size=64 << 10))
+
+    def test_columnar_outputs_match_csv(self):
+        readers = {'csv': pd.read_csv, 'parquet': pd.read_parquet, 'arrow': pd.read_feather}
+        products, logs, sizes = {}, {}, {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for ext, read in readers.items():
+                production_path = self.generator.write_factory_output(
+                    5_000, path=os.path.join(tmp, f"factory.{ext}"), chunk_size=2_000, streaming_updates=False,
+                    now=self.now
+                )
+                recovery_path = self.generator.write_return_logs(production_path, os.path.join(tmp, f"returns.{ext}"))
+                products[ext], logs[ext] = read(production_path), read(recovery_path)
+                sizes[ext] = os.path.getsize(production_path)
+        for ext in ('parquet', 'arrow'):
+            # Typed columns: HSN codes stay strings, as the engine schema has them
+            self.assertEqual(products[ext]['gst_hsn_code'].map(type).unique().tolist(), [str])
+            pd.testing.assert_frame_equal(products[ext].astype({'gst_hsn_code': int}), products['csv'],
+                                          check_dtype=False)
+            # Recoveries are drawn per input batch, and batches differ between formats
+            self.assertEqual(logs[ext].columns.tolist(), logs['csv'].columns.tolist())
+            self.assertAlmostEqual(len(logs[ext]) / 5_000, 0.65, delta=0.03)
+            self.assertTrue(logs[ext]['product_id'].isin(products[ext]['product_id']).all())
+            self.assertLess(sizes[ext], sizes['csv'] / 2)
+
+    def test_skewed_profile_concentrates_manufacturers_and_centers(self):
+        generator = MockDataGenerator('skewed')
+        products = next(generator.factory_chunks(20_000, now=self.now)).to_pandas()
+        weights = 1 / np.arange(1, len(generator.manufacturers) + 1) ** WORKLOAD_PROFILES['skewed']['manufacturer_skew']
+        shares = products['manufacturer_id'].value_counts(normalize=True)
+        np.testing.assert_allclose(shares[[m['id'] for m in generator.manufacturers]], weights / weights.sum(), atol=0.01)
+
+        logs = generator.recovery_records(products, 0.65, np.random.default_rng(1), self.now.timestamp()).to_pandas()
+        self.assertGreater(logs['recovery_center_id'].value_counts(normalize=True)['R001'], 0.3)
+
+    def test_hot_products_and_late_reports(self):
+        generator = MockDataGenerator({'hot_fraction': 0.01, 'hot_scans': 20, 'late_fraction': 0.2, 'late_mean_days': 3})
+        with tempfile.TemporaryDirectory() as tmp:
+            production_path = generator.write_factory_output(
+                20_000, path=os.path.join(tmp, "factory.csv"), streaming_updates=False, now=self.now
+            )
+            logs = pd.concat([c.to_pandas() for c in generator.return_log_chunks(
+                production_path, now=self.now, block_size=64 << 10
+            )], ignore_index=True)
+
+        # About 200 hot products, each scanned 20 times on average
+        scans = logs['product_id'].value_counts()
+        hot = scans[scans > 5]
+        self.assertAlmostEqual(len(hot) / 20_000, 0.01, delta=0.003)
+        self.assertAlmostEqual(hot.mean(), 20, delta=1.5)
+        self.assertTrue((scans[scans <= 5] == 1).all())
+        # Late reports sit among recoveries that happened after them
+        recovery_date = logs['recovery_date'].to_numpy()
+        behind = recovery_date < np.maximum.accumulate(recovery_date)
+        self.assertAlmostEqual(behind.mean(), 0.2, delta=0.05)
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MockDataGenerator('viral')
+        with self.assertRaises(ValueError):
+            MockDataGenerator({'hot_keys': 0.1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from engine.product_ids import (
+    ID_LENGTH, ProductIdAllocator, decode_product_id, decode_product_ids, id_range, parse_product_ids
+)
+
+class TestProductIds(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        # 50,000 products in two seconds: about 8 per millisecond per manufacturer
+        self.timestamps = np.sort(1772366400.0 + rng.uniform(0, 2, 50_000))
+        self.manufacturers = rng.choice(['M001', 'M002', 'M003'], 50_000)
+
+    def test_ids_are_unique_monotonic_and_decodable(self):
+        ids = ProductIdAllocator().allocate(self.timestamps, self.manufacturers)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue((np.char.str_len(ids) == ID_LENGTH).all())
+        for mfg in ('M001', 'M002', 'M003'):
+            own = ids[self.manufacturers == mfg]
+            self.assertTrue((own[1:] > own[:-1]).all())
+
+        numbers, timestamps, sequences = decode_product_ids(ids)
+        np.testing.assert_array_equal(numbers, [int(m[1:]) for m in self.manufacturers])
+        self.assertTrue(((self.timestamps - timestamps >= 0) & (self.timestamps - timestamps < 1e-3 + 1e-6)).all())
+        self.assertEqual(decode_product_id(ids[0])[0], self.manufacturers[0])
+        self.assertEqual(int(sequences.min()), 0)
+
+    def test_sequence_overflow_borrows_the_next_milliseconds(self):
+        allocator = ProductIdAllocator()
+        ids = allocator.allocate(np.full(5_000, 1772366400.0), ['M007'])
+        later = allocator.allocate([1772366400.0005], ['M007'])
+        _, timestamps, sequences = decode_product_ids(np.append(ids, later))
+        self.assertEqual(len(set(ids)), 5_000)
+        self.assertTrue((later[0] > ids).all())
+        self.assertEqual(int(sequences.max()), 4095)
+        self.assertAlmostEqual(float(timestamps[-1]), 1772366400.001, places=6)
+
+    def test_allocators_after_a_boundary_do_not_collide(self):
+        boundary = self.timestamps[25_000]
+        first = ProductIdAllocator().allocate(self.timestamps[:25_000], self.manufacturers[:25_000])
+        second = ProductIdAllocator(after=boundary).allocate(self.timestamps[25_000:], self.manufacturers[25_000:])
+        self.assertLess(max(first), min(second))
+
+    def test_id_range_prunes_by_manufacturing_time(self):
+        ids = ProductIdAllocator().allocate(self.timestamps, self.manufacturers)
+        start, end = 1772366400.5, 1772366401.25
+        low, high = id_range(start, end)
+        in_range = (ids >= low) & (ids < high)
+        np.testing.assert_array_equal(in_range, (self.timestamps >= start) & (self.timestamps < end))
+
+    def test_malformed_ids_are_rejected(self):
+        for bad in (['PETM00120260301'], ['0000000000O00'], ['Z000000000000']):
+            with self.assertRaises(ValueError):
+                parse_product_ids(bad)
+
+if __name__ == '__main__':
+    unittest.main()
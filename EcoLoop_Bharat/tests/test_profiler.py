@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+from ui.profiler import RenderProfiler
+
+class FakeMessage:
+    def __init__(self, size):
+        self.size = size
+
+    def ByteSize(self):
+        return self.size
+
+class FakeContext:
+    def __init__(self):
+        self.sent = []
+        self._enqueue = self.sent.append
+
+class TestRenderProfiler(unittest.TestCase):
+    def test_disabled_profiler_is_a_no_op(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "profile.jsonl")
+            ctx = FakeContext()
+            profiler = RenderProfiler(False, log_path=log_path, ctx=ctx)
+            profiler.lap("header")
+            with profiler.section("load", rows=lambda: 1 / 0):
+                pass
+            self.assertIs(profiler.section("load"), profiler.section("other"))
+            self.assertIsNone(profiler.finish())
+            self.assertEqual(profiler.records, [])
+            self.assertEqual(ctx._enqueue, ctx.sent.append)
+            self.assertFalse(os.path.exists(log_path))
+
+    def test_regions_ops_and_payloads_are_logged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "logs", "profile.jsonl")
+            ctx = FakeContext()
+            # A hook left behind by an interrupted rerun is replaced, not stacked
+            RenderProfiler(True, log_path=log_path, ctx=ctx)
+            profiler = RenderProfiler(True, log_path=log_path, ctx=ctx)
+            profiler.lap("header")
+            ctx._enqueue(FakeMessage(100))
+            profiler.lap("tab1")
+            with profiler.section("map_points", rows=lambda: 42):
+                ctx._enqueue(FakeMessage(30))
+            ctx._enqueue(FakeMessage(20))
+            entry = profiler.finish(tab="map")
+
+            self.assertEqual(ctx._enqueue, ctx.sent.append)
+            self.assertEqual(len(ctx.sent), 3)
+            with open(log_path) as log:
+                logged = json.loads(log.read())
+            self.assertEqual(logged['tab'], "map")
+            self.assertEqual(entry['sections'], logged['sections'])
+            sections = {s['name']: s for s in logged['sections']}
+            self.assertEqual(list(sections), ["header", "tab1", "map_points"])
+            self.assertEqual(sections["header"]['bytes'], 100)
+            self.assertEqual(sections["tab1"]['bytes'], 50)
+            self.assertEqual(sections["map_points"]['rows'], 42)
+            self.assertEqual(sections["map_points"]['kind'], "op")
+
+if __name__ == '__main__':
+    unittest.main()
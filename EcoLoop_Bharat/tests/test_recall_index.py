@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+import pandas as pd
+import pathway as pw
+
+# processor imports its engine siblings by bare name, as when run from engine/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+from engine.processor import projected_schema
+from engine.recall_index import BatchIndex
+
+def ledger_row(product_id, status):
+    return {'product_id': product_id, 'recovered': status == "RECOVERED", 'status': status}
+
+class TestBatchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = BatchIndex()
+        products = pw.debug.table_from_pandas(pd.DataFrame({
+            'product_id': ['P1', 'P2', 'P3', 'P4'],
+            'batch_number': ['B-1', 'B-1', 'B-1', 'B-2'],
+        }))
+        ledger = pw.debug.table_from_pandas(pd.DataFrame([
+            ledger_row('P1', "RECOVERED"), ledger_row('P2', "LEAKED_CRITICAL"), ledger_row('P3', "IN_TRANSIT"),
+            ledger_row('P4', "RECOVERED"),
+        ]))
+        self.index.attach(products, ledger)
+        pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+
+    def test_batch_members_and_counts(self):
+        self.assertEqual(len(self.index), 2)
+        batch = self.index.batch('B-1')
+        self.assertEqual((batch['total'], batch['recovered'], batch['leaked'], batch['in_transit']), (3, 1, 1, 1))
+        self.assertEqual({p['product_id']: p['state'] for p in batch['products']},
+                         {'P1': 'recovered', 'P2': 'leaked', 'P3': 'in_transit'})
+        self.assertEqual(self.index.counts('B-2'), {'total': 1, 'recovered': 1, 'leaked': 0, 'in_transit': 0})
+        self.assertIsNone(self.index.batch('B-9'))
+
+    def test_counts_follow_ledger_and_production_changes(self):
+        # A late recovery moves P2 from leaked to recovered
+        self.index.on_ledger('k1', ledger_row('P2', "LEAKED_CRITICAL"), 2, False)
+        self.index.on_ledger('k2', ledger_row('P2', "RECOVERED"), 2, True)
+        self.assertEqual(self.index.counts('B-1')['recovered'], 2)
+        self.assertEqual(self.index.counts('B-1')['leaked'], 0)
+
+        # The ledger may reach a product before its production row
+        self.index.on_ledger('k3', ledger_row('P5', "LEAKED_CRITICAL"), 4, True)
+        self.index.on_product('k4', {'product_id': 'P5', 'batch_number': 'B-2'}, 4, True)
+        self.assertEqual(self.index.counts('B-2'), {'total': 2, 'recovered': 1, 'leaked': 1, 'in_transit': 0})
+
+        # A corrected batch number moves the product; an emptied batch disappears
+        self.index.on_product('k5', {'product_id': 'P4', 'batch_number': 'B-3'}, 6, True)
+        self.index.on_product('k6', {'product_id': 'P4', 'batch_number': 'B-2'}, 6, False)
+        self.assertEqual(self.index.counts('B-3')['recovered'], 1)
+        self.assertEqual(self.index.counts('B-2')['total'], 1)
+        self.index.on_product('k4', {'product_id': 'P5', 'batch_number': 'B-2'}, 8, False)
+        self.assertIsNone(self.index.batch('B-2'))
+
+    def test_recall_stage_projects_batch_number(self):
+        self.assertIn('batch_number', projected_schema('production', ['index_recall_batches']).column_names())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from engine.snapshots import (
+    publish_snapshot, published_versions, read_manifest, snapshot_files, snapshot_path, snapshot_version,
+    verify_snapshot
+)
+
+def write_csv(path, rows):
+    pd.DataFrame({'product_id': [f"P{n}" for n in range(rows)], 'weight_kg': range(rows)}).to_csv(path, index=False)
+    return path
+
+class TestSnapshots(unittest.TestCase):
+    def test_versions_are_immutable_and_counted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root, legacy = os.path.join(tmp, "snapshots"), os.path.join(tmp, "factory_output.csv")
+            self.assertIsNone(snapshot_version(root))
+            first = publish_snapshot({'factory_output.csv': write_csv(os.path.join(tmp, "a.csv"), 10)},
+                                     root=root, link_to={'factory_output.csv': legacy})
+            self.assertEqual(first['version'], 1)
+            self.assertEqual(first['files']['factory_output.csv']['rows'], 10)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "a.csv")))  # moved in, not copied
+            v1_path = snapshot_path('factory_output.csv', root=root)
+
+            second = publish_snapshot({'factory_output.csv': write_csv(os.path.join(tmp, "b.csv"), 25)},
+                                      root=root, link_to={'factory_output.csv': legacy})
+            self.assertEqual(snapshot_version(root), 2)
+            self.assertEqual(read_manifest(root), second)
+            self.assertTrue(verify_snapshot(second, root))
+            # The pinned older version is untouched; the legacy path follows the newest
+            self.assertEqual(len(pd.read_csv(snapshot_path('factory_output.csv', version=1, root=root))), 10)
+            self.assertEqual(len(pd.read_csv(snapshot_path('factory_output.csv', root=root))), 25)
+            self.assertEqual(len(pd.read_csv(legacy)), 25)
+            self.assertTrue(os.path.samefile(legacy, snapshot_path('factory_output.csv', root=root)))
+            self.assertFalse(os.path.samefile(legacy, v1_path))
+
+    def test_pruning_and_verification(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "snapshots")
+            source = write_csv(os.path.join(tmp, "src.csv"), 5)
+            for _ in range(4):
+                manifest = publish_snapshot({'return_logs.csv': source}, root=root, keep=2, move=False)
+            self.assertEqual(sorted(n for n in os.listdir(root) if n.startswith("v")), ["v00000003", "v00000004"])
+            # A pruned pin resolves to the current version
+            self.assertEqual(snapshot_path('return_logs.csv', version=1, root=root),
+                             os.path.join(root, "v00000004", "return_logs.csv"))
+            self.assertIsNone(snapshot_path('missing.csv', root=root))
+
+            with open(os.path.join(root, manifest['files']['return_logs.csv']['path']), "a") as f:
+                f.write("P9,9\n")
+            self.assertFalse(verify_snapshot(manifest, root))
+
+    def test_version_listing_and_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "snapshots")
+            self.assertEqual(published_versions(root), [])
+            publish_snapshot({'factory_output.csv': write_csv(os.path.join(tmp, "a.csv"), 3),
+                              'return_logs.csv': write_csv(os.path.join(tmp, "b.csv"), 2)}, root=root)
+            shards = os.path.join(tmp, "shards")
+            os.makedirs(shards)
+            write_csv(os.path.join(shards, "shard-00000.csv"), 4)
+            publish_snapshot({'shards': shards, 'return_logs.csv': write_csv(os.path.join(tmp, "c.csv"), 1)},
+                             root=root, keep=1)
+            self.assertEqual(published_versions(root), [2])
+            self.assertEqual(snapshot_files(1, root), {})
+            files = snapshot_files(2, root)
+            self.assertEqual(sorted(files), ['return_logs.csv', 'shards'])
+            self.assertTrue(os.path.isdir(files['shards']))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import pandas as pd
+from ui.timeseries_store import TimeSeriesStore, bucket_start
+
+# 2026-01-05 00:00 UTC, a Monday
+MONDAY = 1767571200.0
+
+class TestTimeSeriesStore(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'zone': ['South', 'North', 'South', 'West'],
+            'city': ['Chennai', 'Delhi NCR', 'Bengaluru', 'Mumbai'],
+            'material_type': ['Plastic', 'Metal', 'Plastic', 'Glass'],
+            'waste_category': ['Medium-Value', 'High-Value', 'Medium-Value', 'Low-Value'],
+            'manufacturer_name': ['Tata Steel', 'Amul Dairy', 'Tata Steel', 'ITC Limited'],
+            'recovered': [True, False, True, False],
+            'days_in_transit': [3.0, 45.0, 12.0, 31.0],
+            'carbon_footprint': [10.0, 20.0, 30.0, 40.0],
+            'circular_credit_amount': [100.0, 0.0, 300.0, 0.0],
+            # Sunday 2025-12-28 (ISO week 52 of 2025), Monday 2026-01-05 twice, Monday + 1h
+            'manufacturing_date': [MONDAY - 8 * 86400, MONDAY, MONDAY + 60, MONDAY + 3600],
+        })
+        self.store = TimeSeriesStore(self.df, now=MONDAY + 86400)
+
+    def test_weeks_start_on_monday_and_span_years(self):
+        self.assertEqual(bucket_start([MONDAY + 3 * 86400], 'week')[0], MONDAY)
+        _, weekly = self.store.series('week')
+        self.assertEqual(weekly['time'].dt.dayofweek.tolist(), [0, 0])
+        self.assertEqual(weekly['time'].dt.year.tolist(), [2025, 2026])
+        self.assertEqual(weekly['products'].tolist(), [1, 3])
+        self.assertAlmostEqual(weekly['carbon_saved'].sum(), (10.0 + 30.0) * 0.7)
+
+    def test_fine_tiers_respect_retention(self):
+        _, minutes = self.store.series('minute')
+        self.assertEqual(minutes['products'].sum(), 3)
+        self.assertEqual(self.store.choose_resolution(start=MONDAY), 'minute')
+        self.assertEqual(self.store.choose_resolution(start=MONDAY - 8 * 86400), 'hour')
+        self.assertEqual(self.store.choose_resolution(start=MONDAY - 8 * 86400, max_points=100), 'day')
+
+    def test_filters_and_rollup(self):
+        _, south = self.store.series('day', filters={'zone': 'South', 'status': 'Recovered Only'})
+        self.assertEqual(south['products'].sum(), 2)
+        _, critical = self.store.series('day', filters={'status': 'Critical Leaks (>30 days)'})
+        self.assertEqual(critical['products'].sum(), 2)
+        totals = self.store.rollup('material_type', start=MONDAY).set_index('material_type')
+        self.assertEqual(totals.loc['Plastic', 'credits'], 300.0)
+        self.assertEqual(totals.loc['Plastic', 'recovery_rate'], 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+import pandas as pd
+import pathway as pw
+from fastapi import HTTPException
+
+# processor imports its engine siblings by bare name, as when run from engine/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+from engine.processor import projected_schema
+from engine.twin_api import TwinIndex, create_app
+
+def product(product_id, qr):
+    return {
+        'product_id': product_id, 'qr_code_hash': qr, 'batch_number': 'B1', 'manufacturer_id': 'MFG-001',
+        'manufacturer_name': 'Acme', 'material_type': 'PET', 'material_category': 'PLASTIC', 'weight_kg': 0.5,
+        'carbon_footprint': 1.2, 'recyclable_percentage': 80.0, 'manufacturing_date': 1_700_000_000.0,
+        'expiry_date': 1_800_000_000.0, 'gps_lat': 19.07, 'gps_lon': 72.87,
+    }
+
+def ledger_row(product_id, center=None, date=None, credit=None):
+    recovered = center is not None
+    return {
+        'product_id': product_id, 'recovered': recovered, 'status': "RECOVERED" if recovered else "IN_TRANSIT",
+        'recovery_center': center, 'recovery_date': date, 'circular_credit': credit,
+        'carbon_saved': 0.84 if recovered else 0.0,
+    }
+
+def endpoint(app, path):
+    return next(route.endpoint for route in app.routes if getattr(route, 'path', None) == path)
+
+class TestTwinApi(unittest.TestCase):
+    def setUp(self):
+        self.index = TwinIndex()
+        products = pw.debug.table_from_pandas(pd.DataFrame([product('P1', 'QR1'), product('P2', 'QR2')]))
+        ledger = pw.debug.table_from_pandas(pd.DataFrame([
+            ledger_row('P1', 'Pune MRF', 1_700_100_000.0, 2.5),
+            ledger_row('P1', 'Mumbai MRF', 1_700_000_500.0, 1.5),
+            ledger_row('P2'),
+        ]))
+        self.index.attach(products, ledger)
+        pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+
+    def test_index_assembles_twins(self):
+        self.assertEqual(len(self.index), 2)
+        twin = self.index.get('P1')
+        self.assertEqual(twin['status'], "RECOVERED")
+        self.assertEqual([r['recovery_center'] for r in twin['recoveries']], ['Mumbai MRF', 'Pune MRF'])
+        self.assertEqual(twin['total_circular_credit'], 4.0)
+        self.assertEqual(twin['product']['batch_number'], 'B1')
+        self.assertIs(self.index.by_qr('QR1'), twin)
+
+        pending = self.index.by_qr('QR2')
+        self.assertEqual((pending['status'], pending['recovered'], pending['recoveries']), ("IN_TRANSIT", False, []))
+        self.assertIsNone(self.index.get('P3'))
+        self.assertIsNone(self.index.by_qr('QR3'))
+
+    def test_retraction_removes_only_its_row(self):
+        self.index.on_ledger('k9', ledger_row('P2', 'Delhi MRF', 1_700_200_000.0, 3.0), 2, True)
+        self.assertEqual(self.index.get('P2')['total_circular_credit'], 3.0)
+        self.index.on_ledger('k9', ledger_row('P2', 'Delhi MRF', 1_700_200_000.0, 3.0), 4, False)
+        self.assertEqual(self.index.get('P2')['status'], "IN_TRANSIT")
+        self.index.on_product('k1', product('P2', 'QR2'), 4, False)
+        self.assertIsNone(self.index.by_qr('QR2'))
+
+    def test_update_inserted_before_retraction_moves_the_qr_entry(self):
+        self.index.on_product('k0', product('P1', 'QR9'), 4, True)
+        self.index.on_product('k0', product('P1', 'QR1'), 4, False)
+        self.assertIsNone(self.index.by_qr('QR1'))
+        self.assertEqual(self.index.by_qr('QR9')['product']['qr_code_hash'], 'QR9')
+        self.assertIs(self.index.get('P1'), self.index.by_qr('QR9'))
+
+    def test_api_routes(self):
+        app = create_app(self.index)
+        response = asyncio.run(endpoint(app, "/twins/{product_id}")("P1"))
+        self.assertEqual(json.loads(response.body)['product']['qr_code_hash'], 'QR1')
+        response = asyncio.run(endpoint(app, "/twins/qr/{qr_code_hash}")("QR2"))
+        self.assertEqual(json.loads(response.body)['product_id'], 'P2')
+        with self.assertRaises(HTTPException) as missing:
+            asyncio.run(endpoint(app, "/twins/{product_id}")("P3"))
+        self.assertEqual(missing.exception.status_code, 404)
+        self.assertEqual(asyncio.run(endpoint(app, "/health")())['twins'], 2)
+
+    def test_twin_stage_keeps_the_full_production_record(self):
+        self.assertIn('qr_code_hash', projected_schema('production', ['serve_digital_twins']).column_names())
+        self.assertNotIn('qr_code_hash', projected_schema('production').column_names())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+"""
+Query layer for the LiveAI™ Waste Advisor
+Maps a question to an intent plus entities (zone, city, material, period,
+threshold) and answers it with aggregate queries over the time-series store
+rollups. Answers are cached per (query, filters, data version) in a bounded
+LRU shared by every session.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+ZONES = ['North', 'South', 'East', 'West', 'Central']
+
+# EPR recovery rate below which a manufacturer is flagged
+DEFAULT_COMPLIANCE_THRESHOLD = 60.0
+
+PERIODS = {
+    'today': 86400,
+    'this week': 7 * 86400,
+    'last week': 7 * 86400,
+    'this month': 30 * 86400,
+    'last month': 30 * 86400,
+    'this year': 365 * 86400,
+}
+
+# Intent -> keywords, checked in order; the first intent with a matching keyword wins
+INTENTS = [
+    ('prediction', ['predict', 'forecast', 'next week']),
+    ('non_compliant', ['non-compliant', 'noncompliant', 'compliance', 'epr']),
+    ('leakage_by_city', ['leakage', 'leaking', 'leak', 'hotspot']),
+    ('carbon_savings', ['carbon', 'co2', 'co₂', 'emission']),
+    ('material_recovery', ['trend', 'recovery', 'recycl']),
+    ('zone_performance', ['zone', 'region', 'intervention']),
+]
+
+EXAMPLES = [
+    "Which cities have the highest leakage rate?",
+    "Show me non-compliant manufacturers in South India",
+    "What's the recovery trend for E-Waste?",
+    "Which zones need immediate intervention?",
+    "Calculate total carbon savings this month",
+    "Predict leakage risk for next week"
+]
+
+
+def parse_query(query, vocabulary):
+    """
+    Split a free-text question into (intent, entities).
+    `vocabulary` maps a filter name ('city', 'material', 'manufacturer') to
+    the values known to the store.
+    """
+    text = ' '.join(query.lower().split())
+    entities = {}
+
+    for zone in ZONES:
+        if re.search(rf'\b{zone.lower()}\b', text):
+            entities['zone'] = zone
+            break
+    for name, values in vocabulary.items():
+        # Longest first so "Delhi NCR" wins over a shorter overlapping name
+        for value in sorted(values, key=len, reverse=True):
+            if _mentions(text, value):
+                entities[name] = value
+                break
+    if 'material' not in entities:
+        # Material families: "plastic" covers "PET Plastic" and "HDPE Plastic"
+        family = [value for value in vocabulary.get('material', [])
+                  if any(len(word) >= 4 and _mentions(text, word) for word in re.split(r'[\s/]+', value))]
+        if family:
+            entities['material'] = tuple(family)
+    for phrase, seconds in PERIODS.items():
+        if phrase in text:
+            entities['period'] = seconds
+            break
+    threshold = re.search(r'(?:below|under|less than|<)\s*(\d+(?:\.\d+)?)\s*%?', text)
+    if threshold:
+        entities['threshold'] = float(threshold.group(1))
+
+    for intent, keywords in INTENTS:
+        if any(keyword in text for keyword in keywords):
+            return intent, entities
+    # No keyword: a threshold reads as a compliance check, a named slice as its recovery summary
+    if 'threshold' in entities:
+        return 'non_compliant', entities
+    if entities.keys() & {'zone', 'city', 'material', 'manufacturer'}:
+        return 'material_recovery', entities
+    return None, entities
+
+
+def _narrow(selected, named):
+    """Values allowed by both a sidebar filter value and an entity of the question"""
+    if selected == 'All':
+        return named
+    allowed = {selected} if isinstance(selected, str) else set(selected)
+    both = [value for value in ([named] if isinstance(named, str) else named) if value in allowed]
+    return both[0] if len(both) == 1 else tuple(both)
+
+
+def _label(value):
+    return value if isinstance(value, str) else ' / '.join(value)
+
+
+def _mentions(text, term):
+    return re.search(rf'(?<![\w-]){re.escape(term.lower())}(?![\w-])', text) is not None
+
+
+class AdvisorEngine:
+    """
+    Parameterized aggregate queries over a TimeSeriesStore with an LRU answer cache.
+    Safe to share between sessions: the cache is guarded by a lock, and the
+    stores it reads are immutable.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def ask(self, query, filters, version, store, start=None, end=None):
+        """
+        Answer `query` under the sidebar `filters` (dict as used by the store)
+        for one data version. Returns (markdown, elapsed_ms, cached).
+        """
+        started = time.perf_counter()
+        key = (' '.join(query.lower().split()), tuple(sorted(filters.items())), start, end, version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key], (time.perf_counter() - started) * 1000, True
+
+        answer = self._answer(query, dict(filters), store, start, end)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = answer
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return answer, (time.perf_counter() - started) * 1000, False
+
+    def _answer(self, query, filters, store, start, end):
+        vocabulary = {
+            'city': store.values('city'),
+            'material': store.values('material_type'),
+            'manufacturer': store.values('manufacturer_name'),
+        }
+        intent, entities = parse_query(query, vocabulary)
+        if intent is None:
+            return ("I can answer questions about leakage hotspots, EPR compliance, recovery by material, "
+                    "zone performance, carbon savings and leakage forecasts. For example:\n\n" +
+                    "\n".join(f"- {example}" for example in EXAMPLES))
+
+        # Entities named in the question narrow the sidebar selection (never widen it)
+        for name in ('zone', 'city', 'material', 'manufacturer'):
+            if name in entities:
+                selected = filters.get(name, 'All')
+                filters[name] = _narrow(selected, entities[name])
+                if not filters[name]:
+                    return (f"**{_label(entities[name])}** is outside your sidebar {name} selection "
+                            f"(**{_label(selected)}**). Set the {name} filter to All to ask about it.")
+        if 'period' in entities:
+            period_start = store.now - entities['period']
+            start = period_start if start is None else max(start, period_start)
+        return getattr(self, f'_{intent}')(store, filters, start, end, entities)
+
+    def _leakage_by_city(self, store, filters, start, end, entities):
+        cities = store.rollup('city', filters, start, end)
+        if cities.empty:
+            return "No products match the current filters."
+        cities['leakage_rate'] = 100 - cities['recovery_rate']
+        top_cities = cities.sort_values('leakage_rate', ascending=False).head(3)
+        response = f"**Analysis Result:**\n\nBased on your filters, the cities with highest leakage are:\n\n"
+        for _, city in top_cities.iterrows():
+            response += f"- **{city['city']}**: {city['leakage_rate']:.1f}% leakage ({int(city['products'])} products)\n"
+        response += f"\n📊 **Recommendation:** Immediate intervention required in {top_cities.iloc[0]['city']}"
+        return response
+
+    def _non_compliant(self, store, filters, start, end, entities):
+        threshold = entities.get('threshold', DEFAULT_COMPLIANCE_THRESHOLD)
+        mfg_stats = store.rollup('manufacturer_name', filters, start, end)
+        non_compliant = mfg_stats[mfg_stats['recovery_rate'] < threshold].sort_values('recovery_rate')
+        scope = f" in {filters['zone']} India" if filters.get('zone', 'All') != 'All' else ""
+        response = f"**EPR Compliance Report{scope}:**\n\nFound **{len(non_compliant)}** manufacturers below {threshold:.0f}% recovery:\n\n"
+        for _, mfg in non_compliant.head(5).iterrows():
+            response += f"- **{mfg['manufacturer_name']}**: {mfg['recovery_rate']:.1f}% recovery rate\n"
+        if len(non_compliant):
+            response += f"\n⚠️ **Action Required**: Send compliance notices immediately"
+        return response
+
+    def _material_recovery(self, store, filters, start, end, entities):
+        material = filters.get('material', 'All')
+        totals = store.rollup('material_type', filters, start, end)
+        if totals.empty:
+            return "No products match the current filters."
+        if material == 'All':
+            response = "**Recovery by Material:**\n\n"
+            for _, row in totals.sort_values('recovery_rate', ascending=False).iterrows():
+                response += f"- **{row['material_type']}**: {row['recovery_rate']:.1f}% recovery ({int(row['products'])} products)\n"
+            return response
+
+        label = material if isinstance(material, str) else ' / '.join(material)
+        products = totals['products'].sum()
+        _, weekly = store.series('week', filters, start, end)
+        response = f"**{label} Analysis:**\n\n"
+        response += f"- Total {label} products: {int(products)}\n"
+        response += f"- Recovery rate: {totals['recovered_count'].sum() / products * 100:.1f}%\n"
+        response += f"- Circular credits generated: ₹{totals['credits'].sum():,.0f}\n"
+        response += f"- Carbon saved: {totals['carbon_saved'].sum()/1000:.1f} tons\n\n"
+        if len(weekly) >= 2:
+            change = weekly['recovery_rate'].iloc[-1] - weekly['recovery_rate'].iloc[-2]
+            response += f"📈 **Trend**: {label} recovery is {'improving' if change >= 0 else 'declining'} ({change:+.1f} pts week over week)"
+        return response
+
+    def _zone_performance(self, store, filters, start, end, entities):
+        zones = store.rollup('zone', filters, start, end)
+        if zones.empty:
+            return "No products match the current filters."
+        response = f"**Zone Performance Analysis:**\n\n"
+        for _, row in zones.iterrows():
+            response += f"- **{row['zone']}**: {row['recovery_rate']:.1f}% recovery\n"
+        worst_zone = zones.loc[zones['recovery_rate'].idxmin(), 'zone']
+        response += f"\n🚨 **Critical Zone**: {worst_zone} needs immediate attention"
+        return response
+
+    def _carbon_savings(self, store, filters, start, end, entities):
+        totals = store.rollup('recovered', filters, start, end)
+        total_carbon = totals['carbon_saved'].sum() / 1000
+        trees = int(total_carbon / 0.5)
+        period = next((phrase for phrase, seconds in PERIODS.items() if seconds == entities.get('period')), None)
+        response = f"**Environmental Impact{f' ({period})' if period else ''}:**\n\n"
+        response += f"- Total CO₂ saved: **{total_carbon:.1f} tons**\n"
+        response += f"- Equivalent to **{trees:,} trees** planted\n"
+        response += f"- Circular credits generated: **₹{totals['credits'].sum():,.0f}**"
+        return response
+
+    def _prediction(self, store, filters, start, end, entities):
+        _, weekly = store.series('week', filters, start, end)
+        if len(weekly) < 2:
+            return "🔮 **Prediction**: Not enough weekly history under the current filters to project leakage."
+        leakage = 100 - weekly['recovery_rate']
+        # Linear extrapolation of the last (up to) four complete weeks
+        recent = leakage.iloc[-5:-1] if len(leakage) > 2 else leakage
+        slope = (recent.iloc[-1] - recent.iloc[0]) / max(len(recent) - 1, 1)
+        expected = min(100.0, max(0.0, recent.iloc[-1] + slope))
+        direction = 'increase' if slope > 0 else 'decrease'
+        return (f"🔮 **Prediction**: Leakage was {recent.iloc[-1]:.1f}% in the last complete week and is expected to "
+                f"{direction} to about {expected:.1f}% next week at the current trend ({slope:+.1f} pts/week).")
@@ -9,10 +9,21 @@ import plotly.graph_objects as go
 import time
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 import numpy as np
+import pyarrow as pa
 import random
 from datetime import datetime
+from ledger_store import LedgerStore, apply_filters, ledger_path, partition_day, publish_ledger
+from timeseries_store import RESOLUTIONS, TimeSeriesStore
+from advisor import EXAMPLES, AdvisorEngine
+from forecasting import city_outlook, forecast_recovery
+from epr_export import ExportJob, SelectionExportJob
+from profiler import RenderProfiler
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+from snapshots import published_versions, snapshot_files, snapshot_version
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # Page config - MUST BE FIRST STREAMLIT COMMAND
 st.set_page_config(
@@ -22,6 +33,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Per-rerun timing; every call is a no-op unless the admin panel is switched on
+profiler = RenderProfiler(st.session_state.get('profile_renders', False), ctx=get_script_run_ctx())
+profiler.lap("header & styles")
+
 # Custom CSS for professional look
 st.markdown("""
     <style>
@@ -265,8 +280,66 @@ def load_city_data():
     }
     return cities_data
 
-@st.cache_data(ttl=5)
-def load_data():
+PROD_PATH = "data/factory_output.csv"
+REC_PATH = "data/return_logs.csv"
+# days_in_transit is measured against the wall clock when a version loads; the
+# hour in the version key re-derives it (ledger, rollups, per-tab caches) as products age
+AGE_BUCKET_SECONDS = 3600
+
+def data_version():
+    """
+    Cheap change signal for the source files: the published snapshot version
+    (one small manifest read), or (mtime, size) per file before the first
+    snapshot, no parsing. The last element is the current age bucket.
+    """
+    age_bucket = int(time.time() // AGE_BUCKET_SECONDS)
+    published = snapshot_version()
+    if published is not None:
+        return ('snapshot', published, age_bucket)
+    version = []
+    for path in (PROD_PATH, REC_PATH):
+        try:
+            stat = os.stat(path)
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version) + (age_bucket,)
+
+def source_pair(files):
+    """(production, recovery) paths among a snapshot's {name: path} outputs, or None without both"""
+    stems = {os.path.splitext(name)[0]: path for name, path in files.items()}
+    production = stems.get('factory_output') or stems.get('shards')
+    recovery = stems.get('return_logs')
+    return (production, recovery) if production and recovery else None
+
+def source_paths(version):
+    """
+    Production and recovery inputs of a data version, always from one
+    snapshot: the version itself, or the newest earlier one that has both
+    (never production from one generation and recoveries from another)
+    """
+    if version and version[0] == 'snapshot':
+        for published in reversed(published_versions()):
+            pair = published <= version[1] and source_pair(snapshot_files(published))
+            if pair:
+                return pair
+    return PROD_PATH, REC_PATH
+
+def read_source(path):
+    """A CSV, Parquet or Arrow input, or a directory of its shards, as one frame"""
+    files = sorted(os.path.join(path, name) for name in os.listdir(path)) if os.path.isdir(path) else [path]
+    frames = []
+    for file in files:
+        suffix = os.path.splitext(file)[1]
+        if suffix == '.parquet':
+            frames.append(pd.read_parquet(file))
+        elif suffix == '.arrow':
+            frames.append(pa.ipc.open_file(file).read_pandas())
+        elif suffix == '.csv':
+            frames.append(pd.read_csv(file))
+    return pd.concat(frames, ignore_index=True)
+
+def load_data(version=None):
     """Load data from files with city mapping"""
     try:
         # Get city data
@@ -274,11 +347,10 @@ def load_data():
         city_names = list(cities_data.keys())
         
         # Try to load from CSV first
-        prod_path = "data/factory_output.csv"
-        rec_path = "data/return_logs.csv"
+        prod_path, rec_path = source_paths(version)
         
         if os.path.exists(prod_path):
-            prod_df = pd.read_csv(prod_path)
+            prod_df = read_source(prod_path)
             
             # Add city column if not present
             if 'city' not in prod_df.columns:
@@ -293,7 +365,7 @@ def load_data():
                     prod_df['city'] = np.random.choice(city_names, len(prod_df))
             
             if os.path.exists(rec_path):
-                rec_df = pd.read_csv(rec_path)
+                rec_df = read_source(rec_path)
                 
                 # Merge data
                 merged = prod_df.merge(
@@ -405,11 +477,102 @@ def create_comprehensive_sample_data(cities_data):
     
     return df
 
-# Load data
-df = load_data()
-cities_data = load_city_data()
+@st.cache_resource(max_entries=8)
+def load_ledger(version, start_day=None, end_day=None):
+    """
+    Process-wide ledger store: published once per data version, shared by all sessions.
+    Only the day partitions overlapping [start_day, end_day] are mapped.
+    """
+    path = ledger_path(version)
+    if not os.path.exists(path):
+        publish_ledger(load_data(version), version)
+    return LedgerStore(path, start_day, end_day)
+
+@st.cache_resource(max_entries=2)
+def load_timeseries(version):
+    """Minute/hour/day/week rollups of the full ledger, built once per data version"""
+    return TimeSeriesStore(load_ledger(version).frame)
+
+@st.cache_resource(max_entries=2)
+def load_forecasts(version):
+    """Holt forecasts for every (city, material) series, fitted once per data version"""
+    return forecast_recovery(load_timeseries(version), horizon=7)
+
+@st.cache_resource
+def load_advisor():
+    """Advisor query engine; its answer cache is shared by all sessions and versions"""
+    return AdvisorEngine(max_entries=256)
+
+TIME_RANGES = {
+    "Last 24 hours": timedelta(hours=24),
+    "Last 7 days": timedelta(days=7),
+    "Last 30 days": timedelta(days=30),
+    "All time": None,
+    "Custom": None
+}
+
+def resolve_time_range(choice, custom_dates=None):
+    """(start, end) timestamps for a time-range choice; None means unbounded"""
+    if choice == "Custom" and custom_dates and len(custom_dates) == 2:
+        start = datetime.combine(custom_dates[0], datetime.min.time())
+        end = datetime.combine(custom_dates[1], datetime.min.time()) + timedelta(days=1)
+        return start.timestamp(), end.timestamp()
+    if TIME_RANGES.get(choice) is None:
+        return None, None
+    # Rounded to the minute so memoized results survive reruns within it
+    start = (datetime.now() - TIME_RANGES[choice]).timestamp()
+    return float(int(start // 60) * 60), None
+
+def export_progress(key, label):
+    """Progress, cancel and download for the background export job kept under session_state[key]"""
+    job = st.session_state.get(key)
+    if job is None:
+        return
+    if job.done:
+        export_result(key, label)
+    else:
+        export_running(key)
+
+@st.fragment(run_every=1)
+def export_running(key):
+    """Polls a running export once a second; the timer ends with the job"""
+    job = st.session_state[key]
+    if job.done:
+        # One app rerun swaps this polling fragment for the static result
+        # (a fragment-scoped rerun is not allowed during full-app runs)
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ {job.message}")
+    if st.button("✖ Cancel export", key=f"{key}_cancel"):
+        job.cancel()
+
+# Largest export offered as an in-browser download: Streamlit holds a download in
+# memory for the session, so bigger exports are fetched from the server's export directory
+MAX_DOWNLOAD_BYTES = 200 * 2**20
+
+def read_export(path):
+    """Deferred download: the file is read only when the button is clicked"""
+    def read():
+        with open(path, "rb") as export:
+            return export.read()
+    return read
+
+@st.fragment
+def export_result(key, label):
+    job = st.session_state[key]
+    if job.state == "done":
+        st.success(f"✅ {label} ready: {job.message} → `{job.path}`")
+        size = os.path.getsize(job.path)
+        if size <= MAX_DOWNLOAD_BYTES:
+            st.download_button("⬇️ Download", read_export(job.path), file_name=os.path.basename(job.path),
+                               key=f"{key}_download")
+        else:
+            st.info(f"📁 At {size / 2**20:,.0f} MB the export is over the {MAX_DOWNLOAD_BYTES // 2**20} MB "
+                    f"browser download limit; copy it from `{job.path}` on the server")
+    else:
+        st.warning(job.message)
 
 # ==================== SIDEBAR WITH WORKING FILTERS ====================
+profiler.lap("sidebar: data source")
 with st.sidebar:
     st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
     st.markdown('<p class="sidebar-header">🎮 LiveAI™ Control Center</p>', unsafe_allow_html=True)
@@ -421,8 +584,30 @@ with st.sidebar:
         index=1
     )
     
-    st.markdown("---")
+    # Time range is pushed down to the store: only overlapping day partitions are read
+    time_choice = st.selectbox("🕒 Time Range", list(TIME_RANGES), index=3)
+    custom_dates = None
+    if time_choice == "Custom":
+        today = datetime.now().date()
+        custom_dates = st.date_input("📅 Dates", value=(today - timedelta(days=7), today))
+    time_range = resolve_time_range(time_choice, custom_dates)
     
+    st.markdown("---")
+
+# Load data (shared read-only frame; only filter selections are per session)
+st.session_state['data_version'] = data_version()
+start_ts, end_ts = time_range
+with profiler.section("load_ledger", rows=lambda: len(ledger)):
+    ledger = load_ledger(
+        st.session_state['data_version'],
+        partition_day(start_ts) if start_ts is not None else None,
+        partition_day(end_ts - 1) if end_ts is not None else None
+    )
+df = ledger.frame
+cities_data = load_city_data()
+
+profiler.lap("sidebar: filters & settings")
+with st.sidebar:
     # ===== WORKING FILTERS SECTION =====
     st.markdown("### 🔍 Smart Filters")
     
@@ -482,12 +667,27 @@ with st.sidebar:
         filter_html += "</div>"
         st.markdown(filter_html, unsafe_allow_html=True)
     
+    # Filtered rows are streamed from the published ledger, never from filtered_df
+    selection_format = st.selectbox("Export format", ["CSV", "Parquet"], key="selection_export_format")
+    selection_job = st.session_state.get('selection_export')
+    if st.button("⬇️ Export filtered rows", use_container_width=True,
+                 disabled=selection_job is not None and not selection_job.done):
+        st.session_state['selection_export'] = SelectionExportJob(
+            ledger.path, selection_format.lower(),
+            filters=(selected_zone, selected_city, selected_material, selected_category, status,
+                     selected_manufacturer),
+            time_range=time_range if time_range != (None, None) else None,
+            partitions=ledger.partitions
+        ).start()
+    export_progress('selection_export', "Selection")
+    
     st.markdown("---")
     
     # Settings
     col1, col2 = st.columns(2)
     with col1:
-        refresh_rate = st.number_input("🔄 Refresh (sec)", min_value=1, max_value=30, value=5)
+        refresh_rate = st.number_input("🔄 Refresh (sec)", min_value=1, max_value=30, value=5,
+                                       help="How often to check the data sources for changes")
     with col2:
         threshold = st.number_input("⚠️ Leakage (hrs)", min_value=12, max_value=168, value=48, step=12)
     
@@ -498,6 +698,8 @@ with st.sidebar:
     enable_chatbot = st.checkbox("🤖 AI Waste Advisor", value=True)
     enable_alerts = st.checkbox("📱 Regional Language Alerts", value=True)
     enable_predictions = st.checkbox("🔮 Microplastic Prediction", value=True)
+    st.checkbox("⏱️ Render Profiling (admin)", key="profile_renders",
+                help="Time each section of the page and log it to " + profiler.log_path)
     
     st.markdown("---")
     
@@ -523,45 +725,21 @@ with st.sidebar:
     
     if st.button("🔄 Force Refresh", use_container_width=True):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
     
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== APPLY FILTERS TO DATAFRAME ====================
-def apply_filters(df, selected_zone, selected_city, selected_material, selected_category, status, selected_manufacturer):
-    """Apply all selected filters to the dataframe"""
-    filtered_df = df.copy()
-    
-    if selected_zone != 'All':
-        filtered_df = filtered_df[filtered_df['zone'] == selected_zone]
-    
-    if selected_city != 'All':
-        filtered_df = filtered_df[filtered_df['city'] == selected_city]
-    
-    if selected_material != 'All':
-        filtered_df = filtered_df[filtered_df['material_type'] == selected_material]
-    
-    if selected_category != 'All':
-        filtered_df = filtered_df[filtered_df['waste_category'] == selected_category]
-    
-    if selected_manufacturer != 'All':
-        filtered_df = filtered_df[filtered_df['manufacturer_name'] == selected_manufacturer]
-    
-    if status == "Recovered Only":
-        filtered_df = filtered_df[filtered_df['recovered'] == True]
-    elif status == "Leaked Only":
-        filtered_df = filtered_df[filtered_df['recovered'] == False]
-    elif status == "Critical Leaks (>30 days)":
-        filtered_df = filtered_df[(filtered_df['recovered'] == False) & (filtered_df['days_in_transit'] > 30)]
-    
-    return filtered_df
-
-# Apply filters
-filtered_df = apply_filters(df, selected_zone, selected_city, selected_material, 
-                            selected_category, status, selected_manufacturer)
+profiler.lap("filters & metrics")
+with profiler.section("apply_filters", rows=lambda: len(filtered_df)):
+    filtered_df = apply_filters(df, selected_zone, selected_city, selected_material, 
+                                selected_category, status, selected_manufacturer,
+                                time_range=time_range if time_range != (None, None) else None)
 
 # Show filter summary
-st.markdown(f"<p style='text-align: right; color: #666;'>Showing <b>{len(filtered_df):,}</b> of <b>{len(df):,}</b> total records</p>", unsafe_allow_html=True)
+st.markdown(f"<p style='text-align: right; color: #666;'>Showing <b>{len(filtered_df):,}</b> of <b>{len(df):,}</b> total records"
+            f" · {len(ledger.partitions)} of {ledger.total_partitions} day partitions read</p>", unsafe_allow_html=True)
 
 # ==================== METRICS ROW ====================
 st.markdown('<div class="metric-container">', unsafe_allow_html=True)
@@ -634,6 +812,119 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
+# ==================== PER-TAB COMPUTATIONS ====================
+# Memoized per (tab, filter set, data version). The filtered frame is passed with a
+# leading underscore so the cache is keyed on the small tuples, not on the rows.
+filters_key = (selected_zone, selected_city, selected_material, selected_category, status, selected_manufacturer,
+               time_range)
+version_key = st.session_state['data_version']
+
+@st.cache_data(max_entries=32)
+def map_points(version, filters, _filtered_df):
+    """Tab 1: products inside India's bounds and the 1,000-point map sample"""
+    in_india = _filtered_df['gps_lat'].between(6.0, 37.0) & _filtered_df['gps_lon'].between(68.0, 97.0)
+    india_map_df = _filtered_df[in_india.fillna(False)]
+    sample = india_map_df.sample(min(1000, len(india_map_df))).copy()
+    sample['status'] = sample['recovered'].map({True: 'Recovered ✅', False: 'Leaked ⚠️'})
+    return sample, len(india_map_df)
+
+@st.cache_data(max_entries=32)
+def city_leakage_stats(version, filters, _filtered_df):
+    """Tab 1 / Tab 4: the ten cities with the highest leakage"""
+    city_leakage = _filtered_df.groupby('city').agg({
+        'recovered': ['count', 'sum', 'mean']
+    }).reset_index()
+    city_leakage.columns = ['city', 'total', 'recovered_count', 'recovery_rate']
+    city_leakage['leakage_rate'] = 100 - (city_leakage['recovery_rate'] * 100)
+    return city_leakage.sort_values('leakage_rate', ascending=False).head(10)
+
+@st.cache_data(max_entries=32)
+def recovery_stats(version, filters, _filtered_df):
+    """Tab 2: recovery by material and by zone"""
+    material_stats = _filtered_df.groupby('material_type').agg({
+        'recovered': ['count', 'sum', 'mean']
+    }).reset_index()
+    material_stats.columns = ['material', 'total', 'recovered', 'rate']
+    material_stats['rate'] = (material_stats['rate'] * 100).round(1)
+    material_stats = material_stats.sort_values('rate', ascending=False)
+
+    zone_stats = _filtered_df.groupby('zone').agg({
+        'recovered': ['count', 'sum', 'mean']
+    }).reset_index()
+    zone_stats.columns = ['zone', 'total', 'recovered', 'rate']
+    zone_stats['rate'] = (zone_stats['rate'] * 100).round(1)
+    return material_stats, zone_stats
+
+@st.cache_data(max_entries=32)
+def epr_stats(version, filters, _filtered_df):
+    """Tab 3 / Tab 4: per-manufacturer EPR compliance"""
+    aggregations = {
+        'recovered': ['count', 'sum', 'mean'],
+        'circular_credit_amount': 'sum',
+        'carbon_footprint': 'sum'
+    }
+    # Ledgers built from the generator CSVs carry no batch quality score
+    has_quality = 'batch_quality_score' in _filtered_df.columns
+    if has_quality:
+        aggregations['batch_quality_score'] = 'mean'
+    mfg_stats = _filtered_df.groupby('manufacturer_name').agg(aggregations).reset_index()
+    mfg_stats.columns = ['manufacturer', 'total', 'recovered_count', 'recovery_rate',
+                        'credits', 'carbon_total'] + (['quality_score'] if has_quality else [])
+    if not has_quality:
+        mfg_stats['quality_score'] = np.nan
+    mfg_stats['recovery_rate'] = (mfg_stats['recovery_rate'] * 100).round(1)
+    mfg_stats['compliance_status'] = mfg_stats['recovery_rate'].apply(
+        lambda x: '✅ Compliant' if x >= 75 else '⚠️ At Risk' if x >= 60 else '❌ Non-Compliant'
+    )
+    return mfg_stats.sort_values('recovery_rate', ascending=False)
+
+@st.cache_data(max_entries=32)
+def risk_stats(version, filters, _filtered_df):
+    """Tab 5: city risk indices and the contamination scatter sample"""
+    risk_data = None
+    if {'microplastic_risk', 'soil_contamination_index'} <= set(_filtered_df.columns):
+        risk_data = _filtered_df.groupby('city').agg({
+            'microplastic_risk': 'mean',
+            'soil_contamination_index': 'mean',
+            'days_in_transit': 'mean'
+        }).reset_index()
+        risk_data = risk_data.sort_values('microplastic_risk', ascending=False).head(10)
+    scatter_sample = _filtered_df.sample(min(500, len(_filtered_df)))
+    return risk_data, scatter_sample
+
+@st.cache_data(max_entries=32)
+def alert_stats(version, filters, threshold, _filtered_df):
+    """Tab 6: the first critical leaks past the threshold and the latest recoveries"""
+    not_recovered = (_filtered_df['recovered'] == False).fillna(False)
+    critical = _filtered_df[not_recovered & (_filtered_df['days_in_transit'] > threshold/24)]
+    recent = _filtered_df[~not_recovered].sort_values('days_in_transit').head(5)
+    return critical.head(5), len(critical), recent
+
+@st.cache_data(max_entries=32)
+def activity_feed_html(version, filters, _filtered_df):
+    """Tab 6: HTML for the 50-row live activity feed"""
+    feed_html = '<div style="height: 400px; overflow-y: scroll; padding: 10px; background: #f8f9fa; border-radius: 10px;">'
+
+    for i, row in _filtered_df.head(50).iterrows():
+        minutes_ago = random.randint(1, 120)
+        event_time = (datetime.now() - timedelta(minutes=minutes_ago)).strftime("%H:%M:%S")
+        status = "✅ RECOVERED" if row['recovered'] else "⚠️ LEAKED"
+        color = "#2E7D32" if row['recovered'] else "#C62828"
+        bg_color = "#E8F5E9" if row['recovered'] else "#FFEBEE"
+
+        feed_html += f"""
+            <div style="display: flex; align-items: center; padding: 8px; background: {bg_color}; margin: 5px 0; border-radius: 5px; border-left: 3px solid {color};">
+                <span style="width: 70px; color: #666; font-size: 0.8rem;">{event_time}</span>
+                <span style="width: 90px; font-weight: 600; color: {color};">{status}</span>
+                <span style="width: 100px;">{row['city']}</span>
+                <span style="width: 100px;">{row['material_type']}</span>
+                <span style="flex: 1;">{row['manufacturer_name'][:15]}...</span>
+            </div>
+        """
+
+    feed_html += '</div>'
+    return feed_html
+
 # ==================== TABS ====================
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "🗺️ Live Leakage Map", 
@@ -642,372 +933,336 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "🤖 AI Waste Advisor",
     "🔮 Predictive Intelligence",
     "🚨 Live Alerts"
-])
+], key="active_tab", on_change="rerun")  # only the open tab's body runs on a rerun
 
 # ==================== TAB 1: MAP ====================
+profiler.lap("tab1: map")
 with tab1:
-    col1, col2 = st.columns([2, 1])
+    if tab1.open:
+        col1, col2 = st.columns([2, 1])
     
-    with col1:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader(f"📍 Real-time Tracking - {selected_city if selected_city != 'All' else 'India'}")
+        with col1:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader(f"📍 Real-time Tracking - {selected_city if selected_city != 'All' else 'India'}")
         
-        if not filtered_df.empty and 'gps_lat' in filtered_df.columns:
-            map_df = filtered_df.copy()
-            map_df['status'] = map_df['recovered'].map({True: 'Recovered ✅', False: 'Leaked ⚠️'})
+            if not filtered_df.empty and 'gps_lat' in filtered_df.columns:
+                with profiler.section("map_points", rows=lambda: india_count):
+                    map_sample, india_count = map_points(version_key, filters_key, filtered_df)
             
-            # Filter to India bounds
-            india_map_df = map_df[
-                (map_df['gps_lat'].between(6.0, 37.0)) & 
-                (map_df['gps_lon'].between(68.0, 97.0))
-            ]
-            
-            if len(india_map_df) > 0:
-                fig = px.scatter_mapbox(
-                    india_map_df.sample(min(1000, len(india_map_df))),
-                    lat='gps_lat',
-                    lon='gps_lon',
-                    color='status',
-                    size='weight_kg',
-                    hover_data=['manufacturer_name', 'material_type', 'city', 'days_in_transit'],
-                    color_discrete_map={'Recovered ✅': '#2E7D32', 'Leaked ⚠️': '#C62828'},
-                    zoom=4,
-                    height=550,
-                    title=f"Live Waste Tracking - {len(india_map_df)} products"
-                )
+                if india_count > 0:
+                    profiler.lap("tab1: map figure")
+                    fig = px.scatter_mapbox(
+                        map_sample,
+                        lat='gps_lat',
+                        lon='gps_lon',
+                        color='status',
+                        size='weight_kg',
+                        hover_data=['manufacturer_name', 'material_type', 'city', 'days_in_transit'],
+                        color_discrete_map={'Recovered ✅': '#2E7D32', 'Leaked ⚠️': '#C62828'},
+                        zoom=4,
+                        height=550,
+                        title=f"Live Waste Tracking - {india_count} products"
+                    )
                 
-                # Center map based on selection
-                if selected_city != 'All' and selected_city in cities_data:
-                    center_lat = cities_data[selected_city]['lat']
-                    center_lon = cities_data[selected_city]['lon']
-                    zoom_level = 8
-                else:
-                    center_lat = 22.5
-                    center_lon = 79.0
-                    zoom_level = 4
+                    # Center map based on selection
+                    if selected_city != 'All' and selected_city in cities_data:
+                        center_lat = cities_data[selected_city]['lat']
+                        center_lon = cities_data[selected_city]['lon']
+                        zoom_level = 8
+                    else:
+                        center_lat = 22.5
+                        center_lon = 79.0
+                        zoom_level = 4
                 
-                fig.update_layout(
-                    mapbox=dict(
-                        center=dict(lat=center_lat, lon=center_lon),
-                        zoom=zoom_level,
-                        style="carto-positron"
-                    ),
-                    margin={"r":0, "t":30, "l":0, "b":0},
-                    showlegend=True,
-                    legend=dict(
-                        yanchor="top",
-                        y=0.99,
-                        xanchor="left",
-                        x=0.01,
-                        bgcolor="rgba(255,255,255,0.9)",
-                        bordercolor="#2E7D32",
-                        borderwidth=1
+                    fig.update_layout(
+                        mapbox=dict(
+                            center=dict(lat=center_lat, lon=center_lon),
+                            zoom=zoom_level,
+                            style="carto-positron"
+                        ),
+                        margin={"r":0, "t":30, "l":0, "b":0},
+                        showlegend=True,
+                        legend=dict(
+                            yanchor="top",
+                            y=0.99,
+                            xanchor="left",
+                            x=0.01,
+                            bgcolor="rgba(255,255,255,0.9)",
+                            bordercolor="#2E7D32",
+                            borderwidth=1
+                        )
                     )
-                )
                 
-                st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True)
                 
-                # City stats
-                if selected_city != 'All':
-                    city_data = filtered_df[filtered_df['city'] == selected_city]
-                    city_recovery = city_data['recovered'].mean() * 100
-                    st.info(f"📍 **{selected_city}** - Recovery Rate: {city_recovery:.1f}% | Total Products: {len(city_data)}")
+                    # City stats
+                    if selected_city != 'All':
+                        city_data = filtered_df[filtered_df['city'] == selected_city]
+                        city_recovery = city_data['recovered'].mean() * 100
+                        st.info(f"📍 **{selected_city}** - Recovery Rate: {city_recovery:.1f}% | Total Products: {len(city_data)}")
+                else:
+                    st.warning("No map data available for selected filters")
             else:
-                st.warning("No map data available for selected filters")
-        else:
-            st.warning("No location data available")
+                st.warning("No location data available")
         
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
     
-    with col2:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("🔥 Leakage Hotspots")
+        profiler.lap("tab1: hotspots")
+        with col2:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("🔥 Leakage Hotspots")
         
-        # Calculate city-wise leakage
-        city_leakage = filtered_df.groupby('city').agg({
-            'recovered': ['count', 'sum', 'mean']
-        }).reset_index()
-        city_leakage.columns = ['city', 'total', 'recovered_count', 'recovery_rate']
-        city_leakage['leakage_rate'] = 100 - (city_leakage['recovery_rate'] * 100)
-        city_leakage = city_leakage.sort_values('leakage_rate', ascending=False).head(10)
+            # Calculate city-wise leakage
+            with profiler.section("city_leakage_stats", rows=lambda: len(city_leakage)):
+                city_leakage = city_leakage_stats(version_key, filters_key, filtered_df)
         
-        for _, row in city_leakage.iterrows():
-            leakage = row['leakage_rate']
-            if leakage > 40:
-                color = '#C62828'
-                badge = 'badge-danger'
-                status_text = 'CRITICAL'
-            elif leakage > 30:
-                color = '#F57C00'
-                badge = 'badge-warning'
-                status_text = 'HIGH'
-            else:
-                color = '#2E7D32'
-                badge = 'badge-success'
-                status_text = 'MODERATE'
+            for _, row in city_leakage.iterrows():
+                leakage = row['leakage_rate']
+                if leakage > 40:
+                    color = '#C62828'
+                    badge = 'badge-danger'
+                    status_text = 'CRITICAL'
+                elif leakage > 30:
+                    color = '#F57C00'
+                    badge = 'badge-warning'
+                    status_text = 'HIGH'
+                else:
+                    color = '#2E7D32'
+                    badge = 'badge-success'
+                    status_text = 'MODERATE'
             
-            st.markdown(f"""
-                <div style="background: white; padding: 12px; border-radius: 8px; margin: 8px 0; border-left: 5px solid {color};">
-                    <div style="display: flex; justify-content: space-between;">
-                        <strong>{row['city']}</strong>
-                        <span class="badge {badge}">{status_text}</span>
-                    </div>
-                    <div style="margin-top: 8px;">
-                        <div style="display: flex; justify-content: space-between; font-size: 0.9rem;">
-                            <span>Leakage: {leakage:.1f}%</span>
-                            <span>Products: {int(row['total'])}</span>
+                st.markdown(f"""
+                    <div style="background: white; padding: 12px; border-radius: 8px; margin: 8px 0; border-left: 5px solid {color};">
+                        <div style="display: flex; justify-content: space-between;">
+                            <strong>{row['city']}</strong>
+                            <span class="badge {badge}">{status_text}</span>
                         </div>
-                        <div style="background: #f0f0f0; height: 6px; border-radius: 3px; margin-top: 5px;">
-                            <div style="background: {color}; width: {leakage}%; height: 6px; border-radius: 3px;"></div>
+                        <div style="margin-top: 8px;">
+                            <div style="display: flex; justify-content: space-between; font-size: 0.9rem;">
+                                <span>Leakage: {leakage:.1f}%</span>
+                                <span>Products: {int(row['total'])}</span>
+                            </div>
+                            <div style="background: #f0f0f0; height: 6px; border-radius: 3px; margin-top: 5px;">
+                                <div style="background: {color}; width: {leakage}%; height: 6px; border-radius: 3px;"></div>
+                            </div>
                         </div>
                     </div>
-                </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
         
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== TAB 2: RECOVERY ANALYTICS ====================
+profiler.lap("tab2: recovery analytics")
 with tab2:
-    col1, col2 = st.columns(2)
+    if tab2.open:
+        with profiler.section("recovery_stats", rows=lambda: len(material_stats) + len(zone_stats)):
+            material_stats, zone_stats = recovery_stats(version_key, filters_key, filtered_df)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("📊 Recovery by Material")
+        with col1:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("📊 Recovery by Material")
         
-        material_stats = filtered_df.groupby('material_type').agg({
-            'recovered': ['count', 'sum', 'mean']
-        }).reset_index()
-        material_stats.columns = ['material', 'total', 'recovered', 'rate']
-        material_stats['rate'] = (material_stats['rate'] * 100).round(1)
-        material_stats = material_stats.sort_values('rate', ascending=False)
+            fig = px.bar(
+                material_stats,
+                x='material',
+                y='rate',
+                color='rate',
+                color_continuous_scale='RdYlGn',
+                text='rate',
+                title=f"Recovery Rate by Material Type"
+            )
+            fig.update_traces(texttemplate='%{text}%', textposition='outside')
+            fig.update_layout(
+                height=400,
+                yaxis_title="Recovery Rate (%)",
+                xaxis_title="",
+                yaxis=dict(range=[0, 100])
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+        with col2:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("📈 Zone Performance")
         
-        fig = px.bar(
-            material_stats,
-            x='material',
-            y='rate',
-            color='rate',
-            color_continuous_scale='RdYlGn',
-            text='rate',
-            title=f"Recovery Rate by Material Type"
+            fig = px.pie(
+                zone_stats,
+                values='total',
+                names='zone',
+                title="Waste Distribution by Zone",
+                color_discrete_sequence=px.colors.sequential.Greens
+            )
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+        # Recovery trend
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("📉 Recovery Trend Analysis")
+
+        # Served from the pre-aggregated rollups, never from the raw rows
+        granularity = st.selectbox("Granularity", ["Auto", "Minute", "Hour", "Day", "Week"], index=0,
+                                   key="trend_granularity")
+        with profiler.section("timeseries.series", rows=lambda: len(trend)):
+            resolution, trend = load_timeseries(version_key).series(
+                None if granularity == "Auto" else granularity.lower(),
+                filters={'zone': selected_zone, 'city': selected_city, 'material': selected_material,
+                         'category': selected_category, 'status': status, 'manufacturer': selected_manufacturer},
+                start=time_range[0], end=time_range[1]
+            )
+        trend_labels = {'minute': "Per-minute", 'hour': "Hourly", 'day': "Daily", 'week': "Weekly"}
+    
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=trend['time'],
+            y=trend['recovery_rate'],
+            mode='lines+markers',
+            name='Recovery Rate',
+            line=dict(color='#2E7D32', width=3),
+            fill='tozeroy',
+            fillcolor='rgba(46, 125, 50, 0.1)'
+        ))
+        fig.add_hline(
+            y=75, 
+            line_dash="dash", 
+            line_color="#F57C00",
+            annotation_text="National Target: 75%",
+            annotation_position="bottom right"
         )
-        fig.update_traces(texttemplate='%{text}%', textposition='outside')
         fig.update_layout(
             height=400,
+            title=f"{trend_labels[resolution]} Recovery Rate Trend",
             yaxis_title="Recovery Rate (%)",
-            xaxis_title="",
+            xaxis_title="Week Starting" if resolution == 'week' else "",
             yaxis=dict(range=[0, 100])
         )
         st.plotly_chart(fig, use_container_width=True)
+        retention = RESOLUTIONS[resolution][1]
+        if retention is not None:
+            st.caption(f"{trend_labels[resolution]} points are kept for the last {retention // 86400} days; "
+                       f"{len(trend):,} points shown.")
         st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("📈 Zone Performance")
-        
-        zone_stats = filtered_df.groupby('zone').agg({
-            'recovered': ['count', 'sum', 'mean']
-        }).reset_index()
-        zone_stats.columns = ['zone', 'total', 'recovered', 'rate']
-        zone_stats['rate'] = (zone_stats['rate'] * 100).round(1)
-        
-        fig = px.pie(
-            zone_stats,
-            values='total',
-            names='zone',
-            title="Waste Distribution by Zone",
-            color_discrete_sequence=px.colors.sequential.Greens
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Recovery trend
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    st.subheader("📉 Recovery Trend Analysis")
-    
-    filtered_df['date'] = pd.to_datetime(filtered_df['manufacturing_date'], unit='s')
-    filtered_df['week'] = filtered_df['date'].dt.isocalendar().week
-    weekly = filtered_df.groupby('week')['recovered'].mean().reset_index()
-    weekly['recovered'] = weekly['recovered'] * 100
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=weekly['week'],
-        y=weekly['recovered'],
-        mode='lines+markers',
-        name='Recovery Rate',
-        line=dict(color='#2E7D32', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(46, 125, 50, 0.1)'
-    ))
-    fig.add_hline(
-        y=75, 
-        line_dash="dash", 
-        line_color="#F57C00",
-        annotation_text="National Target: 75%",
-        annotation_position="bottom right"
-    )
-    fig.update_layout(
-        height=400,
-        title="Weekly Recovery Rate Trend",
-        yaxis_title="Recovery Rate (%)",
-        xaxis_title="Week Number",
-        yaxis=dict(range=[0, 100])
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== TAB 3: EPR COMPLIANCE ====================
+profiler.lap("tab3: EPR compliance")
 with tab3:
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    st.subheader("🏭 Extended Producer Responsibility (EPR) Compliance")
-    
-    # Manufacturer compliance
-    mfg_stats = filtered_df.groupby('manufacturer_name').agg({
-        'recovered': ['count', 'sum', 'mean'],
-        'circular_credit_amount': 'sum',
-        'carbon_footprint': 'sum',
-        'batch_quality_score': 'mean'
-    }).reset_index()
-    mfg_stats.columns = ['manufacturer', 'total', 'recovered_count', 'recovery_rate', 
-                        'credits', 'carbon_total', 'quality_score']
-    mfg_stats['recovery_rate'] = (mfg_stats['recovery_rate'] * 100).round(1)
-    mfg_stats['compliance_status'] = mfg_stats['recovery_rate'].apply(
-        lambda x: '✅ Compliant' if x >= 75 else '⚠️ At Risk' if x >= 60 else '❌ Non-Compliant'
-    )
-    mfg_stats = mfg_stats.sort_values('recovery_rate', ascending=False)
+    if tab3.open:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("🏭 Extended Producer Responsibility (EPR) Compliance")
     
-    # Color mapping
-    color_map = {
-        '✅ Compliant': '#2E7D32',
-        '⚠️ At Risk': '#F57C00',
-        '❌ Non-Compliant': '#C62828'
-    }
+        # Manufacturer compliance
+        with profiler.section("epr_stats", rows=lambda: len(mfg_stats)):
+            mfg_stats = epr_stats(version_key, filters_key, filtered_df)
     
-    fig = px.bar(
-        mfg_stats.head(15),
-        x='recovery_rate',
-        y='manufacturer',
-        orientation='h',
-        color='compliance_status',
-        color_discrete_map=color_map,
-        text='recovery_rate',
-        title="EPR Compliance by Manufacturer (Top 15)"
-    )
-    fig.update_traces(texttemplate='%{text}%', textposition='outside')
-    fig.update_layout(
-        height=600,
-        xaxis_title="Recovery Rate (%)",
-        yaxis_title="",
-        xaxis=dict(range=[0, 100])
-    )
-    fig.add_vline(x=75, line_dash="dash", line_color="#2E7D32", annotation_text="Target")
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Compliance table
-    st.subheader("📋 Detailed EPR Report")
-    
-    display_df = mfg_stats[['manufacturer', 'total', 'recovered_count', 'recovery_rate', 
-                           'compliance_status', 'credits', 'quality_score']].copy()
-    display_df['recovery_rate'] = display_df['recovery_rate'].astype(str) + '%'
-    display_df['credits'] = display_df['credits'].apply(lambda x: f"₹{x:,.0f}")
-    display_df['quality_score'] = display_df['quality_score'].round(1).astype(str) + '%'
-    display_df.columns = ['Manufacturer', 'Total Products', 'Recovered', 'Recovery %', 
-                         'Status', 'Circular Credits', 'Quality Score']
-    
-    st.dataframe(
-        display_df,
-        use_container_width=True,
-        height=400,
-        column_config={
-            "Status": st.column_config.TextColumn(
-                "Status",
-                help="Compliance status based on 75% target",
-                width="medium"
-            )
+        # Color mapping
+        color_map = {
+            '✅ Compliant': '#2E7D32',
+            '⚠️ At Risk': '#F57C00',
+            '❌ Non-Compliant': '#C62828'
         }
-    )
-    st.markdown('</div>', unsafe_allow_html=True)
+    
+        fig = px.bar(
+            mfg_stats.head(15),
+            x='recovery_rate',
+            y='manufacturer',
+            orientation='h',
+            color='compliance_status',
+            color_discrete_map=color_map,
+            text='recovery_rate',
+            title="EPR Compliance by Manufacturer (Top 15)"
+        )
+        fig.update_traces(texttemplate='%{text}%', textposition='outside')
+        fig.update_layout(
+            height=600,
+            xaxis_title="Recovery Rate (%)",
+            yaxis_title="",
+            xaxis=dict(range=[0, 100])
+        )
+        fig.add_vline(x=75, line_dash="dash", line_color="#2E7D32", annotation_text="Target")
+        st.plotly_chart(fig, use_container_width=True)
+    
+        # Compliance table
+        st.subheader("📋 Detailed EPR Report")
+    
+        display_df = mfg_stats[['manufacturer', 'total', 'recovered_count', 'recovery_rate', 
+                               'compliance_status', 'credits', 'quality_score']].copy()
+        display_df['recovery_rate'] = display_df['recovery_rate'].astype(str) + '%'
+        display_df['credits'] = display_df['credits'].apply(lambda x: f"₹{x:,.0f}")
+        display_df['quality_score'] = display_df['quality_score'].round(1).astype(str) + '%'
+        display_df.columns = ['Manufacturer', 'Total Products', 'Recovered', 'Recovery %', 
+                             'Status', 'Circular Credits', 'Quality Score']
+    
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            height=400,
+            column_config={
+                "Status": st.column_config.TextColumn(
+                    "Status",
+                    help="Compliance status based on 75% target",
+                    width="medium"
+                )
+            }
+        )
+
+        # Full CPCB export runs in a worker thread over the published ledger
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            export_format = st.selectbox("Export format", ["CSV", "Parquet"], key="epr_export_format")
+        with col2:
+            st.write("")
+            job = st.session_state.get('epr_export')
+            if st.button("📤 Export full EPR report", use_container_width=True, disabled=job is not None and not job.done):
+                st.session_state['epr_export'] = ExportJob(
+                    ledger.path, export_format.lower(),
+                    filters=(selected_zone, selected_city, selected_material, selected_category, status,
+                             selected_manufacturer),
+                    time_range=time_range if time_range != (None, None) else None,
+                    partitions=ledger.partitions
+                ).start()
+                st.rerun()
+
+        export_progress('epr_export', "EPR report")
+        st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== TAB 4: AI WASTE ADVISOR ====================
+profiler.lap("tab4: advisor")
 with tab4:
-    if enable_chatbot:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("🤖 LiveAI™ Waste Advisor")
+    if tab4.open:
+        if enable_chatbot:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("🤖 LiveAI™ Waste Advisor")
         
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                padding: 20px; 
-                border-radius: 10px; 
-                color: white;
-                margin-bottom: 20px;">
-                <h4 style="margin: 0; color: white;">🔍 Ask anything about your waste data</h4>
-                <p style="margin: 5px 0 0 0; opacity: 0.9;">Powered by Pathway + RAG</p>
-            </div>
-        """, unsafe_allow_html=True)
+            st.markdown("""
+                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                    padding: 20px; 
+                    border-radius: 10px; 
+                    color: white;
+                    margin-bottom: 20px;">
+                    <h4 style="margin: 0; color: white;">🔍 Ask anything about your waste data</h4>
+                    <p style="margin: 5px 0 0 0; opacity: 0.9;">Powered by Pathway + RAG</p>
+                </div>
+            """, unsafe_allow_html=True)
         
-        # Predefined queries
-        query = st.selectbox(
-            "Select a query or type your own:",
-            [
-                "Which cities have the highest leakage rate?",
-                "Show me non-compliant manufacturers in South India",
-                "What's the recovery trend for E-Waste?",
-                "Which zones need immediate intervention?",
-                "Calculate total carbon savings this month",
-                "Predict leakage risk for next week"
-            ]
-        )
+            # Suggested queries; free text is parsed into the same intents
+            query = st.selectbox(
+                "Select a query or type your own:",
+                EXAMPLES
+            )
+            custom_query = st.text_input("💬 Your question", placeholder="e.g. Which Plastic manufacturers in West are below 50%?")
+            query = custom_query.strip() or query
         
-        if st.button("🔍 Analyze", use_container_width=True):
-            with st.spinner("🤖 AI analyzing your data..."):
-                time.sleep(2)  # Simulate processing
-                
-                # Generate response based on query
-                if "highest leakage" in query:
-                    top_cities = city_leakage.head(3)
-                    response = f"**Analysis Result:**\n\nBased on your filters, the cities with highest leakage are:\n\n"
-                    for _, city in top_cities.iterrows():
-                        response += f"- **{city['city']}**: {city['leakage_rate']:.1f}% leakage ({int(city['total'])} products)\n"
-                    response += f"\n📊 **Recommendation:** Immediate intervention required in {top_cities.iloc[0]['city']}"
-                    
-                elif "non-compliant manufacturers" in query:
-                    non_compliant = mfg_stats[mfg_stats['recovery_rate'] < 60]
-                    response = f"**EPR Compliance Report:**\n\nFound **{len(non_compliant)}** non-compliant manufacturers:\n\n"
-                    for _, mfg in non_compliant.head(5).iterrows():
-                        response += f"- **{mfg['manufacturer']}**: {mfg['recovery_rate']:.1f}% recovery rate\n"
-                    response += f"\n⚠️ **Action Required**: Send compliance notices immediately"
-                    
-                elif "E-Waste" in query:
-                    ewaste = filtered_df[filtered_df['material_type'] == 'E-Waste']
-                    recovery = ewaste['recovered'].mean() * 100
-                    response = f"**E-Waste Analysis:**\n\n"
-                    response += f"- Total E-Waste products: {len(ewaste)}\n"
-                    response += f"- Recovery rate: {recovery:.1f}%\n"
-                    response += f"- Circular credits generated: ₹{ewaste['circular_credit_amount'].sum():,.0f}\n"
-                    response += f"- Carbon saved: {ewaste[ewaste['recovered']==True]['carbon_footprint'].sum()*0.7/1000:.1f} tons\n\n"
-                    response += f"📈 **Trend**: E-Waste recovery is {'improving' if recovery > 60 else 'declining'}"
-                    
-                elif "zones" in query:
-                    zone_perf = filtered_df.groupby('zone')['recovered'].mean() * 100
-                    worst_zone = zone_perf.idxmin()
-                    response = f"**Zone Performance Analysis:**\n\n"
-                    for zone, rate in zone_perf.items():
-                        response += f"- **{zone}**: {rate:.1f}% recovery\n"
-                    response += f"\n🚨 **Critical Zone**: {worst_zone} needs immediate attention"
-                    
-                elif "carbon savings" in query:
-                    total_carbon = filtered_df[filtered_df['recovered']==True]['carbon_footprint'].sum() * 0.7 / 1000
-                    trees = int(total_carbon / 0.5)
-                    response = f"**Environmental Impact:**\n\n"
-                    response += f"- Total CO₂ saved: **{total_carbon:.1f} tons**\n"
-                    response += f"- Equivalent to **{trees:,} trees** planted\n"
-                    response += f"- Circular credits generated: **₹{filtered_df['circular_credit_amount'].sum():,.0f}**"
-                    
-                else:
-                    response = "🔮 **Prediction**: Based on current trends, leakage rate is expected to decrease by 5% next week if intervention continues in hotspots."
-                
+            if st.button("🔍 Analyze", use_container_width=True):
+                with profiler.section("advisor.ask"):
+                    response, elapsed_ms, cached = load_advisor().ask(
+                        query,
+                        {'zone': selected_zone, 'city': selected_city, 'material': selected_material,
+                         'category': selected_category, 'status': status, 'manufacturer': selected_manufacturer},
+                        version_key, load_timeseries(version_key), start=time_range[0], end=time_range[1]
+                    )
+            
                 # Display response in chat bubble
                 st.markdown(f"""
                     <div style="background: #E8F5E9; padding: 20px; border-radius: 15px; border-left: 5px solid #2E7D32;">
@@ -1017,235 +1272,216 @@ with tab4:
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
+                st.caption(f"⚡ Answered in {elapsed_ms:.1f} ms{' (cached)' if cached else ''}")
         
-        st.markdown('</div>', unsafe_allow_html=True)
-    else:
-        st.info("Enable AI Waste Advisor in sidebar to use this feature")
+            st.markdown('</div>', unsafe_allow_html=True)
+        else:
+            st.info("Enable AI Waste Advisor in sidebar to use this feature")
 
 # ==================== TAB 5: PREDICTIVE INTELLIGENCE ====================
+profiler.lap("tab5: predictions")
 with tab5:
-    if enable_predictions:
-        col1, col2 = st.columns(2)
+    if tab5.open:
+        if enable_predictions:
+            with profiler.section("risk_stats", rows=lambda: len(scatter_sample)):
+                risk_data, scatter_sample = risk_stats(version_key, filters_key, filtered_df)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.subheader("🔮 Microplastic Risk Prediction")
+            with col1:
+                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+                st.subheader("🔮 Microplastic Risk Prediction")
             
-            # Calculate risk by city
-            risk_data = filtered_df.groupby('city').agg({
-                'microplastic_risk': 'mean',
-                'soil_contamination_index': 'mean',
-                'days_in_transit': 'mean'
-            }).reset_index()
-            risk_data = risk_data.sort_values('microplastic_risk', ascending=False).head(10)
-            
-            fig = px.bar(
-                risk_data,
-                x='city',
-                y='microplastic_risk',
-                color='microplastic_risk',
-                color_continuous_scale='RdYlGn_r',
-                title="Microplastic Risk Index by City"
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+                if risk_data is not None:
+                    fig = px.bar(
+                        risk_data,
+                        x='city',
+                        y='microplastic_risk',
+                        color='microplastic_risk',
+                        color_continuous_scale='RdYlGn_r',
+                        title="Microplastic Risk Index by City"
+                    )
+                    fig.update_layout(height=400)
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("No risk indices in the current data source")
+                st.markdown('</div>', unsafe_allow_html=True)
         
-        with col2:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.subheader("🌱 Soil Contamination Forecast")
+            with col2:
+                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+                st.subheader("🌱 Soil Contamination Forecast")
             
-            fig = px.scatter(
-                filtered_df.sample(min(500, len(filtered_df))),
-                x='days_in_transit',
-                y='soil_contamination_index',
-                color='recovered',
-                color_discrete_map={True: '#2E7D32', False: '#C62828'},
-                hover_data=['city', 'material_type'],
-                title="Soil Contamination vs Time in Transit",
-                labels={'days_in_transit': 'Days in Transit', 'soil_contamination_index': 'Contamination Index'}
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Prediction cards
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("📊 7-Day Leakage Prediction")
-        
-        # Simulate predictions
-        cities_pred = ['Delhi NCR', 'Mumbai', 'Bengaluru', 'Chennai', 'Kolkata']
-        pred_data = []
-        
-        for city in cities_pred:
-            current = filtered_df[filtered_df['city'] == city]['recovered'].mean() * 100 if len(filtered_df[filtered_df['city'] == city]) > 0 else 65
-            pred = current + np.random.uniform(-5, 8)
-            pred_data.append({
-                'City': city,
-                'Current': current,
-                'Predicted': max(0, min(100, pred)),
-                'Trend': '📈' if pred > current else '📉'
-            })
-        
-        pred_df = pd.DataFrame(pred_data)
+                if risk_data is not None:
+                    fig = px.scatter(
+                        scatter_sample,
+                        x='days_in_transit',
+                        y='soil_contamination_index',
+                        color='recovered',
+                        color_discrete_map={True: '#2E7D32', False: '#C62828'},
+                        hover_data=['city', 'material_type'],
+                        title="Soil Contamination vs Time in Transit",
+                        labels={'days_in_transit': 'Days in Transit', 'soil_contamination_index': 'Contamination Index'}
+                    )
+                    fig.update_layout(height=400)
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("No contamination index in the current data source")
+                st.markdown('</div>', unsafe_allow_html=True)
         
-        for _, row in pred_df.iterrows():
-            color = '#2E7D32' if row['Predicted'] > row['Current'] else '#C62828'
-            st.markdown(f"""
-                <div style="background: white; padding: 15px; border-radius: 10px; margin: 10px 0; border: 1px solid #e0e0e0;">
-                    <div style="display: flex; justify-content: space-between;">
-                        <span><b>{row['City']}</b> {row['Trend']}</span>
-                        <span style="color: {color};">{row['Predicted']:.1f}% predicted recovery</span>
-                    </div>
-                    <div style="margin-top: 10px;">
-                        <div style="display: flex; gap: 20px;">
-                            <div style="flex: 1;">
-                                <small>Current: {row['Current']:.1f}%</small>
-                                <div style="background: #f0f0f0; height: 8px; border-radius: 4px;">
-                                    <div style="background: #666; width: {row['Current']}%; height: 8px; border-radius: 4px;"></div>
+            # Prediction cards
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("📊 7-Day Leakage Prediction")
+
+            # Forecasts are fitted once per data version; the filters only pick the series shown
+            with profiler.section("timeseries.rollup", rows=lambda: len(selection)):
+                selection = load_timeseries(version_key).rollup(
+                    ['city', 'material_type'],
+                    filters={'zone': selected_zone, 'city': selected_city, 'material': selected_material,
+                             'category': selected_category, 'status': status, 'manufacturer': selected_manufacturer},
+                    start=time_range[0], end=time_range[1]
+                )
+            with profiler.section("forecasts", rows=lambda: len(pred_df)):
+                pred_df = city_outlook(load_forecasts(version_key), selection)
+            if pred_df.empty:
+                st.info("No city has enough history under the current filters to forecast")
+            for _, row in pred_df.iterrows():
+                color = '#2E7D32' if row['Predicted'] > row['Current'] else '#C62828'
+                st.markdown(f"""
+                    <div style="background: white; padding: 15px; border-radius: 10px; margin: 10px 0; border: 1px solid #e0e0e0;">
+                        <div style="display: flex; justify-content: space-between;">
+                            <span><b>{row['City']}</b> {row['Trend']}</span>
+                            <span style="color: {color};">{row['Predicted']:.1f}% predicted recovery</span>
+                        </div>
+                        <div style="margin-top: 10px;">
+                            <div style="display: flex; gap: 20px;">
+                                <div style="flex: 1;">
+                                    <small>Current: {row['Current']:.1f}%</small>
+                                    <div style="background: #f0f0f0; height: 8px; border-radius: 4px;">
+                                        <div style="background: #666; width: {row['Current']}%; height: 8px; border-radius: 4px;"></div>
+                                    </div>
                                 </div>
-                            </div>
-                            <div style="flex: 1;">
-                                <small>Predicted: {row['Predicted']:.1f}%</small>
-                                <div style="background: #f0f0f0; height: 8px; border-radius: 4px;">
-                                    <div style="background: {color}; width: {row['Predicted']}%; height: 8px; border-radius: 4px;"></div>
+                                <div style="flex: 1;">
+                                    <small>Predicted: {row['Predicted']:.1f}%</small>
+                                    <div style="background: #f0f0f0; height: 8px; border-radius: 4px;">
+                                        <div style="background: {color}; width: {row['Predicted']}%; height: 8px; border-radius: 4px;"></div>
+                                    </div>
                                 </div>
                             </div>
                         </div>
                     </div>
-                </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
         
-        st.markdown('</div>', unsafe_allow_html=True)
-    else:
-        st.info("Enable Microplastic Prediction in sidebar to use this feature")
+            st.markdown('</div>', unsafe_allow_html=True)
+        else:
+            st.info("Enable Microplastic Prediction in sidebar to use this feature")
 
 # ==================== TAB 6: LIVE ALERTS ====================
+profiler.lap("tab6: alerts")
 with tab6:
-    col1, col2 = st.columns([1, 1])
+    if tab6.open:
+        with profiler.section("alert_stats", rows=lambda: critical_count):
+            critical, critical_count, recent = alert_stats(version_key, filters_key, threshold, filtered_df)
+        col1, col2 = st.columns([1, 1])
     
-    with col1:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("🚨 Critical Alerts")
-        
-        # Critical alerts based on filters
-        critical = filtered_df[(filtered_df['recovered'] == False) & 
-                               (filtered_df['days_in_transit'] > threshold/24)]
+        with col1:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("🚨 Critical Alerts")
         
-        if len(critical) > 0:
-            for _, alert in critical.head(5).iterrows():
-                days = int(alert['days_in_transit'])
-                severity = "CRITICAL" if days > 30 else "HIGH" if days > 15 else "MODERATE"
+            # Critical alerts based on filters
+            if critical_count > 0:
+                for _, alert in critical.iterrows():
+                    days = int(alert['days_in_transit'])
+                    severity = "CRITICAL" if days > 30 else "HIGH" if days > 15 else "MODERATE"
                 
-                # Regional language alert if enabled
-                if enable_alerts:
-                    lang_alert = {
-                        'Hindi': f'सतर्कता: {alert["city"]} में {days} दिनों से लीकेज',
-                        'Kannada': f'ಎಚ್ಚರಿಕೆ: {alert["city"]} ನಲ್ಲಿ {days} ದಿನಗಳಿಂದ ಸೋರಿಕೆ',
-                        'Tamil': f'எச்சரிக்கை: {alert["city"]} இல் {days} நாட்களாக கசிவு'
-                    }
-                    language = random.choice(list(lang_alert.keys()))
-                    lang_msg = lang_alert[language]
-                else:
-                    lang_msg = ""
+                    # Regional language alert if enabled
+                    if enable_alerts:
+                        lang_alert = {
+                            'Hindi': f'सतर्कता: {alert["city"]} में {days} दिनों से लीकेज',
+                            'Kannada': f'ಎಚ್ಚರಿಕೆ: {alert["city"]} ನಲ್ಲಿ {days} ದಿನಗಳಿಂದ ಸೋರಿಕೆ',
+                            'Tamil': f'எச்சரிக்கை: {alert["city"]} இல் {days} நாட்களாக கசிவு'
+                        }
+                        language = random.choice(list(lang_alert.keys()))
+                        lang_msg = lang_alert[language]
+                    else:
+                        lang_msg = ""
                 
-                st.markdown(f"""
-                    <div class="critical-alert">
-                        <div style="display: flex; align-items: flex-start; gap: 12px;">
-                            <span style="font-size: 2rem;">⚠️</span>
-                            <div style="flex: 1;">
-                                <div style="display: flex; justify-content: space-between;">
-                                    <strong style="color: #C62828;">{severity} LEAK</strong>
-                                    <span class="badge badge-danger">{alert['city']}</span>
-                                </div>
-                                <p style="margin: 5px 0;">
-                                    <b>Product:</b> {alert['product_id']}<br>
-                                    <b>Material:</b> {alert['material_type']}<br>
-                                    <b>Time:</b> {days} days in transit<br>
-                                    <b>Manufacturer:</b> {alert['manufacturer_name']}
-                                </p>
-                                {f'<p style="background: #ffebee; padding: 5px; border-radius: 5px; font-size: 0.9rem;">🗣️ {lang_msg}</p>' if lang_msg else ''}
-                                <div style="margin-top: 8px;">
-                                    <span class="badge badge-danger">ESCALATE</span>
-                                    <span class="badge badge-warning" style="margin-left: 5px;">TRACE</span>
+                    st.markdown(f"""
+                        <div class="critical-alert">
+                            <div style="display: flex; align-items: flex-start; gap: 12px;">
+                                <span style="font-size: 2rem;">⚠️</span>
+                                <div style="flex: 1;">
+                                    <div style="display: flex; justify-content: space-between;">
+                                        <strong style="color: #C62828;">{severity} LEAK</strong>
+                                        <span class="badge badge-danger">{alert['city']}</span>
+                                    </div>
+                                    <p style="margin: 5px 0;">
+                                        <b>Product:</b> {alert['product_id']}<br>
+                                        <b>Material:</b> {alert['material_type']}<br>
+                                        <b>Time:</b> {days} days in transit<br>
+                                        <b>Manufacturer:</b> {alert['manufacturer_name']}
+                                    </p>
+                                    {f'<p style="background: #ffebee; padding: 5px; border-radius: 5px; font-size: 0.9rem;">🗣️ {lang_msg}</p>' if lang_msg else ''}
+                                    <div style="margin-top: 8px;">
+                                        <span class="badge badge-danger">ESCALATE</span>
+                                        <span class="badge badge-warning" style="margin-left: 5px;">TRACE</span>
+                                    </div>
                                 </div>
                             </div>
                         </div>
-                    </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.success("✅ No critical alerts in selected filters")
+                    """, unsafe_allow_html=True)
+            else:
+                st.success("✅ No critical alerts in selected filters")
         
-        st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
     
-    with col2:
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("✅ Recent Recoveries")
-        
-        recent = filtered_df[filtered_df['recovered'] == True].sort_values('days_in_transit').head(5)
+        with col2:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.subheader("✅ Recent Recoveries")
         
-        if len(recent) > 0:
-            for _, rec in recent.iterrows():
-                carbon = rec.get('carbon_footprint', 0) * 0.7
+            if len(recent) > 0:
+                for _, rec in recent.iterrows():
+                    carbon = rec.get('carbon_footprint', 0) * 0.7
                 
-                # Eco-points for citizens
-                eco_points = int(rec['weight_kg'] * 10)
+                    # Eco-points for citizens
+                    eco_points = int(rec['weight_kg'] * 10)
                 
-                st.markdown(f"""
-                    <div class="success-alert">
-                        <div style="display: flex; align-items: flex-start; gap: 12px;">
-                            <span style="font-size: 2rem;">✅</span>
-                            <div style="flex: 1;">
-                                <div style="display: flex; justify-content: space-between;">
-                                    <strong style="color: #2E7D32;">RECOVERED</strong>
-                                    <span class="badge badge-success">{rec['city']}</span>
-                                </div>
-                                <p style="margin: 5px 0;">
-                                    <b>Product:</b> {rec['product_id']}<br>
-                                    <b>Center:</b> {rec['recovery_center_name']}<br>
-                                    <b>Credit:</b> ₹{rec['circular_credit_amount']:.0f}<br>
-                                    <b>Carbon saved:</b> {carbon:.1f} kg
-                                </p>
-                                <div style="background: #E8F5E9; padding: 5px; border-radius: 5px; margin-top: 5px;">
-                                    <span>👤 Citizen earned <b>{eco_points} EcoPoints</b> (redeemable via UPI)</span>
+                    st.markdown(f"""
+                        <div class="success-alert">
+                            <div style="display: flex; align-items: flex-start; gap: 12px;">
+                                <span style="font-size: 2rem;">✅</span>
+                                <div style="flex: 1;">
+                                    <div style="display: flex; justify-content: space-between;">
+                                        <strong style="color: #2E7D32;">RECOVERED</strong>
+                                        <span class="badge badge-success">{rec['city']}</span>
+                                    </div>
+                                    <p style="margin: 5px 0;">
+                                        <b>Product:</b> {rec['product_id']}<br>
+                                        <b>Center:</b> {rec['recovery_center_name']}<br>
+                                        <b>Credit:</b> ₹{rec['circular_credit_amount']:.0f}<br>
+                                        <b>Carbon saved:</b> {carbon:.1f} kg
+                                    </p>
+                                    <div style="background: #E8F5E9; padding: 5px; border-radius: 5px; margin-top: 5px;">
+                                        <span>👤 Citizen earned <b>{eco_points} EcoPoints</b> (redeemable via UPI)</span>
+                                    </div>
                                 </div>
                             </div>
                         </div>
-                    </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("No recent recoveries in selected filters")
+                    """, unsafe_allow_html=True)
+            else:
+                st.info("No recent recoveries in selected filters")
         
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Activity timeline
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    st.subheader("⏱️ Live Activity Feed")
-    
-    feed_html = '<div style="height: 400px; overflow-y: scroll; padding: 10px; background: #f8f9fa; border-radius: 10px;">'
+            st.markdown('</div>', unsafe_allow_html=True)
     
-    for i, row in filtered_df.head(50).iterrows():
-        minutes_ago = random.randint(1, 120)
-        event_time = (datetime.now() - timedelta(minutes=minutes_ago)).strftime("%H:%M:%S")
-        status = "✅ RECOVERED" if row['recovered'] else "⚠️ LEAKED"
-        color = "#2E7D32" if row['recovered'] else "#C62828"
-        bg_color = "#E8F5E9" if row['recovered'] else "#FFEBEE"
-        
-        feed_html += f"""
-            <div style="display: flex; align-items: center; padding: 8px; background: {bg_color}; margin: 5px 0; border-radius: 5px; border-left: 3px solid {color};">
-                <span style="width: 70px; color: #666; font-size: 0.8rem;">{event_time}</span>
-                <span style="width: 90px; font-weight: 600; color: {color};">{status}</span>
-                <span style="width: 100px;">{row['city']}</span>
-                <span style="width: 100px;">{row['material_type']}</span>
-                <span style="flex: 1;">{row['manufacturer_name'][:15]}...</span>
-            </div>
-        """
+        # Activity timeline
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("⏱️ Live Activity Feed")
     
-    feed_html += '</div>'
-    st.markdown(feed_html, unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+        with profiler.section("activity_feed_html", rows=lambda: len(feed_html)):
+            feed_html = activity_feed_html(version_key, filters_key, filtered_df)
+        st.markdown(feed_html, unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== FOOTER WITH BHARAT-SPECIFIC FEATURES ====================
+profiler.lap("footer")
 st.markdown("""
     <div class="footer">
         <div style="display: flex; justify-content: space-around; margin-bottom: 20px;">
@@ -1277,7 +1513,26 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Auto-refresh
-if refresh_rate > 0:
-    time.sleep(refresh_rate)
-    st.rerun()
+# ==================== RENDER PROFILE (ADMIN) ====================
+if profiler.enabled:
+    profiler.lap("admin panel")
+    with st.expander("⏱️ Render Profile (admin)", expanded=True):
+        profile_df = pd.DataFrame(profiler.records[:-1], columns=['name', 'kind', 'ms', 'rows', 'bytes'])
+        regions = profile_df[profile_df['kind'] == 'region']
+        st.markdown(f"**Rerun so far: {profiler.total_ms:,.0f} ms · {regions['bytes'].sum() / 1024:,.1f} KB sent "
+                    f"· {len(filtered_df):,} filtered rows**")
+        profile_df['bytes'] = profile_df['bytes'] / 1024
+        profile_df.columns = ['Section', 'Kind', 'Time (ms)', 'Rows', 'Payload (KB)']
+        st.dataframe(profile_df.round(2), use_container_width=True, hide_index=True)
+        st.caption(f"Every profiled rerun is appended to `{profiler.log_path}`")
+    profiler.finish(session=get_script_run_ctx().session_id, tab=st.session_state.get('active_tab'),
+                    filters=filters_key, filtered_rows=len(filtered_df))
+
+# ==================== CHANGE-DRIVEN REFRESH ====================
+@st.fragment(run_every=refresh_rate)
+def watch_data_version():
+    """Poll the data-version signal; rerun the app only when the sources changed or the hour turned"""
+    if data_version() != st.session_state.get('data_version'):
+        st.rerun()
+
+watch_data_version()
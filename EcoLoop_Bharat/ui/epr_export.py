@@ -0,0 +1,293 @@
+"""
+Background Exports for EcoLoop Bharat
+Streams a CPCB-ready per-manufacturer compliance report from the published
+ledger to CSV or Parquet in a worker thread. The ledger is scanned one record
+batch at a time; partial aggregates are spilled to hash buckets on disk and
+each bucket is reduced and appended to the report, so neither the ledger nor
+the full report is held in memory.
+The filtered product selection is exported the same way: every batch is
+filtered and appended to the output file as soon as it is read.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from ledger_store import apply_filters, filter_expression, ledger_partitions
+
+EXPORT_DIR = "data/exports"
+
+# Same thresholds as the dashboard's compliance badges (% recovered)
+COMPLIANT_RATE = 75
+AT_RISK_RATE = 60
+
+PARTIAL_SCHEMA = pa.schema([
+    ('manufacturer', pa.string()),
+    ('total_products', pa.int64()),
+    ('recovered_products', pa.int64()),
+    ('circular_credits', pa.float64()),
+    ('carbon_footprint_kg', pa.float64()),
+    ('carbon_saved_kg', pa.float64()),
+    ('quality_sum', pa.float64()),
+    ('quality_count', pa.int64()),
+])
+
+
+class ExportJob:
+    """
+    One export running in a daemon thread. Poll `state`, `progress` (0..1)
+    and `message`; `path` is the finished report, `error` the failure.
+    """
+    prefix = "epr_report"
+
+    def __init__(self, ledger_dir, fmt="csv", filters=None, time_range=None, partitions=None,
+                 export_dir=EXPORT_DIR, buckets=16, batch_rows=65_536):
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.ledger_dir = ledger_dir
+        self.fmt = fmt
+        # (zone, city, material, category, status, manufacturer) as passed to apply_filters
+        self.filters = filters or ('All',) * 6
+        self.time_range = time_range
+        # Day partitions to read; defaults to the whole ledger
+        self.partitions = partitions if partitions is not None else ledger_partitions(ledger_dir)
+        # Mapped up front: publish_ledger may delete this version while the job runs,
+        # and the mapped pages outlive the files
+        self._readers = [pa.ipc.open_file(pa.memory_map(os.path.join(ledger_dir, p), "r")) for p in self.partitions]
+        self.schema = (self._readers[0] if self._readers else pa.ipc.open_file(
+            pa.memory_map(os.path.join(ledger_dir, ledger_partitions(ledger_dir)[0]), "r"))).schema
+        self.export_dir = export_dir
+        self.buckets = buckets
+        self.batch_rows = batch_rows
+
+        self.state = "pending"
+        self.progress = 0.0
+        self.message = "Queued"
+        self.rows_scanned = 0
+        self.manufacturers_written = 0
+        self.path = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="epr-export", daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self.state = "running"
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    @property
+    def done(self):
+        return self.state in ("done", "failed", "cancelled")
+
+    def _run(self):
+        tmp_path = None
+        try:
+            os.makedirs(self.export_dir, exist_ok=True)
+            stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            final_path = os.path.join(self.export_dir, f"{self.prefix}_{stamp}.{self.fmt}")
+            tmp_path = f"{final_path}.part"
+
+            self._write(tmp_path)
+            if self._cancel.is_set():
+                self.state, self.message = "cancelled", "Export cancelled"
+                return
+            os.replace(tmp_path, final_path)
+            self.path = final_path
+            self.progress = 1.0
+            self.state = "done"
+            self.message = self._summary()
+        except Exception as exc:
+            self.error = exc
+            self.state, self.message = "failed", f"Export failed: {exc}"
+        finally:
+            # A cancelled or failed export leaves no partial file behind
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self.finished_at = time.time()
+
+    def _write(self, tmp_path):
+        spill_dir = tempfile.mkdtemp(prefix=".epr-spill-", dir=self.export_dir)
+        try:
+            self._scan(spill_dir)
+            if not self._cancel.is_set():
+                self._reduce(spill_dir, tmp_path)
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    def _summary(self):
+        return f"{self.manufacturers_written:,} manufacturers from {self.rows_scanned:,} products"
+
+    def _total_rows(self):
+        return sum(
+            reader.get_batch(i).num_rows for reader in self._readers for i in range(reader.num_record_batches)
+        ) or 1
+
+    def _batches(self):
+        for reader in self._readers:
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, self.batch_rows):
+                    yield batch.slice(offset, self.batch_rows)
+
+    def _scan(self, spill_dir):
+        """Pass 1: filter each batch, pre-aggregate it and spill partials by manufacturer hash"""
+        total_rows = self._total_rows()
+        writers = {}
+        try:
+            for batch in self._batches():
+                if self._cancel.is_set():
+                    return
+                partials = _partial_aggregate(
+                    apply_filters(batch.to_pandas(types_mapper=pd.ArrowDtype), *self.filters,
+                                  time_range=self.time_range)
+                )
+                self.rows_scanned += batch.num_rows
+                self.progress = 0.9 * self.rows_scanned / total_rows
+                self.message = f"Scanned {self.rows_scanned:,} of {total_rows:,} products"
+                if partials.empty:
+                    continue
+
+                bucket_ids = np.array([zlib.crc32(m.encode()) % self.buckets for m in partials['manufacturer']])
+                for bucket in np.unique(bucket_ids):
+                    if bucket not in writers:
+                        sink = pa.OSFile(os.path.join(spill_dir, f"bucket-{bucket}.arrow"), "wb")
+                        writers[bucket] = (sink, pa.ipc.new_stream(sink, PARTIAL_SCHEMA))
+                    rows = partials[bucket_ids == bucket]
+                    writers[bucket][1].write_table(pa.Table.from_pandas(rows, schema=PARTIAL_SCHEMA, preserve_index=False))
+        finally:
+            for sink, writer in writers.values():
+                writer.close()
+                sink.close()
+
+    def _reduce(self, spill_dir, tmp_path):
+        """Pass 2: merge each bucket's partials and append its manufacturers to the report"""
+        bucket_files = sorted(os.listdir(spill_dir))
+        writer = None
+        try:
+            if self.fmt == "parquet":
+                writer = pq.ParquetWriter(tmp_path, report_schema())
+            else:
+                writer = pa_csv.CSVWriter(tmp_path, report_schema())
+            for i, name in enumerate(bucket_files):
+                if self._cancel.is_set():
+                    return
+                with pa.OSFile(os.path.join(spill_dir, name), "rb") as source:
+                    partials = pa.ipc.open_stream(source).read_all().to_pandas()
+                report = finalize_report(partials)
+                writer.write_table(pa.Table.from_pandas(report, schema=report_schema(), preserve_index=False))
+                self.manufacturers_written += len(report)
+                self.progress = 0.9 + 0.1 * (i + 1) / len(bucket_files)
+                self.message = f"Wrote {self.manufacturers_written:,} manufacturers"
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+class SelectionExportJob(ExportJob):
+    """
+    Exports the filtered products themselves, every ledger column included.
+    The sidebar filters are pushed into the scan as one compute expression,
+    so only a single record batch is in memory at a time.
+    """
+    prefix = "ecoloop_selection"
+
+    def __init__(self, ledger_dir, fmt="csv", filters=None, time_range=None, partitions=None,
+                 export_dir=EXPORT_DIR, batch_rows=65_536):
+        super().__init__(ledger_dir, fmt, filters, time_range, partitions, export_dir, batch_rows=batch_rows)
+        self.rows_written = 0
+        self._thread.name = "selection-export"
+
+    def _write(self, tmp_path):
+        expression = filter_expression(*self.filters, time_range=self.time_range)
+        schema = self.schema
+        total_rows = self._total_rows()
+        writer = pq.ParquetWriter(tmp_path, schema) if self.fmt == "parquet" else pa_csv.CSVWriter(tmp_path, schema)
+        try:
+            for batch in self._batches():
+                if self._cancel.is_set():
+                    return
+                selected = pa.Table.from_batches([batch])
+                if expression is not None:
+                    selected = selected.filter(expression)
+                if selected.num_rows:
+                    writer.write_table(selected)
+                self.rows_scanned += batch.num_rows
+                self.rows_written += selected.num_rows
+                self.progress = 0.99 * self.rows_scanned / total_rows
+                self.message = f"Exported {self.rows_written:,} rows ({self.rows_scanned:,} of {total_rows:,} scanned)"
+        finally:
+            writer.close()
+
+    def _summary(self):
+        return f"{self.rows_written:,} products exported"
+
+
+def _partial_aggregate(df):
+    """Per-manufacturer sums for one batch of ledger rows"""
+    if len(df) == 0:
+        return pd.DataFrame(columns=PARTIAL_SCHEMA.names)
+    recovered = df['recovered'].fillna(False).astype(bool).to_numpy()
+    carbon = df['carbon_footprint'].to_numpy(dtype=float, na_value=0.0) if 'carbon_footprint' in df else np.zeros(len(df))
+    quality = (df['batch_quality_score'].to_numpy(dtype=float, na_value=np.nan)
+               if 'batch_quality_score' in df else np.full(len(df), np.nan))
+    rows = pd.DataFrame({
+        'manufacturer': df['manufacturer_name'].astype(object).fillna('Unknown').to_numpy(),
+        'total_products': 1,
+        'recovered_products': recovered.astype(np.int64),
+        'circular_credits': df['circular_credit_amount'].to_numpy(dtype=float, na_value=0.0),
+        'carbon_footprint_kg': carbon,
+        'carbon_saved_kg': np.where(recovered, carbon * 0.7, 0.0),
+        'quality_sum': np.nan_to_num(quality),
+        'quality_count': (~np.isnan(quality)).astype(np.int64),
+    })
+    return rows.groupby('manufacturer', sort=False).sum().reset_index()
+
+
+def finalize_report(partials):
+    """Merge partial sums into one report row per manufacturer"""
+    totals = partials.groupby('manufacturer', sort=True).sum()
+    rate = (totals['recovered_products'] / totals['total_products'] * 100).round(1)
+    return pd.DataFrame({
+        'manufacturer': totals.index,
+        'total_products': totals['total_products'].to_numpy(),
+        'recovered_products': totals['recovered_products'].to_numpy(),
+        'recovery_rate': rate.to_numpy(),
+        'compliance_status': np.where(rate >= COMPLIANT_RATE, 'Compliant',
+                                      np.where(rate >= AT_RISK_RATE, 'At Risk', 'Non-Compliant')),
+        'circular_credits': totals['circular_credits'].round(2).to_numpy(),
+        'carbon_footprint_kg': totals['carbon_footprint_kg'].round(2).to_numpy(),
+        'carbon_saved_kg': totals['carbon_saved_kg'].round(2).to_numpy(),
+        'quality_score': (totals['quality_sum'] / totals['quality_count'].where(totals['quality_count'] > 0)).round(1).to_numpy(),
+    })
+
+
+def report_schema():
+    return pa.schema([
+        ('manufacturer', pa.string()),
+        ('total_products', pa.int64()),
+        ('recovered_products', pa.int64()),
+        ('recovery_rate', pa.float64()),
+        ('compliance_status', pa.string()),
+        ('circular_credits', pa.float64()),
+        ('carbon_footprint_kg', pa.float64()),
+        ('carbon_saved_kg', pa.float64()),
+        ('quality_score', pa.float64()),
+    ])
@@ -0,0 +1,143 @@
+"""
+Batched Leakage Forecasting for EcoLoop Bharat
+Fits Holt's linear exponential smoothing to the daily production and recovery
+counts of every (city, material) series at once: the recursion runs over days
+and is vectorized across series and a small grid of smoothing parameters, so
+thousands of series fit in one numpy pass.
+"""
+import numpy as np
+import pandas as pd
+
+# Smoothing grid searched per series (level alpha x trend beta)
+ALPHAS = np.array([0.1, 0.3, 0.5, 0.8])
+BETAS = np.array([0.0, 0.1, 0.3])
+
+SERIES_KEYS = ['city', 'material_type']
+
+
+def daily_counts(store, keys=SERIES_KEYS, history_days=90):
+    """
+    Dense (series x day) matrices of products and recovered counts from the
+    store's day tier, for the last `history_days` days before the newest record.
+    Returns (index frame with one row per series, products, recovered).
+    """
+    tier = store.tiers['day']
+    first_day = int(store.now // 86400) - history_days + 1
+    tier = tier[tier['bucket'] // 86400 >= first_day]
+    grouped = tier.groupby(keys + ['bucket'], observed=True)[['products', 'recovered_count']].sum().reset_index()
+
+    codes, uniques = pd.MultiIndex.from_frame(grouped[keys].astype(object)).factorize()
+    day = (grouped['bucket'].to_numpy() // 86400 - first_day).astype(np.int64)
+    shape = (len(uniques), history_days)
+    flat = codes * history_days + day
+    products = np.bincount(flat, grouped['products'].to_numpy(dtype=float), shape[0] * shape[1]).reshape(shape)
+    recovered = np.bincount(flat, grouped['recovered_count'].to_numpy(dtype=float), shape[0] * shape[1]).reshape(shape)
+    index = pd.DataFrame(list(uniques), columns=keys)
+    return index, products, recovered
+
+
+def holt_forecast(y, horizon, alphas=ALPHAS, betas=BETAS):
+    """
+    Holt's linear method for every row of `y` (series x time) in one pass.
+    Each series keeps the (alpha, beta) pair with the lowest one-step-ahead
+    squared error. Returns (forecasts of shape series x horizon, chosen alpha,
+    chosen beta, sse).
+    """
+    y = np.asarray(y, dtype=float)
+    grid_alpha, grid_beta = (g.ravel() for g in np.meshgrid(alphas, betas, indexing='ij'))
+    rows = y.shape[0]
+
+    # Level starts at the first week's mean, so one odd first day doesn't skew the fit
+    level = np.repeat(y[:, :7].mean(axis=1, keepdims=True), len(grid_alpha), axis=1)
+    trend = np.zeros_like(level)
+    sse = np.zeros_like(level)
+    for t in range(y.shape[1]):
+        error = y[:, t:t + 1] - (level + trend)
+        sse += error * error
+        level = level + trend + grid_alpha * error
+        trend = trend + grid_alpha * grid_beta * error
+
+    best = np.argmin(sse, axis=1)
+    picked = np.arange(rows), best
+    steps = np.arange(1, horizon + 1)
+    forecasts = np.clip(level[picked][:, None] + trend[picked][:, None] * steps, 0, None)
+    return forecasts, grid_alpha[best], grid_beta[best], sse[picked]
+
+
+def forecast_recovery(store, horizon=7, history_days=90, keys=SERIES_KEYS):
+    """
+    Next-`horizon`-day forecast for every series: product volume from the
+    daily counts and the recovery rate (%) from the daily rates, averaged over
+    the horizon. `current` is the rate over the last `horizon` days.
+    `alpha`/`beta` are the smoothing parameters chosen for the rate.
+    """
+    index, products, recovered = daily_counts(store, keys, history_days)
+    if len(index) == 0:
+        return index.assign(products=[], recovered=[], recent_products=[], recent_recovered=[], current=[],
+                            forecast_products=[], forecast_recovered=[], predicted=[])
+
+    # Volume is smoothed as counts, recovery as a daily rate (gaps carry the last rate)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily_rate = recovered / products * 100
+    daily_rate = pd.DataFrame(daily_rate).ffill(axis=1).bfill(axis=1).fillna(0.0).to_numpy()
+
+    # One batched fit over both matrices
+    forecasts, alpha, beta, _ = holt_forecast(np.vstack([products, daily_rate]), horizon)
+    n = len(index)
+    forecast_products = forecasts[:n].sum(axis=1)
+    predicted = np.clip(forecasts[n:].mean(axis=1), 0, 100)
+
+    recent_products = products[:, -horizon:].sum(axis=1)
+    recent_recovered = recovered[:, -horizon:].sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        current = recent_recovered / recent_products * 100
+    # Series without recent volume fall back to their rate over the whole history
+    overall = recovered.sum(axis=1) / np.maximum(products.sum(axis=1), 1) * 100
+    current = np.where(np.isfinite(current), current, overall)
+
+    return index.assign(
+        products=products.sum(axis=1),
+        recovered=recovered.sum(axis=1),
+        recent_products=recent_products,
+        recent_recovered=recent_recovered,
+        current=current,
+        forecast_products=forecast_products,
+        forecast_recovered=forecast_products * predicted / 100,
+        predicted=predicted,
+        alpha=alpha[n:],
+        beta=beta[n:],
+    )
+
+
+def city_outlook(forecasts, selection=None, top=5):
+    """
+    Roll (city, material) forecasts up to cities, weighting by volume.
+    `selection` optionally limits the series to the (city, material_type)
+    pairs it lists. Returns the `top` cities by products with Current and
+    Predicted rates (%).
+    """
+    selected = forecasts
+    if selection is not None:
+        selected = selected.merge(selection[SERIES_KEYS].drop_duplicates(), on=SERIES_KEYS)
+    if selected.empty:
+        return pd.DataFrame(columns=['City', 'Current', 'Predicted', 'Trend'])
+
+    by_city = selected.groupby('city').agg(
+        products=('products', 'sum'),
+        recovered=('recovered', 'sum'),
+        recent_products=('recent_products', 'sum'),
+        recent_recovered=('recent_recovered', 'sum'),
+        forecast_products=('forecast_products', 'sum'),
+        forecast_recovered=('forecast_recovered', 'sum'),
+    )
+    by_city = by_city.sort_values('products', ascending=False).head(top)
+    current = by_city['recent_recovered'] / by_city['recent_products'].where(by_city['recent_products'] > 0) * 100
+    predicted = (by_city['forecast_recovered'] / by_city['forecast_products'].where(by_city['forecast_products'] > 0) * 100)
+    current = current.fillna(by_city['recovered'] / by_city['products'] * 100)
+    predicted = predicted.fillna(current).clip(0, 100)
+    return pd.DataFrame({
+        'City': by_city.index,
+        'Current': current.to_numpy(),
+        'Predicted': predicted.to_numpy(),
+        'Trend': np.where(predicted > current, '📈', '📉'),
+    })
@@ -0,0 +1,216 @@
+"""
+Shared Ledger Store for the EcoLoop Bharat dashboard
+Publishes the merged ledger once per data version as memory-mapped Arrow files,
+so every session and worker process reads the same pages without copying.
+The ledger is partitioned by manufacturing day; readers only map the
+partitions that overlap their time window.
+"""
+import glob
+import hashlib
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+CACHE_DIR = "data/cache"
+UNDATED_PARTITION = "day=undated.arrow"
+
+
+def ledger_path(version, cache_dir=CACHE_DIR):
+    """Location of the published ledger (a directory of day partitions) for a data version"""
+    digest = hashlib.sha256(repr(version).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"ledger-{digest}")
+
+
+def partition_day(timestamp):
+    """UTC manufacturing day (YYYY-MM-DD) a timestamp falls into"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _write_ipc(table, path):
+    # Uncompressed IPC is what makes memory-mapped, zero-copy reads possible
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def publish_ledger(df, version, cache_dir=CACHE_DIR, keep=2):
+    """
+    Write the ledger as one Arrow IPC file per manufacturing day.
+    The partitions are written to a temporary directory that is renamed into
+    place, so readers never see a half-published version.
+    """
+    path = ledger_path(version, cache_dir)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    # Sort once by day so every partition is a contiguous, schema-identical slice
+    days = np.floor(df['manufacturing_date'].to_numpy(dtype=float, na_value=np.nan) / 86400)
+    days = np.where(np.isnan(days), -1, days).astype(np.int64)
+    order = np.argsort(days, kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False).take(order)
+    day_values, starts = np.unique(days[order], return_index=True)
+    ends = list(starts[1:]) + [len(order)]
+
+    if len(order) == 0:
+        _write_ipc(table, os.path.join(tmp_path, UNDATED_PARTITION))
+    for day, start, end in zip(day_values, starts, ends):
+        name = UNDATED_PARTITION if day < 0 else f"day={partition_day(int(day) * 86400)}.arrow"
+        _write_ipc(table.slice(start, end - start), os.path.join(tmp_path, name))
+
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another worker published the same version first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    # Drop superseded versions; readers that still map them keep their pages
+    published = sorted(
+        (p for p in glob.glob(os.path.join(cache_dir, "ledger-*")) if not p.endswith(".tmp")),
+        key=os.path.getmtime
+    )
+    for old_path in published[:-keep]:
+        if old_path != path:
+            shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+class LedgerStore:
+    """
+    Read-only, memory-mapped view of one published ledger version.
+    Only partitions between `start_day` and `end_day` (inclusive, YYYY-MM-DD)
+    are mapped; undated rows are only part of an unbounded view.
+    `frame` wraps the mapped Arrow buffers (pd.ArrowDtype columns), so it is
+    shared by every session and must never be mutated in place.
+    """
+    def __init__(self, path, start_day=None, end_day=None):
+        self.path = path
+        all_partitions = ledger_partitions(path)
+        self.total_partitions = len(all_partitions)
+        self.partitions = ledger_partitions(path, start_day, end_day)
+
+        tables = [
+            pa.ipc.open_file(pa.memory_map(os.path.join(path, f), "r")).read_all()
+            for f in self.partitions
+        ]
+        if tables:
+            self.table = pa.concat_tables(tables)
+        else:
+            schema = pa.ipc.open_file(pa.memory_map(os.path.join(path, all_partitions[0]), "r")).schema
+            self.table = schema.empty_table()
+        self.frame = self.table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def __len__(self):
+        return self.table.num_rows
+
+
+def ledger_partitions(path, start_day=None, end_day=None):
+    """Sorted partition file names of a published ledger that overlap [start_day, end_day]"""
+    return sorted(
+        f for f in os.listdir(path)
+        if f.endswith(".arrow") and _overlaps(f, start_day, end_day)
+    )
+
+
+def _overlaps(partition, start_day, end_day):
+    if partition == UNDATED_PARTITION:
+        return start_day is None and end_day is None
+    day = partition[len("day="):-len(".arrow")]
+    return (start_day is None or day >= start_day) and (end_day is None or day <= end_day)
+
+
+def apply_filters(df, selected_zone, selected_city, selected_material, selected_category, status, selected_manufacturer,
+                  time_range=None):
+    """
+    Apply all selected filters to the dataframe.
+    `time_range` is an optional (start, end) pair of timestamps on
+    manufacturing_date (either bound may be None; end is exclusive).
+    Builds one boolean mask and materialises only the selected rows; with no
+    active filter the shared frame itself is returned.
+    """
+    mask = None
+
+    def narrow(condition):
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
+
+    if time_range is not None:
+        start, end = time_range
+        if start is not None:
+            narrow(df['manufacturing_date'] >= start)
+        if end is not None:
+            narrow(df['manufacturing_date'] < end)
+
+    if selected_zone != 'All':
+        narrow(df['zone'] == selected_zone)
+
+    if selected_city != 'All':
+        narrow(df['city'] == selected_city)
+
+    if selected_material != 'All':
+        narrow(df['material_type'] == selected_material)
+
+    if selected_category != 'All':
+        narrow(df['waste_category'] == selected_category)
+
+    if selected_manufacturer != 'All':
+        narrow(df['manufacturer_name'] == selected_manufacturer)
+
+    if status == "Recovered Only":
+        narrow(df['recovered'] == True)
+    elif status == "Leaked Only":
+        narrow(df['recovered'] == False)
+    elif status == "Critical Leaks (>30 days)":
+        narrow((df['recovered'] == False) & (df['days_in_transit'] > 30))
+
+    if mask is None:
+        return df
+    return df[mask.fillna(False)]
+
+
+def filter_expression(selected_zone, selected_city, selected_material, selected_category, status, selected_manufacturer,
+                      time_range=None):
+    """
+    The same selection as `apply_filters`, as a pyarrow compute expression
+    that can be pushed into a scan of the published partitions.
+    Rows where a filtered column is null are excluded, as `apply_filters`
+    does; returns None when no filter is active.
+    """
+    conditions = []
+    if time_range is not None:
+        start, end = time_range
+        if start is not None:
+            conditions.append(pc.field('manufacturing_date') >= start)
+        if end is not None:
+            conditions.append(pc.field('manufacturing_date') < end)
+
+    for column, selected in (('zone', selected_zone), ('city', selected_city), ('material_type', selected_material),
+                             ('waste_category', selected_category), ('manufacturer_name', selected_manufacturer)):
+        if selected != 'All':
+            conditions.append(pc.field(column) == selected)
+
+    if status == "Recovered Only":
+        conditions.append(pc.field('recovered') == True)
+    elif status == "Leaked Only":
+        conditions.append(pc.field('recovered') == False)
+    elif status == "Critical Leaks (>30 days)":
+        conditions.append((pc.field('recovered') == False) & (pc.field('days_in_transit') > 30))
+
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
@@ -0,0 +1,107 @@
+"""
+Render Profiler for the EcoLoop Bharat dashboard
+Times page regions and data operations of one script rerun, counts the rows
+they produce and the bytes each region sends to the browser, and appends the
+result to a JSONL log for offline analysis. When disabled every call returns
+immediately, so the instrumentation can stay in the page permanently.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+LOG_PATH = "data/logs/render_profile.jsonl"
+
+_NOOP = contextlib.nullcontext()
+_log_lock = threading.Lock()
+
+
+class RenderProfiler:
+    """
+    `lap(name)` closes the current page region and opens the next one;
+    `section(name, rows=...)` times a data operation inside a region.
+    `rows` is a callable evaluated after the block, only when enabled.
+    """
+    def __init__(self, enabled=False, log_path=LOG_PATH, ctx=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.records = []
+        self._region = None
+        self._started = time.perf_counter()
+        self._hooked = None
+        if ctx is not None:
+            self._hook_payloads(ctx)
+
+    def _hook_payloads(self, ctx):
+        # Count the serialized size of every message this rerun sends to the browser.
+        # A rerun interrupted by st.rerun() never reaches finish(), so first drop
+        # any hook a previous rerun of this session left behind.
+        enqueue = getattr(ctx, "_enqueue", None)
+        if enqueue is None:
+            return
+        enqueue = getattr(enqueue, "__wrapped__", enqueue)
+        ctx._enqueue = enqueue
+        if not self.enabled:
+            return
+
+        def counting_enqueue(msg):
+            if self._region is not None:
+                self._region['bytes'] += msg.ByteSize()
+            enqueue(msg)
+
+        counting_enqueue.__wrapped__ = enqueue
+        ctx._enqueue = counting_enqueue
+        self._hooked = (ctx, enqueue)
+
+    def lap(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._close_region(now)
+        self._region = {'name': name, 'kind': 'region', 'start': now, 'ms': 0.0, 'rows': None, 'bytes': 0}
+        self.records.append(self._region)
+
+    def _close_region(self, now):
+        if self._region is not None:
+            self._region['ms'] = round((now - self._region.pop('start')) * 1000, 3)
+            self._region = None
+
+    def section(self, name, rows=None):
+        if not self.enabled:
+            return _NOOP
+        return self._timed(name, rows)
+
+    @contextlib.contextmanager
+    def _timed(self, name, rows):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append({
+                'name': name,
+                'kind': 'op',
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+                'rows': rows() if rows is not None else None,
+                'bytes': None,
+            })
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self._started) * 1000
+
+    def finish(self, **context):
+        """Close the last region, restore the message hook and append the rerun to the log"""
+        if not self.enabled:
+            return None
+        self._close_region(time.perf_counter())
+        if self._hooked is not None:
+            ctx, enqueue = self._hooked
+            ctx._enqueue = enqueue
+            self._hooked = None
+        entry = {'ts': time.time(), 'total_ms': round(self.total_ms, 2), **context, 'sections': self.records}
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        line = json.dumps(entry, default=str) + "\n"
+        with _log_lock, open(self.log_path, "a", encoding="utf-8") as log:
+            log.write(line)
+        return entry
@@ -0,0 +1,167 @@
+"""
+Multi-resolution Time-Series Store for EcoLoop Bharat trends
+Pre-aggregates production, recovery, carbon and credits per dashboard
+dimension at minute, hour, day and week resolution. Finer tiers only keep
+recent history (retention-based downsampling), so any trend renders from a
+bounded number of points instead of re-grouping every ledger row.
+"""
+import numpy as np
+import pandas as pd
+
+# Dimensions the sidebar can filter on; `recovered` and `critical` (unrecovered for
+# more than 30 days) let the status filter run on the rollups too
+DIMENSIONS = ['zone', 'city', 'material_type', 'waste_category', 'manufacturer_name', 'recovered', 'critical']
+
+# Resolution -> (bucket width in seconds, retention in seconds; None keeps everything)
+RESOLUTIONS = {
+    'minute': (60, 2 * 86400),
+    'hour': (3600, 30 * 86400),
+    'day': (86400, 400 * 86400),
+    'week': (7 * 86400, None),
+}
+
+# 1970-01-01 was a Thursday; shift week buckets so they start on Monday (ISO weeks)
+WEEK_OFFSET = 3 * 86400
+
+FILTER_COLUMNS = {
+    'zone': 'zone',
+    'city': 'city',
+    'material': 'material_type',
+    'category': 'waste_category',
+    'manufacturer': 'manufacturer_name',
+}
+
+
+def bucket_start(timestamps, resolution):
+    """Start of the bucket each timestamp falls into (epoch seconds)"""
+    width, _ = RESOLUTIONS[resolution]
+    offset = WEEK_OFFSET if resolution == 'week' else 0
+    return (np.floor((np.asarray(timestamps, dtype=float) + offset) / width) * width - offset).astype(np.int64)
+
+
+class TimeSeriesStore:
+    """
+    Rollups of the ledger keyed by (bucket, dimensions) for each resolution.
+    Measures: products, recovered (count), carbon_saved (kg), credits (₹).
+    Retention is measured back from `now`, which defaults to the newest
+    manufacturing_date so historical ledgers keep their fine tiers.
+    """
+    def __init__(self, ledger_df, now=None):
+        base = self._base_frame(ledger_df)
+        if now is None:
+            now = float(base['timestamp'].max()) if len(base) else pd.Timestamp.now().timestamp()
+        self.now = now
+        self.tiers = {}
+
+        for resolution, (_, retention) in RESOLUTIONS.items():
+            tier = base
+            if retention is not None:
+                tier = tier[tier['timestamp'] >= self.now - retention]
+            tier = tier.assign(bucket=bucket_start(tier['timestamp'], resolution))
+            self.tiers[resolution] = (
+                tier.groupby(['bucket'] + DIMENSIONS, observed=True, sort=True, dropna=False)
+                .agg(products=('products', 'sum'), recovered_count=('recovered_count', 'sum'),
+                     carbon_saved=('carbon_saved', 'sum'), credits=('credits', 'sum'))
+                .reset_index()
+            )
+
+    @staticmethod
+    def _base_frame(ledger_df):
+        # Plain numpy/categorical columns: rollups are small and grouped often
+        def numeric(column):
+            if column not in ledger_df.columns:
+                return np.zeros(len(ledger_df))
+            return ledger_df[column].to_numpy(dtype=float, na_value=np.nan)
+
+        recovered = ledger_df['recovered'].fillna(False).astype(bool).to_numpy()
+        base = pd.DataFrame({
+            'timestamp': numeric('manufacturing_date'),
+            'products': 1,
+            'recovered_count': recovered.astype(np.int64),
+            'carbon_saved': np.where(recovered, np.nan_to_num(numeric('carbon_footprint')) * 0.7, 0.0),
+            'credits': np.nan_to_num(numeric('circular_credit_amount')),
+        })
+        flags = {'recovered': recovered, 'critical': ~recovered & (numeric('days_in_transit') > 30)}
+        for dim in DIMENSIONS:
+            if dim in flags:
+                base[dim] = flags[dim]
+            elif dim in ledger_df.columns:
+                base[dim] = pd.Categorical(ledger_df[dim].astype(object).to_numpy())
+            else:
+                base[dim] = pd.Categorical(['Unknown'] * len(ledger_df))
+        return base[base['timestamp'].notna()]
+
+    def choose_resolution(self, start=None, end=None, max_points=2000):
+        """Finest resolution whose retention covers `start` and fits in `max_points` buckets"""
+        end = end if end is not None else self.now
+        start = start if start is not None else self._earliest()
+        for resolution, (width, retention) in RESOLUTIONS.items():
+            if retention is not None and start < self.now - retention:
+                continue
+            if (end - start) / width <= max_points:
+                return resolution
+        return 'week'
+
+    def _earliest(self):
+        week = self.tiers['week']
+        return float(week['bucket'].min()) if len(week) else self.now
+
+    def _select(self, resolution, filters, start, end):
+        tier = self.tiers[resolution]
+        mask = np.ones(len(tier), dtype=bool)
+        for key, column in FILTER_COLUMNS.items():
+            value = filters.get(key, 'All')
+            if isinstance(value, (list, tuple)):
+                mask &= tier[column].isin(value).to_numpy()
+            elif value != 'All':
+                mask &= (tier[column] == value).to_numpy()
+
+        status = filters.get('status', 'All')
+        if status == "Recovered Only":
+            mask &= tier['recovered'].to_numpy()
+        elif status == "Leaked Only":
+            mask &= ~tier['recovered'].to_numpy()
+        elif status == "Critical Leaks (>30 days)":
+            mask &= tier['critical'].to_numpy()
+
+        # Buckets are kept whole: the first and last one may extend past the range
+        if start is not None:
+            mask &= (tier['bucket'] >= bucket_start([start], resolution)[0]).to_numpy()
+        if end is not None:
+            mask &= (tier['bucket'] < end).to_numpy()
+        return tier[mask]
+
+    def series(self, resolution=None, filters=None, start=None, end=None, max_points=2000):
+        """
+        Trend points for the filtered dimensions: one row per bucket with the
+        summed measures and recovery_rate (%). `resolution=None` picks one.
+        A filter value may be a single value, 'All', or a list of values.
+        """
+        resolution = resolution or self.choose_resolution(start, end, max_points)
+        rows = self._select(resolution, filters or {}, start, end)
+        points = rows.groupby('bucket', sort=True)[['products', 'recovered_count', 'carbon_saved', 'credits']].sum()
+        points['recovery_rate'] = points['recovered_count'] / points['products'] * 100
+        # Retention already bounds the fine tiers; this only guards very long week spans
+        points = points.tail(max_points).reset_index()
+        points['time'] = pd.to_datetime(points['bucket'], unit='s')
+        return resolution, points
+
+    def rollup(self, by, filters=None, start=None, end=None):
+        """
+        Measures summed over time and grouped by dimension(s). Uses the day tier
+        when `start` falls inside its retention, otherwise the week tier.
+        """
+        day_retention = RESOLUTIONS['day'][1]
+        resolution = 'day' if start is not None and start >= self.now - day_retention else 'week'
+        rows = self._select(resolution, filters or {}, start, end)
+        totals = rows.groupby(by, observed=True)[['products', 'recovered_count', 'carbon_saved', 'credits']].sum()
+        totals['recovery_rate'] = totals['recovered_count'] / totals['products'].where(totals['products'] > 0) * 100
+        return totals.reset_index()
+
+    def values(self, dimension):
+        """Distinct values of a dimension across all history"""
+        column = self.tiers['week'][dimension]
+        return sorted(v for v in column.unique() if isinstance(v, str))
+
+    def __len__(self):
+        return sum(len(tier) for tier in self.tiers.values())